@@ -0,0 +1,14 @@
+"""
+Chạy đồ án như một module từ thư mục gốc: python -m scripts [solve FILE ...]
+(tương đương python scripts/tsp_main.py)
+"""
+
+import os
+import sys
+
+# Các module nằm phẳng trong scripts/ và import lẫn nhau theo tên
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tsp_main import main
+
+sys.exit(main())
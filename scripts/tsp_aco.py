@@ -3,28 +3,110 @@ Travelling Salesman Problem - Ant Colony Optimization (No Library)
 Giải bài toán người du lịch bằng thuật toán tối ưu hóa đàn kiến
 """
 
+import json
+import math
+import os
+import shutil
 import time
 import random
-from typing import List, Tuple
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from tsp_distance import DistanceOracle
+from tsp_local_search import improve_route
+from tsp_metrics import GAIN_BUCKETS, Metrics
+
+# Phiên bản định dạng thư mục trạng thái của save_state()/load_state()
+STATE_VERSION = 1
 
 class TSP_ACO:
+    # Ngưỡng hệ số bay hơi toàn cục: nhỏ hơn thì gộp hệ số vào ma trận pheromone
+    RENORMALIZE_BELOW = 1e-20
+    # Số ứng viên mặc định khi dùng DistanceOracle (chế độ không ma trận)
+    SPARSE_CANDIDATES = 20
+    # Sai số khi so sánh độ phân tán của đàn kiến (cùng một chu trình cộng theo thứ tự khác nhau)
+    SPREAD_EPSILON = 1e-12
+    
     def __init__(self, cities: List[str], distance_matrix,
                  n_ants: int = 20, n_iterations: int = 50,
                  alpha: float = 1.0, beta: float = 2.0,
-                 evaporation_rate: float = 0.5, q: float = 100):
+                 evaporation_rate: float = 0.5, q: float = 100,
+                 engine: str = 'python', n_candidates: Optional[int] = None,
+                 seed: Optional[int] = None, local_search: Optional[str] = None,
+                 lazy_evaporation: bool = True, tau_min: Optional[float] = None,
+                 tau_max: Optional[float] = None, stop_event=None,
+                 progress_callback: Optional[Callable[[dict], None]] = None,
+                 time_limit: Optional[float] = None, stagnation_limit: Optional[int] = None,
+                 convergence_tol: Optional[float] = None, checkpoint_path: Optional[str] = None,
+                 checkpoint_interval: int = 10, initial_route: Optional[List[int]] = None,
+                 metrics: Optional[Metrics] = None):
         """
         Khởi tạo thuật toán ACO cho TSP
         
         Args:
             cities: Danh sách tên các thành phố
-            distance_matrix: Ma trận khoảng cách giữa các thành phố
+            distance_matrix: Ma trận khoảng cách giữa các thành phố, hoặc DistanceOracle
+                             (tính khoảng cách từ tọa độ, không lưu ma trận n x n). Với DistanceOracle
+                             và engine 'numpy', pheromone/heuristic chỉ lưu trên các cạnh ứng viên
+                             (mảng n x k, mặc định k = 20)
             n_ants: Số lượng kiến
             n_iterations: Số lần lặp
             alpha: Trọng số pheromone
             beta: Trọng số heuristic (khoảng cách)
             evaporation_rate: Tỷ lệ bay hơi pheromone
             q: Hằng số cập nhật pheromone
+            engine: 'python' - từng con kiến xây dựng tuyến đường lần lượt,
+                    'numpy' - cả đàn kiến xây dựng cùng lúc trên mảng NumPy
+            n_candidates: Số thành phố gần nhất (k) được xét khi chọn thành phố tiếp theo.
+                          None - xét tất cả các thành phố chưa thăm
+            seed: Hạt giống ngẫu nhiên riêng của bộ giải (None - dùng module random toàn cục)
+            local_search: Cải thiện tuyến bằng 2-opt + Or-opt trước khi cập nhật pheromone:
+                          None - không dùng, 'best' - chỉ tuyến tốt nhất của vòng lặp,
+                          'all' - tuyến của mọi con kiến
+            lazy_evaporation: True - bay hơi bằng một hệ số nhân toàn cục (O(1) mỗi vòng lặp,
+                              thỉnh thoảng gộp vào ma trận); False - nhân toàn bộ n^2 ô mỗi vòng lặp
+            tau_min, tau_max: Giới hạn pheromone kiểu MAX-MIN (None - không giới hạn).
+                              Chặn trên áp dụng khi rải pheromone, chặn dưới áp dụng khi đọc
+            stop_event: Đối tượng có is_set() (ví dụ threading.Event); được kiểm tra trước mỗi
+                        vòng lặp, khi được đặt thì dừng và trả về lời giải tốt nhất hiện có
+            progress_callback: Hàm nhận sự kiện của solve_iter() (dict 'iteration',
+                               'n_iterations', 'best_distance', 'best_route', 'elapsed', ...),
+                               được gọi sau mỗi vòng lặp
+            time_limit: Giới hạn thời gian (giây), kiểm tra trước mỗi vòng lặp
+            stagnation_limit: Dừng khi tuyến tốt nhất không cải thiện sau K vòng lặp liên tiếp
+            convergence_tol: Dừng khi đàn kiến đã hội tụ: độ dài trung bình của các tuyến trong
+                             vòng lặp lớn hơn tuyến ngắn nhất không quá tỷ lệ này (0 - mọi tuyến
+                             dài bằng nhau)
+            checkpoint_path: Thư mục lưu trạng thái (save_state) định kỳ trong lúc giải và khi
+                             kết thúc, để tiếp tục bằng load_state() nếu bị gián đoạn
+            checkpoint_interval: Số vòng lặp giữa hai lần lưu trạng thái
+            initial_route: Tuyến đường ban đầu (chỉ số thành phố), ví dụ tuyến của lần giải
+                           trước đã được sửa sau khi thêm/bớt thành phố: dùng làm lời giải tốt
+                           nhất ban đầu và được rải thêm pheromone trước vòng lặp đầu tiên
+            metrics: Metrics (tsp_metrics) nhận số liệu: thời gian từng giai đoạn của vòng lặp
+                     (xây dựng tuyến, tìm kiếm cục bộ, đánh giá, bay hơi, rải pheromone), số vòng
+                     lặp/tuyến và histogram các lần cải thiện
         """
+        if engine not in ('python', 'numpy'):
+            raise ValueError(f"engine phải là 'python' hoặc 'numpy', nhận được: {engine!r}")
+        if local_search not in (None, 'best', 'all'):
+            raise ValueError(f"local_search phải là None, 'best' hoặc 'all', nhận được: {local_search!r}")
+        if tau_min is not None and tau_max is not None and tau_min > tau_max:
+            raise ValueError(f"tau_min ({tau_min}) phải <= tau_max ({tau_max})")
+        if n_candidates is not None and n_candidates < 1:
+            raise ValueError(f"n_candidates phải >= 1, nhận được: {n_candidates}")
+        if time_limit is not None and time_limit <= 0:
+            raise ValueError(f"time_limit phải > 0, nhận được: {time_limit}")
+        if stagnation_limit is not None and stagnation_limit < 1:
+            raise ValueError(f"stagnation_limit phải >= 1, nhận được: {stagnation_limit}")
+        if convergence_tol is not None and convergence_tol < 0:
+            raise ValueError(f"convergence_tol phải >= 0, nhận được: {convergence_tol}")
+        if checkpoint_interval < 1:
+            raise ValueError(f"checkpoint_interval phải >= 1, nhận được: {checkpoint_interval}")
+        if initial_route is not None and sorted(initial_route) != list(range(len(cities))):
+            raise ValueError("initial_route phải là một hoán vị của các chỉ số thành phố")
+        
         self.cities = cities
         self.distance_matrix = distance_matrix
         self.n_cities = len(cities)
@@ -34,23 +116,169 @@ class TSP_ACO:
         self.beta = beta
         self.evaporation_rate = evaporation_rate
         self.q = q
+        self.engine = engine
+        self.seed = seed
+        self._random = random.Random(seed) if seed is not None else random
+        self.lazy_evaporation = lazy_evaporation
+        self.tau_min = tau_min
+        self.tau_max = tau_max
+        
+        # Pheromone ban đầu là 1, nâng lên tau_min và chỉ bị chặn trên khi có tau_max
+        initial_pheromone = max(1.0, tau_min or 0.0)
+        if tau_max is not None:
+            initial_pheromone = min(initial_pheromone, tau_max)
+        # Pheromone thực tế = self.pheromone * self.pheromone_scale, không nhỏ hơn tau_min
+        self.pheromone_scale = 1.0
+        self._set_pheromone_floor(tau_min or 0.0)
+        
+        # Chế độ không ma trận: các mảng n x k theo danh sách ứng viên thay cho n x n
+        self._sparse = engine == 'numpy' and isinstance(distance_matrix, DistanceOracle)
+        if self._sparse and n_candidates is None:
+            n_candidates = self.SPARSE_CANDIDATES
+        self.n_candidates = n_candidates
+        self.candidate_lists = None
+        
+        if engine == 'numpy':
+            self._init_numpy_engine()
+            self.pheromone.fill(initial_pheromone)
+        else:
+            # Khởi tạo ma trận pheromone
+            self.pheromone = [[initial_pheromone for _ in range(self.n_cities)] for _ in range(self.n_cities)]
+            
+            # Tính toán ma trận heuristic (nghịch đảo khoảng cách)
+            self.heuristic = [[0.0 for _ in range(self.n_cities)] for _ in range(self.n_cities)]
+            for i in range(self.n_cities):
+                for j in range(self.n_cities):
+                    if i != j and distance_matrix[i][j] > 0:
+                        self.heuristic[i][j] = 1.0 / distance_matrix[i][j]
         
-        # Khởi tạo ma trận pheromone
-        self.pheromone = [[1.0 for _ in range(self.n_cities)] for _ in range(self.n_cities)]
+        # heuristic^beta không đổi: tính một lần. choice_info = pheromone^alpha * heuristic^beta
+        # chỉ được làm mới cho các cạnh vừa được cập nhật pheromone
+        if engine == 'numpy':
+            self.heuristic_beta = self.heuristic ** beta
+        else:
+            self.heuristic_beta = [[h ** beta for h in row] for row in self.heuristic]
+        self._refresh_choice_info()
         
-        # Tính toán ma trận heuristic (nghịch đảo khoảng cách)
-        self.heuristic = [[0.0 for _ in range(self.n_cities)] for _ in range(self.n_cities)]
-        for i in range(self.n_cities):
-            for j in range(self.n_cities):
-                if i != j and distance_matrix[i][j] > 0:
-                    self.heuristic[i][j] = 1.0 / distance_matrix[i][j]
+        # Danh sách ứng viên: k thành phố gần nhất của mỗi thành phố (tính một lần)
+        if not self._sparse and n_candidates is not None and n_candidates < self.n_cities - 1:
+            self.candidate_lists = self._build_candidate_lists(n_candidates)
+            if engine == 'python':
+                self.candidate_lists = self.candidate_lists.tolist()
+        
+        # Tìm kiếm cục bộ dùng ma trận dạng danh sách (truy cập nhanh) và danh sách láng giềng
+        self.local_search = local_search
+        if local_search is not None:
+            if isinstance(distance_matrix, DistanceOracle):
+                self._dist_rows = distance_matrix
+            else:
+                self._dist_rows = np.asarray(distance_matrix, dtype=float).tolist()
+            if self.candidate_lists is not None:
+                self._neighbor_lists = np.asarray(self.candidate_lists).tolist()
+            else:
+                self._neighbor_lists = self._build_candidate_lists(min(10, max(self.n_cities - 1, 1))).tolist()
+        
+        self.stop_event = stop_event
+        self.progress_callback = progress_callback
+        self.time_limit = time_limit
+        self.stagnation_limit = stagnation_limit
+        self.convergence_tol = convergence_tol
+        self.cancelled = False
+        # Lý do kết thúc: 'n_iterations', 'time_limit', 'stagnation', 'converged' hoặc 'cancelled'
+        self.stop_reason = None
+        self.iterations_run = 0
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.metrics = metrics
+        # Vòng lặp bắt đầu của lần giải tiếp theo (khác 0 sau load_state(resume=True))
+        self.start_iteration = 0
+        # (trung bình - ngắn nhất) / ngắn nhất của các tuyến trong vòng lặp gần nhất
+        self.population_spread = math.inf
         
         self.best_route = None
         self.best_distance = float('inf')
         self.execution_time = 0
         self.convergence_data = []
         self.steps_log = []
+        # Lưu khoảng cách tốt nhất của từng vòng lặp vào convergence_data
+        self.record_history = True
+        
+        self.initial_route = [int(city) for city in initial_route] if initial_route is not None else None
+        # True sau load_state(): kết quả phụ thuộc trạng thái đã lưu, không chỉ tham số
+        self.state_loaded = False
+        if self.initial_route is not None:
+            self.best_route = list(self.initial_route)
+            self.best_distance = float(self.calculate_route_distance(self.best_route))
+            self._reinforce_route(self.best_route, self.best_distance)
+    
+    def _init_numpy_engine(self):
+        """Khởi tạo pheromone, heuristic và khoảng cách dưới dạng mảng NumPy"""
+        self._rng = np.random.default_rng(self.seed)
+        
+        if self._sparse:
+            # Cột j của hàng i ứng với cạnh (i, candidate_lists[i, j])
+            self.candidate_lists = self.distance_matrix.nearest(self.n_candidates)
+            rows = np.arange(self.n_cities)[:, None]
+            self._dist = self.distance_matrix.pairwise(rows, self.candidate_lists)
+            mask = self._dist > 0
+        else:
+            self._dist = np.asarray(self.distance_matrix, dtype=float)
+            mask = self._dist > 0
+            np.fill_diagonal(mask, False)
+        
+        self.pheromone = np.ones(self._dist.shape)
+        
+        # Heuristic = 1 / khoảng cách (bỏ qua đường chéo và khoảng cách bằng 0)
+        self.heuristic = np.zeros(self._dist.shape)
+        self.heuristic[mask] = 1.0 / self._dist[mask]
+        
+    def _set_pheromone_floor(self, floor: float):
+        """Đặt chặn dưới pheromone (theo giá trị lưu trữ) và giá trị choice tương ứng"""
+        self._pheromone_floor = floor
+        self._floor_choice = floor ** self.alpha
+    
+    def _refresh_choice_info(self):
+        """Tính lại toàn bộ ma trận choice_info (O(n^2), chỉ khi mọi ô pheromone thay đổi)"""
+        if self.engine == 'numpy':
+            self.choice_info = (self.pheromone ** self.alpha) * self.heuristic_beta
+        else:
+            self.choice_info = [[(tau ** self.alpha) * hb for tau, hb in zip(tau_row, hb_row)]
+                                for tau_row, hb_row in zip(self.pheromone, self.heuristic_beta)]
+    
+    def _refresh_route_choice(self, route: List[int]):
+        """Làm mới choice_info cho các cạnh của một tuyến đường (engine 'python')"""
+        for i in range(len(route)):
+            a, b = route[i - 1], route[i]
+            self.choice_info[a][b] = (self.pheromone[a][b] ** self.alpha) * self.heuristic_beta[a][b]
+            self.choice_info[b][a] = (self.pheromone[b][a] ** self.alpha) * self.heuristic_beta[b][a]
+    
+    def _choice_rows(self, rows: np.ndarray, cols=None) -> np.ndarray:
+        """
+        Tra cứu choice_info cho các hàng (và cột) cho trước, có áp dụng chặn dưới tau_min
+        (engine 'numpy'). Kết quả là bản sao, có thể sửa tự do.
         
+        Ở chế độ không ma trận, cột là vị trí trong danh sách ứng viên của hàng.
+        """
+        if cols is None:
+            choice = self.choice_info[rows]
+            if self.tau_min is not None:
+                np.maximum(choice, self._floor_choice * self.heuristic_beta[rows], out=choice)
+        else:
+            choice = self.choice_info[rows, cols]
+            if self.tau_min is not None:
+                np.maximum(choice, self._floor_choice * self.heuristic_beta[rows, cols], out=choice)
+        return choice
+    
+    def _build_candidate_lists(self, k: int) -> np.ndarray:
+        """Trả về mảng (n_cities, k): k thành phố gần nhất của mỗi thành phố, từ gần đến xa"""
+        if isinstance(self.distance_matrix, DistanceOracle):
+            return self.distance_matrix.nearest(k)
+        dist = np.array(self.distance_matrix, dtype=float)
+        np.fill_diagonal(dist, np.inf)
+        nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(dist, nearest, axis=1).argsort(axis=1, kind='stable')
+        return np.take_along_axis(nearest, order, axis=1)
+    
     def calculate_route_distance(self, route: List[int]) -> float:
         """Tính tổng khoảng cách của một tuyến đường"""
         total_distance = 0
@@ -60,29 +288,63 @@ class TSP_ACO:
         total_distance += self.distance_matrix[route[-1]][route[0]]
         return total_distance
     
-    def select_next_city(self, current_city: int, unvisited: List[int]) -> int:
+    def select_next_city(self, current_city: int, unvisited: List[int],
+                         visited: Optional[List[bool]] = None) -> int:
         """
         Chọn thành phố tiếp theo dựa trên xác suất
         Xác suất = (pheromone^alpha) * (heuristic^beta)
+        
+        Tích được tra cứu từ choice_info (tính sẵn), theo giá trị lưu trữ - hệ số bay hơi
+        toàn cục bị triệt tiêu khi chuẩn hóa xác suất - và có chặn dưới tau_min nếu được đặt.
+        
+        Khi có danh sách ứng viên, chỉ xét các ứng viên chưa thăm; nếu tất cả
+        ứng viên đã được thăm thì chọn thành phố tốt nhất còn lại.
+        
+        Args:
+            current_city: Thành phố hiện tại
+            unvisited: Danh sách các thành phố chưa thăm
+            visited: Cờ đã thăm theo chỉ số thành phố (tùy chọn, giúp lọc ứng viên nhanh)
         """
+        choice = self.choice_info[current_city]
+        
+        exhausted = False
+        if self.candidate_lists is not None:
+            if visited is None:
+                unvisited_set = set(unvisited)
+                candidates = [c for c in self.candidate_lists[current_city] if c in unvisited_set]
+            else:
+                candidates = [c for c in self.candidate_lists[current_city] if not visited[c]]
+            
+            if candidates:
+                unvisited = candidates
+            else:
+                exhausted = True
+        
+        if self.tau_min is not None:
+            floor_choice = self._floor_choice
+            heuristic_beta = self.heuristic_beta[current_city]
+            choice = {city: max(choice[city], floor_choice * heuristic_beta[city]) for city in unvisited}
+        
+        # Tất cả ứng viên đã được thăm: chọn thành phố tốt nhất còn lại
+        if exhausted:
+            return max(unvisited, key=choice.__getitem__)
+        
         probabilities = []
         total_probability = 0
         
         for city in unvisited:
-            pheromone_value = (self.pheromone[current_city][city] ** self.alpha)
-            heuristic_value = (self.heuristic[current_city][city] ** self.beta)
-            probability = pheromone_value * heuristic_value
+            probability = choice[city]
             probabilities.append(probability)
             total_probability += probability
         
         # Chuẩn hóa xác suất
         if total_probability == 0:
-            return random.choice(unvisited)
+            return self._random.choice(unvisited)
         
         probabilities = [p / total_probability for p in probabilities]
         
         # Chọn dựa trên xác suất dùng roulette wheel selection
-        rand = random.random()
+        rand = self._random.random()
         cumulative = 0
         for i, city in enumerate(unvisited):
             cumulative += probabilities[i]
@@ -93,31 +355,143 @@ class TSP_ACO:
     
     def construct_solution(self) -> Tuple[List[int], float]:
         """Xây dựng một tuyến đường cho một con kiến"""
-        start_city = random.randint(0, self.n_cities - 1)
+        start_city = self._random.randint(0, self.n_cities - 1)
         route = [start_city]
         unvisited = list(range(self.n_cities))
         unvisited.remove(start_city)
+        visited = [False] * self.n_cities
+        visited[start_city] = True
         
         # Xây dựng tuyến đường
         while unvisited:
             current_city = route[-1]
-            next_city = self.select_next_city(current_city, unvisited)
+            next_city = self.select_next_city(current_city, unvisited, visited)
             route.append(next_city)
             unvisited.remove(next_city)
+            visited[next_city] = True
         
         distance = self.calculate_route_distance(route)
         return route, distance
     
+    def construct_solutions_batch(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Xây dựng tuyến đường cho cả đàn kiến cùng lúc (engine 'numpy')
+        
+        Mỗi bước, mọi con kiến lấy hàng xác suất của thành phố hiện tại,
+        che các thành phố đã thăm và chọn thành phố tiếp theo bằng tổng tích lũy.
+        
+        Returns:
+            (routes, distances): mảng (n_ants, n_cities) chỉ số thành phố
+            và mảng (n_ants,) độ dài tuyến đường
+        """
+        n, m = self.n_cities, self.n_ants
+        
+        ants = np.arange(m)
+        routes = np.empty((m, n), dtype=np.intp)
+        visited = np.zeros((m, n), dtype=bool)
+        current = self._rng.integers(0, n, size=m)
+        routes[:, 0] = current
+        visited[ants, current] = True
+        
+        for step in range(1, n):
+            if self.candidate_lists is not None:
+                next_city = self._select_from_candidates(current, visited)
+                routes[:, step] = next_city
+                visited[ants, next_city] = True
+                current = next_city
+                continue
+            
+            probabilities = self._choice_rows(current)
+            probabilities[visited] = 0.0
+            cumulative = np.cumsum(probabilities, axis=1)
+            
+            # Hàng toàn 0 (heuristic bằng 0): chọn đều trong các thành phố chưa thăm
+            empty = cumulative[:, -1] <= 0
+            if empty.any():
+                cumulative[empty] = np.cumsum(~visited[empty], axis=1)
+            totals = cumulative[:, -1]
+            
+            # Roulette wheel: thành phố đầu tiên có tổng tích lũy vượt ngưỡng
+            thresholds = np.minimum(self._rng.random(m) * totals, np.nextafter(totals, 0))
+            next_city = np.argmax(cumulative > thresholds[:, None], axis=1)
+            
+            routes[:, step] = next_city
+            visited[ants, next_city] = True
+            current = next_city
+        
+        distances = self._edge_lengths(routes, np.roll(routes, -1, axis=1)).sum(axis=1)
+        return routes, distances
+    
+    def _edge_lengths(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Độ dài các cạnh (a, b) theo từng phần tử"""
+        if self._sparse:
+            return self.distance_matrix.pairwise(a, b)
+        return self._dist[a, b]
+    
+    def _edge_index(self, a: np.ndarray, b: np.ndarray):
+        """
+        Chỉ số (hàng, cột) của các cạnh (a, b) trong ma trận pheromone và mặt nạ các cạnh
+        được lưu (engine 'numpy'). Ở chế độ không ma trận, cạnh không thuộc danh sách
+        ứng viên bị bỏ qua.
+        """
+        if not self._sparse:
+            return (a, b), Ellipsis
+        match = self.candidate_lists[a] == b[..., None]
+        stored = match.any(axis=-1)
+        return (a[stored], match.argmax(axis=-1)[stored]), stored
+    
+    def _select_from_candidates(self, current: np.ndarray, visited: np.ndarray) -> np.ndarray:
+        """
+        Chọn thành phố tiếp theo cho cả đàn kiến chỉ trong danh sách ứng viên (engine 'numpy')
+        
+        Kiến đã thăm hết ứng viên sẽ chọn thành phố tốt nhất còn lại.
+        """
+        m = len(current)
+        candidates = self.candidate_lists[current]
+        if self._sparse:
+            probabilities = self._choice_rows(current)
+        else:
+            probabilities = self._choice_rows(current[:, None], candidates)
+        probabilities[visited[np.arange(m)[:, None], candidates]] = 0.0
+        cumulative = np.cumsum(probabilities, axis=1)
+        totals = cumulative[:, -1]
+        
+        thresholds = np.minimum(self._rng.random(m) * totals, np.nextafter(totals, 0))
+        chosen = np.argmax(cumulative > thresholds[:, None], axis=1)
+        next_city = candidates[np.arange(m), chosen]
+        
+        exhausted = np.flatnonzero(totals <= 0)
+        if len(exhausted):
+            if self._sparse:
+                # Không có pheromone ngoài danh sách ứng viên: chọn thành phố gần nhất còn lại
+                rows = self.distance_matrix.rows(current[exhausted])
+                next_city[exhausted] = np.argmin(np.where(visited[exhausted], np.inf, rows), axis=1)
+            else:
+                remaining = np.where(visited[exhausted], -1.0, self._choice_rows(current[exhausted]))
+                next_city[exhausted] = np.argmax(remaining, axis=1)
+        return next_city
+    
     def update_pheromone(self, all_routes: List[Tuple[List[int], float]]):
         """Cập nhật ma trận pheromone"""
-        # Bay hơi pheromone (tất cả)
-        for i in range(self.n_cities):
-            for j in range(self.n_cities):
-                self.pheromone[i][j] *= (1 - self.evaporation_rate)
+        if self.engine == 'numpy':
+            routes = np.array([route for route, _ in all_routes], dtype=np.intp)
+            distances = np.array([distance for _, distance in all_routes], dtype=float)
+            self._update_pheromone_batch(routes, distances)
+            return
         
-        # Thêm pheromone mới từ các kiến
+        self._evaporate()
+        self._deposit_routes(all_routes)
+    
+    def _deposit_routes(self, all_routes: List[Tuple[List[int], float]]):
+        """Rải pheromone lên các cạnh của các tuyến đường, không bay hơi (engine 'python')"""
+        # Cạnh sắp được rải pheromone bắt đầu từ ít nhất tau_min (chặn dưới kiểu MAX-MIN)
+        if self.tau_min is not None:
+            for route, _ in all_routes:
+                self._clamp_route(route, lower=self._pheromone_floor)
+        
+        # Thêm pheromone mới từ các kiến (quy đổi theo hệ số bay hơi toàn cục)
         for route, distance in all_routes:
-            pheromone_deposit = self.q / distance
+            pheromone_deposit = self.q / distance / self.pheromone_scale
             for i in range(len(route) - 1):
                 self.pheromone[route[i]][route[i + 1]] += pheromone_deposit
                 self.pheromone[route[i + 1]][route[i]] += pheromone_deposit
@@ -125,10 +499,420 @@ class TSP_ACO:
             # Cạnh quay về thành phố xuất phát
             self.pheromone[route[-1]][route[0]] += pheromone_deposit
             self.pheromone[route[0]][route[-1]] += pheromone_deposit
+        
+        if self.tau_max is not None:
+            for route, _ in all_routes:
+                self._clamp_route(route, upper=self.tau_max / self.pheromone_scale)
+        
+        if self.lazy_evaporation:
+            for route, _ in all_routes:
+                self._refresh_route_choice(route)
+        else:
+            self._refresh_choice_info()
+    
+    def _evaporate(self):
+        """
+        Bay hơi pheromone
+        
+        Chế độ lazy chỉ nhân hệ số toàn cục pheromone_scale; khi hệ số quá nhỏ
+        thì gộp vào ma trận (O(n^2), hiếm khi xảy ra). Chế độ thường nhân toàn bộ ma trận
+        (choice_info được tính lại toàn bộ sau khi rải pheromone).
+        """
+        if not self.lazy_evaporation:
+            floor = self.tau_min or 0.0
+            if self.engine == 'numpy':
+                self.pheromone *= (1 - self.evaporation_rate)
+                if self.tau_min is not None:
+                    np.maximum(self.pheromone, floor, out=self.pheromone)
+            else:
+                for i in range(self.n_cities):
+                    row = self.pheromone[i]
+                    for j in range(self.n_cities):
+                        row[j] = max(row[j] * (1 - self.evaporation_rate), floor)
+            return
+        
+        self.pheromone_scale *= (1 - self.evaporation_rate)
+        if self.pheromone_scale < self.RENORMALIZE_BELOW:
+            self._renormalize_pheromone()
+        elif self.tau_min is not None:
+            self._set_pheromone_floor(self.tau_min / self.pheromone_scale)
+    
+    def _renormalize_pheromone(self):
+        """Gộp hệ số bay hơi toàn cục vào ma trận và áp dụng giới hạn tau_min/tau_max"""
+        self.set_pheromone(self.get_pheromone())
+    
+    def _clamp_route(self, route: List[int], lower: Optional[float] = None,
+                     upper: Optional[float] = None):
+        """Giới hạn giá trị lưu trữ của các cạnh trên một tuyến đường trong [lower, upper]"""
+        for i in range(len(route)):
+            a, b = route[i - 1], route[i]
+            for x, y in ((a, b), (b, a)):
+                value = self.pheromone[x][y]
+                if lower is not None and value < lower:
+                    self.pheromone[x][y] = lower
+                elif upper is not None and value > upper:
+                    self.pheromone[x][y] = upper
+    
+    def _update_pheromone_batch(self, routes: np.ndarray, distances: np.ndarray):
+        """Cập nhật pheromone cho cả đàn kiến bằng phép toán mảng (engine 'numpy')"""
+        self._evaporate()
+        self._deposit_batch(routes, distances)
+    
+    def _deposit_batch(self, routes: np.ndarray, distances: np.ndarray):
+        """Rải pheromone lên các cạnh của các tuyến đường, không bay hơi (engine 'numpy')"""
+        next_cities = np.roll(routes, -1, axis=1)
+        edges = [self._edge_index(routes, next_cities), self._edge_index(next_cities, routes)]
+        if self.tau_min is not None:
+            for index, _ in edges:
+                self.pheromone[index] = np.maximum(self.pheromone[index], self._pheromone_floor)
+        
+        deposits = np.broadcast_to((self.q / distances / self.pheromone_scale)[:, None], routes.shape)
+        for index, stored in edges:
+            np.add.at(self.pheromone, index, deposits[stored])
+        
+        # Chặn trên chỉ cần áp dụng cho các cạnh vừa được rải pheromone
+        if self.tau_max is not None:
+            cap = self.tau_max / self.pheromone_scale
+            for index, _ in edges:
+                self.pheromone[index] = np.minimum(self.pheromone[index], cap)
+        
+        if self.lazy_evaporation:
+            for index, _ in edges:
+                self.choice_info[index] = (self.pheromone[index] ** self.alpha) * self.heuristic_beta[index]
+        else:
+            self._refresh_choice_info()
+    
+    def _improve_routes(self, routes, distances):
+        """
+        Áp dụng tìm kiếm cục bộ lên tuyến của mọi con kiến hoặc chỉ tuyến tốt nhất
+        
+        Args:
+            routes: Mảng (n_ants, n_cities) hoặc danh sách tuyến đường, được sửa tại chỗ
+            distances: Mảng hoặc danh sách độ dài tương ứng, được sửa tại chỗ
+        """
+        if self.local_search == 'best':
+            ants = [min(range(len(distances)), key=distances.__getitem__)]
+        else:
+            ants = range(len(distances))
+        
+        for ant in ants:
+            route = routes[ant].tolist() if isinstance(routes, np.ndarray) else routes[ant]
+            routes[ant], distances[ant] = improve_route(route, self._dist_rows, self._neighbor_lists)
+    
+    def _reinforce_route(self, route: List[int], distance: float):
+        """Thêm pheromone lên một tuyến đường (không bay hơi), ví dụ tuyến nhận từ đảo khác"""
+        if self.engine == 'numpy':
+            self._deposit_batch(np.asarray([route], dtype=np.intp), np.array([distance], dtype=float))
+            return
+        if self.tau_min is not None:
+            self._clamp_route(route, lower=self._pheromone_floor)
+        pheromone_deposit = self.q / distance / self.pheromone_scale
+        for i in range(len(route)):
+            a, b = route[i], route[(i + 1) % len(route)]
+            self.pheromone[a][b] += pheromone_deposit
+            self.pheromone[b][a] += pheromone_deposit
+        if self.tau_max is not None:
+            self._clamp_route(route, upper=self.tau_max / self.pheromone_scale)
+        self._refresh_route_choice(route)
+    
+    def get_pheromone(self) -> np.ndarray:
+        """
+        Trả về bản sao ma trận pheromone thực tế (đã nhân hệ số bay hơi, đã giới hạn).
+        Ở chế độ không ma trận là mảng n x k theo danh sách ứng viên
+        """
+        matrix = np.array(self.pheromone, dtype=float) * self.pheromone_scale
+        if self.tau_min is not None or self.tau_max is not None:
+            np.clip(matrix, self.tau_min, self.tau_max, out=matrix)
+        return matrix
+    
+    def set_pheromone(self, pheromone):
+        """Gán ma trận pheromone (mảng hoặc danh sách lồng nhau n x n)"""
+        pheromone = np.array(pheromone, dtype=float)
+        self.pheromone = pheromone if self.engine == 'numpy' else pheromone.tolist()
+        self.pheromone_scale = 1.0
+        self._set_pheromone_floor(self.tau_min or 0.0)
+        self._refresh_choice_info()
+    
+    def save_state(self, path: str):
+        """
+        Lưu trạng thái bộ giải vào thư mục path để tiếp tục hoặc khởi động ấm (load_state)
+        
+        Các mảng được lưu dạng .npy (đọc lại bằng memory-map): pheromone.npy (pheromone thực tế),
+        best_route.npy, convergence.npy và candidates.npy (chế độ không ma trận); thông tin còn
+        lại (thành phố, số vòng lặp đã chạy, trạng thái bộ sinh ngẫu nhiên) ở state.json.
+        Thư mục mới được ghi xong rồi mới thay thế thư mục cũ.
+        """
+        path = os.fspath(path)
+        tmp = path + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        
+        np.save(os.path.join(tmp, 'pheromone.npy'), self.get_pheromone())
+        np.save(os.path.join(tmp, 'best_route.npy'),
+                np.asarray(self.best_route if self.best_route is not None else [], dtype=np.int64))
+        np.save(os.path.join(tmp, 'convergence.npy'), np.asarray(self.convergence_data, dtype=float))
+        if self._sparse:
+            np.save(os.path.join(tmp, 'candidates.npy'), self.candidate_lists)
+        
+        python_state = self._random.getstate()
+        state = {
+            'version': STATE_VERSION,
+            'cities': list(self.cities),
+            'sparse': self._sparse,
+            'iterations': self.iterations_run,
+            'best_distance': float(self.best_distance),
+            'random_state': [python_state[0], list(python_state[1]), python_state[2]],
+            'numpy_state': self._rng.bit_generator.state if self.engine == 'numpy' else None,
+        }
+        with open(os.path.join(tmp, 'state.json'), 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        
+        if os.path.exists(path):
+            old = path + '.old'
+            shutil.rmtree(old, ignore_errors=True)
+            os.replace(path, old)
+            os.replace(tmp, path)
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            os.replace(tmp, path)
+    
+    def load_state(self, path: str, resume: bool = True):
+        """
+        Nạp trạng thái đã lưu bằng save_state()
+        
+        Cùng bài toán (cùng danh sách thành phố): khôi phục pheromone và lời giải tốt nhất;
+        với resume=True còn khôi phục số vòng lặp đã chạy (solve() chạy tiếp các vòng còn lại),
+        đường hội tụ và trạng thái bộ sinh ngẫu nhiên. Bài toán đã thay đổi (thêm/bớt/đổi thứ
+        tự thành phố): khởi động ấm - pheromone của các cạnh giữa hai thành phố còn lại được
+        giữ theo tên thành phố, cạnh mới nhận giá trị trung bình của pheromone cũ.
+        
+        Raises:
+            ValueError: Phiên bản định dạng không được hỗ trợ
+        """
+        path = os.fspath(path)
+        with open(os.path.join(path, 'state.json'), encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') != STATE_VERSION:
+            raise ValueError(f"Phiên bản trạng thái không được hỗ trợ: {state.get('version')!r}")
+        self.state_loaded = True
+        
+        pheromone = np.load(os.path.join(path, 'pheromone.npy'), mmap_mode='r')
+        old_candidates = None
+        if state['sparse']:
+            old_candidates = np.load(os.path.join(path, 'candidates.npy'), mmap_mode='r')
+        
+        same_instance = state['cities'] == list(self.cities)
+        if same_instance and state['sparse'] == self._sparse and \
+                (not self._sparse or np.array_equal(old_candidates, self.candidate_lists)):
+            self.set_pheromone(pheromone)
+        else:
+            self.set_pheromone(self._map_pheromone(state['cities'], pheromone, old_candidates))
+        
+        if not same_instance:
+            self.best_route = None
+            self.best_distance = float('inf')
+            return
+        
+        best_route = np.load(os.path.join(path, 'best_route.npy'))
+        if len(best_route):
+            self.best_route = best_route.tolist()
+            self.best_distance = state['best_distance']
+        if resume:
+            self.start_iteration = self.iterations_run = min(state['iterations'], self.n_iterations)
+            self.convergence_data = np.load(os.path.join(path, 'convergence.npy')).tolist()
+            version, internal, gauss = state['random_state']
+            self._random.setstate((version, tuple(internal), gauss))
+            if self.engine == 'numpy' and state['numpy_state'] is not None:
+                self._rng.bit_generator.state = state['numpy_state']
+    
+    def _map_pheromone(self, old_cities: List[str], old_pheromone: np.ndarray,
+                       old_candidates: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Chuyển pheromone của bài toán cũ sang cách lưu của bài toán hiện tại theo tên thành phố
+        
+        Cạnh chưa có trong trạng thái cũ (thành phố mới, hoặc ngoài danh sách ứng viên cũ)
+        nhận giá trị trung bình của pheromone cũ.
+        """
+        index = {city: i for i, city in enumerate(old_cities)}
+        old_index = np.array([index.get(city, -1) for city in self.cities], dtype=np.int64)
+        
+        n = self.n_cities
+        cols = self.candidate_lists if self._sparse else np.broadcast_to(np.arange(n), (n, n))
+        rows = np.broadcast_to(np.arange(n)[:, None], cols.shape)
+        old_rows, old_cols = old_index[rows], old_index[cols]
+        known = (old_rows >= 0) & (old_cols >= 0)
+        
+        mapped = np.full(cols.shape, float(np.mean(old_pheromone)) if old_pheromone.size else 1.0)
+        if old_candidates is None:
+            mapped[known] = old_pheromone[old_rows[known], old_cols[known]]
+        else:
+            # Cạnh cũ (i, j) được đánh khóa i * n_old + j; tra khóa đã sắp xếp bằng searchsorted
+            n_old = len(old_cities)
+            old_keys = (np.arange(n_old)[:, None] * n_old + np.asarray(old_candidates)).ravel()
+            order = np.argsort(old_keys)
+            sorted_keys = old_keys[order]
+            keys = old_rows[known] * n_old + old_cols[known]
+            pos = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+            found = sorted_keys[pos] == keys
+            values = mapped[known]
+            values[found] = np.asarray(old_pheromone).ravel()[order[pos[found]]]
+            mapped[known] = values
+        return mapped
+    
+    def run_iteration(self, iteration: int, verbose: bool = False):
+        """
+        Chạy một vòng lặp ACO: cả đàn kiến xây dựng tuyến đường,
+        cập nhật lời giải tốt nhất, cập nhật pheromone và lưu dữ liệu hội tụ
+        
+        Args:
+            iteration: Chỉ số vòng lặp (bắt đầu từ 0)
+            verbose: Ghi log khi tìm được tuyến đường tốt hơn
+        """
+        # Đo thời gian từng giai đoạn chỉ khi có metrics (vài phép so sánh mỗi vòng lặp nếu không)
+        metrics = self.metrics
+        if metrics is not None:
+            tick = time.perf_counter()
+        
+        if self.engine == 'numpy':
+            # Cả đàn kiến xây dựng giải pháp cùng lúc
+            routes, distances = self.construct_solutions_batch()
+        else:
+            # Mỗi con kiến xây dựng một giải pháp
+            routes, distances = [], []
+            for _ in range(self.n_ants):
+                route, distance = self.construct_solution()
+                routes.append(route)
+                distances.append(distance)
+        if metrics is not None:
+            tick = metrics.lap('aco_phase', tick, phase='construction')
+        
+        if self.local_search is not None:
+            self._improve_routes(routes, distances)
+            if metrics is not None:
+                tick = metrics.lap('aco_phase', tick, phase='local_search')
+        
+        # Cập nhật giải pháp tốt nhất
+        if self.engine == 'numpy':
+            best_ant = int(np.argmin(distances))
+            self._update_best(routes[best_ant].tolist(), float(distances[best_ant]),
+                              iteration, verbose)
+            shortest, mean = float(distances[best_ant]), float(distances.mean())
+        else:
+            all_routes = list(zip(routes, distances))
+            for route, distance in all_routes:
+                self._update_best(route, distance, iteration, verbose)
+            shortest, mean = min(distances), sum(distances) / len(distances)
+        if metrics is not None:
+            tick = metrics.lap('aco_phase', tick, phase='evaluation')
+        
+        # Cập nhật pheromone: bay hơi rồi rải pheromone mới
+        self._evaporate()
+        if metrics is not None:
+            tick = metrics.lap('aco_phase', tick, phase='evaporation')
+        if self.engine == 'numpy':
+            self._deposit_batch(routes, distances)
+        else:
+            self._deposit_routes(all_routes)
+        if metrics is not None:
+            metrics.lap('aco_phase', tick, phase='deposit')
+        
+        self.population_spread = (mean - shortest) / shortest if shortest > 0 else 0.0
+        
+        # Lưu dữ liệu hội tụ
+        if self.record_history:
+            self.convergence_data.append(self.best_distance)
+    
+    def _update_best(self, route: List[int], distance: float, iteration: int, verbose: bool):
+        """Cập nhật giải pháp tốt nhất nếu tuyến đường mới ngắn hơn"""
+        if distance < self.best_distance:
+            self.best_distance = distance
+            self.best_route = route
+            
+            if verbose and len(self.steps_log) < 20:
+                log_msg = f"Iteration {iteration + 1}: Tìm tuyến đường tốt hơn: {self.best_distance:.2f} km"
+                self.steps_log.append(log_msg)
+    
+    def _record_iteration(self, previous_best: float, improved: bool, elapsed: float):
+        """Cộng số vòng lặp/tuyến vào metrics, ghi lần cải thiện vào histogram"""
+        metrics = self.metrics
+        metrics.inc('aco_iterations')
+        metrics.inc('aco_tours', self.n_ants)
+        if improved:
+            metrics.inc('aco_improvements')
+            if previous_best < math.inf:
+                metrics.observe('aco_improvement_gain',
+                                (previous_best - self.best_distance) / previous_best, GAIN_BUCKETS)
+            metrics.observe('aco_improvement_seconds', elapsed)
+    
+    def solve_iter(self, verbose: bool = False, record_history: bool = False) -> Iterator[dict]:
+        """
+        Giải bài toán TSP bằng ACO, trả về sự kiện sau mỗi vòng lặp (lời giải "anytime")
+        
+        Người gọi có thể dừng bất cứ lúc nào (break hoặc close()); best_route, best_distance
+        và execution_time luôn phản ánh lời giải tốt nhất tới thời điểm đó.
+        
+        Args:
+            verbose: Ghi log khi tìm được tuyến đường tốt hơn
+            record_history: Lưu đường hội tụ vào convergence_data (mặc định không lưu,
+                            để chạy dài không tốn bộ nhớ)
+            
+        Yields:
+            dict: {'iteration', 'n_iterations', 'best_distance', 'best_route' (chỉ số thành phố,
+                  chỉ đọc), 'improved', 'elapsed'}
+        """
+        start_time = time.perf_counter()
+        self.record_history = record_history
+        self.cancelled = False
+        self.stop_reason = None
+        first_iteration, self.start_iteration = self.start_iteration, 0
+        self.iterations_run = saved = first_iteration
+        stagnant = 0
+        try:
+            for iteration in range(first_iteration, self.n_iterations):
+                if self.stop_event is not None and self.stop_event.is_set():
+                    self.cancelled = True
+                    self.stop_reason = 'cancelled'
+                    self.steps_log.append(f"Đã dừng theo yêu cầu sau {iteration} vòng lặp")
+                    break
+                if self.time_limit is not None and time.perf_counter() - start_time >= self.time_limit:
+                    self.stop_reason = 'time_limit'
+                    self.steps_log.append(f"Hết thời gian sau {iteration} vòng lặp")
+                    break
+                
+                previous_best = self.best_distance
+                self.run_iteration(iteration, verbose)
+                self.iterations_run = iteration + 1
+                improved = bool(self.best_distance < previous_best)
+                if self.metrics is not None:
+                    self._record_iteration(previous_best, improved, time.perf_counter() - start_time)
+                stagnant = 0 if improved else stagnant + 1
+                if self.checkpoint_path is not None and self.iterations_run % self.checkpoint_interval == 0:
+                    self.save_state(self.checkpoint_path)
+                    saved = self.iterations_run
+                yield {'iteration': iteration + 1, 'n_iterations': self.n_iterations,
+                       'best_distance': self.best_distance, 'best_route': self.best_route,
+                       'improved': improved, 'elapsed': time.perf_counter() - start_time}
+                
+                if self.stagnation_limit is not None and stagnant >= self.stagnation_limit:
+                    self.stop_reason = 'stagnation'
+                    self.steps_log.append(f"Dừng sớm: không cải thiện sau {stagnant} vòng lặp "
+                                          f"(vòng lặp {iteration + 1})")
+                    break
+                if self.convergence_tol is not None and self.population_spread <= self.convergence_tol + self.SPREAD_EPSILON:
+                    self.stop_reason = 'converged'
+                    self.steps_log.append(f"Dừng sớm: đàn kiến đã hội tụ (vòng lặp {iteration + 1})")
+                    break
+            else:
+                self.stop_reason = 'n_iterations'
+        finally:
+            if self.checkpoint_path is not None and self.iterations_run > saved:
+                self.save_state(self.checkpoint_path)
+            self.execution_time = time.perf_counter() - start_time
+            self.record_history = True
     
     def solve(self, verbose: bool = False) -> dict:
         """
-        Giải bài toán TSP bằng ACO
+        Giải bài toán TSP bằng ACO (chạy hết solve_iter())
         
         Args:
             verbose: In chi tiết các bước
@@ -136,8 +920,6 @@ class TSP_ACO:
         Returns:
             dict: Kết quả gồm tuyến đường, khoảng cách, thời gian, log
         """
-        start_time = time.time()
-        
         if verbose:
             print(f"\n{'='*70}")
             print(f"THUẬT TOÁN ACO (ANT COLONY OPTIMIZATION)")
@@ -152,39 +934,18 @@ class TSP_ACO:
             print(f"Q constant: {self.q}")
             print(f"{'='*70}\n")
         
-        for iteration in range(self.n_iterations):
-            all_routes = []
+        for event in self.solve_iter(verbose, record_history=True):
+            if self.progress_callback is not None:
+                self.progress_callback(event)
             
-            # Mỗi con kiến xây dựng một giải pháp
-            for ant in range(self.n_ants):
-                route, distance = self.construct_solution()
-                all_routes.append((route, distance))
-                
-                # Cập nhật giải pháp tốt nhất
-                if distance < self.best_distance:
-                    self.best_distance = distance
-                    self.best_route = route
-                    
-                    if verbose and len(self.steps_log) < 20:
-                        log_msg = f"Iteration {iteration + 1}: Tìm tuyến đường tốt hơn: {self.best_distance:.2f} km"
-                        self.steps_log.append(log_msg)
-            
-            # Cập nhật pheromone
-            self.update_pheromone(all_routes)
-            
-            # Lưu dữ liệu hội tụ
-            self.convergence_data.append(self.best_distance)
-            
-            if verbose and (iteration + 1) % 10 == 0:
-                print(f"Iteration {iteration + 1}/{self.n_iterations}: "
+            if verbose and event['iteration'] % 10 == 0:
+                print(f"Iteration {event['iteration']}/{self.n_iterations}: "
                       f"Khoảng cách tốt nhất = {self.best_distance:.2f} km")
         
-        self.execution_time = time.time() - start_time
+        # Chuyển đổi route từ index sang tên thành phố (rỗng nếu bị dừng trước vòng lặp đầu tiên)
+        best_route_names = [self.cities[i] for i in self.best_route] if self.best_route is not None else []
         
-        # Chuyển đổi route từ index sang tên thành phố
-        best_route_names = [self.cities[i] for i in self.best_route]
-        
-        if verbose:
+        if verbose and best_route_names:
             print(f"\nKết quả:")
             print(f"Tuyến đường tốt nhất: {' -> '.join(best_route_names)} -> {best_route_names[0]}")
             print(f"Tổng khoảng cách: {self.best_distance:.2f} km")
@@ -198,12 +959,21 @@ class TSP_ACO:
             'algorithm': 'ACO (Ant Colony Optimization)',
             'convergence': self.convergence_data,
             'steps': self.steps_log,
+            'cancelled': self.cancelled,
+            'stop_reason': self.stop_reason,
+            'iterations': self.iterations_run,
             'parameters': {
                 'n_ants': self.n_ants,
                 'n_iterations': self.n_iterations,
                 'alpha': self.alpha,
                 'beta': self.beta,
                 'evaporation_rate': self.evaporation_rate,
-                'q': self.q
+                'q': self.q,
+                'local_search': self.local_search,
+                'tau_min': self.tau_min,
+                'tau_max': self.tau_max,
+                'time_limit': self.time_limit,
+                'stagnation_limit': self.stagnation_limit,
+                'convergence_tol': self.convergence_tol
             }
         }
@@ -0,0 +1,298 @@
+"""
+Travelling Salesman Problem - Island Model ACO (Multi-process)
+Nhiều đàn kiến độc lập chạy song song trên nhiều tiến trình, định kỳ trao đổi
+tuyến đường tốt nhất hoặc trộn ma trận pheromone qua bộ nhớ chia sẻ
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from tsp_aco import TSP_ACO
+from tsp_distance import DistanceOracle
+from tsp_metrics import Metrics
+
+
+def _run_island(index: int, cities: List[str], distance_matrix, params: dict,
+                n_iterations: int, migration_interval: int, migration: str,
+                migration_rate: float, shared_distances, shared_tours, shared_pheromone,
+                barrier, result_queue, stop_event, report_progress: bool, collect_metrics: bool):
+    """
+    Chạy một đảo (đàn kiến) trong tiến trình con
+
+    Đàn kiến chạy qua solve_iter() nên time_limit, stagnation_limit, convergence_tol và
+    stop_event có hiệu lực như với TSP_ACO. Khi một đảo dừng sớm, nó hủy barrier: các đảo
+    còn lại không trao đổi nữa và chạy tiếp tới điều kiện dừng của riêng chúng.
+    """
+    colony = TSP_ACO(cities, distance_matrix, n_iterations=n_iterations, stop_event=stop_event,
+                     metrics=Metrics() if collect_metrics else None, **params)
+    n = colony.n_cities
+    n_islands = barrier.parties
+    migrating = True
+
+    try:
+        for event in colony.solve_iter(record_history=True):
+            if report_progress:
+                # Tuyến đường chỉ được gửi khi cải thiện (tránh chép n phần tử mỗi vòng lặp)
+                route = event['best_route'] if event['improved'] else None
+                result_queue.put(('progress', index, {**event, 'best_route': route}))
+
+            iteration = event['iteration']
+            if not migrating or iteration % migration_interval or iteration == n_iterations:
+                continue
+
+            try:
+                if migration == 'best_tour':
+                    # Ghi tuyến tốt nhất của đảo, chờ các đảo khác rồi nhận tuyến tốt nhất toàn cục
+                    shared_distances[index] = colony.best_distance
+                    shared_tours[index * n:(index + 1) * n] = colony.best_route
+                    barrier.wait()
+                    best = min(range(n_islands), key=lambda i: shared_distances[i])
+                    if best != index and shared_distances[best] < colony.best_distance:
+                        colony.best_distance = shared_distances[best]
+                        colony.best_route = list(shared_tours[best * n:(best + 1) * n])
+                        colony._reinforce_route(colony.best_route, colony.best_distance)
+                    barrier.wait()
+                else:
+                    # Trộn pheromone của đảo với trung bình pheromone của tất cả các đảo
+                    own = colony.get_pheromone()
+                    matrices = np.frombuffer(shared_pheromone, dtype=np.float64).reshape(n_islands, *own.shape)
+                    matrices[index] = own
+                    barrier.wait()
+                    mean = matrices.mean(axis=0)
+                    barrier.wait()
+                    colony.set_pheromone((1 - migration_rate) * own + migration_rate * mean)
+            except threading.BrokenBarrierError:
+                migrating = False
+    finally:
+        # Đảo đã dừng (hoặc lỗi): giải phóng các đảo đang hoặc sẽ chờ ở barrier
+        barrier.abort()
+
+    result_queue.put(('done', index, (colony.best_distance, colony.best_route, colony.convergence_data,
+                                      colony.iterations_run, colony.stop_reason, colony.metrics)))
+
+
+class TSP_ACOIslands:
+    MIGRATIONS = ('best_tour', 'pheromone')
+    # Tham số của TSP_ACO không dùng được cho nhiều tiến trình: các đảo sẽ ghi chồng lên
+    # cùng một thư mục trạng thái
+    UNSUPPORTED_PARAMS = ('checkpoint_path', 'checkpoint_interval')
+
+    def __init__(self, cities: List[str], distance_matrix,
+                 n_islands: Optional[int] = None, migration_interval: int = 10,
+                 migration: str = 'best_tour', migration_rate: float = 0.5,
+                 island_params: Optional[List[dict]] = None, seed: Optional[int] = None,
+                 n_iterations: int = 50, stop_event=None,
+                 progress_callback: Optional[Callable[[dict], None]] = None,
+                 metrics: Optional[Metrics] = None, **aco_params):
+        """
+        Khởi tạo mô hình đảo cho ACO
+
+        Args:
+            cities: Danh sách tên các thành phố
+            distance_matrix: Ma trận khoảng cách giữa các thành phố
+            n_islands: Số đảo, mỗi đảo một tiến trình (None - số lõi CPU)
+            migration_interval: Số vòng lặp giữa hai lần trao đổi (K)
+            migration: 'best_tour' - các đảo nhận tuyến tốt nhất toàn cục,
+                       'pheromone' - trộn pheromone với trung bình của các đảo
+            migration_rate: Tỷ lệ trộn pheromone (0-1) khi migration='pheromone'
+            island_params: Tham số riêng của từng đảo (ví dụ alpha/beta khác nhau),
+                           lặp vòng nếu ít hơn số đảo
+            seed: Hạt giống; mỗi đảo nhận một hạt giống con khác nhau
+            n_iterations: Số lần lặp của mỗi đảo
+            stop_event: Đối tượng có is_set() (ví dụ threading.Event), được kiểm tra trong tiến
+                        trình chính; khi được đặt, mọi đảo dừng sau vòng lặp hiện tại
+            progress_callback: Hàm nhận sự kiện sau mỗi vòng lặp của một đảo ('island',
+                               'iteration', 'n_iterations', 'elapsed'; 'best_distance' và
+                               'best_route' là tốt nhất của mọi đảo), gọi trong tiến trình chính
+            metrics: Metrics nhận số liệu của mọi đảo (gộp sau khi giải)
+            aco_params: Các tham số chung truyền cho TSP_ACO (n_ants, alpha, beta, engine,
+                        local_search, time_limit, stagnation_limit, convergence_tol, ...).
+                        Mỗi đảo tự áp dụng điều kiện dừng của mình; khi một đảo dừng sớm,
+                        các đảo còn lại không trao đổi nữa
+        """
+        if migration not in self.MIGRATIONS:
+            raise ValueError(f"migration phải là một trong {self.MIGRATIONS}, nhận được: {migration!r}")
+        if migration_interval < 1:
+            raise ValueError(f"migration_interval phải >= 1, nhận được: {migration_interval}")
+        unsupported = [name for name in self.UNSUPPORTED_PARAMS
+                       if name in aco_params or any(name in params for params in island_params or ())]
+        if unsupported:
+            raise ValueError(f"TSP_ACOIslands không hỗ trợ tham số: {', '.join(unsupported)}")
+
+        self.cities = cities
+        self.distance_matrix = distance_matrix
+        self.n_cities = len(cities)
+        self.n_islands = n_islands or os.cpu_count() or 1
+        self.migration_interval = migration_interval
+        self.migration = migration
+        self.migration_rate = migration_rate
+        self.n_iterations = n_iterations
+        self.aco_params = aco_params
+
+        # Mỗi đảo một hạt giống riêng để các đàn kiến không trùng nhau
+        seeds = np.random.SeedSequence(seed).spawn(self.n_islands)
+        self.island_params = []
+        for i in range(self.n_islands):
+            params = dict(aco_params)
+            if island_params:
+                params.update(island_params[i % len(island_params)])
+            params['seed'] = int(seeds[i].generate_state(1)[0])
+            self.island_params.append(params)
+
+        # Pheromone ở chế độ không ma trận là mảng n x k theo danh sách ứng viên của từng đảo:
+        # không lấy trung bình giữa các đảo được
+        if migration == 'pheromone' and isinstance(distance_matrix, DistanceOracle) and \
+                any(params.get('engine') == 'numpy' for params in self.island_params):
+            raise ValueError("migration='pheromone' không dùng được với DistanceOracle và engine 'numpy' "
+                             "(pheromone theo danh sách ứng viên); dùng migration='best_tour'")
+
+        self.stop_event = stop_event
+        self.progress_callback = progress_callback
+        self.metrics = metrics
+
+        self.best_route = None
+        self.best_distance = float('inf')
+        self.execution_time = 0
+        self.convergence_data = []
+        self.island_distances = []
+        self.island_iterations = []
+        self.stop_reasons = []
+        self.cancelled = False
+        self.steps_log = []
+
+    def solve(self, verbose: bool = False) -> dict:
+        """
+        Giải bài toán TSP bằng nhiều đàn kiến song song
+
+        Args:
+            verbose: In chi tiết các bước
+
+        Returns:
+            dict: Kết quả giống TSP_ACO.solve(), convergence là đường hội tụ gộp
+                  (tốt nhất trong các đảo tại mỗi vòng lặp)
+        """
+        start_time = time.perf_counter()
+        n = self.n_cities
+
+        if verbose:
+            print(f"\n{'='*70}")
+            print(f"THUẬT TOÁN ACO - MÔ HÌNH ĐẢO ({self.n_islands} tiến trình)")
+            print(f"{'='*70}")
+            print(f"Số thành phố: {n}")
+            print(f"Trao đổi: {self.migration} mỗi {self.migration_interval} vòng lặp")
+            print(f"{'='*70}\n")
+
+        context = multiprocessing.get_context()
+        barrier = context.Barrier(self.n_islands)
+        result_queue = context.Queue()
+        shared_distances = context.RawArray('d', self.n_islands)
+        shared_tours = context.RawArray('l', self.n_islands * n)
+        # Chế độ không ma trận đã bị từ chối khi khởi tạo: pheromone của mỗi đảo là n x n
+        shared_pheromone = context.RawArray('d', self.n_islands * n * n if self.migration == 'pheromone' else 1)
+        # stop_event của người gọi có thể không chuyển được sang tiến trình con: tiến trình
+        # chính theo dõi nó và đặt island_stop cho mọi đảo
+        island_stop = context.Event()
+
+        processes = [
+            context.Process(target=_run_island,
+                            args=(i, self.cities, self.distance_matrix, self.island_params[i],
+                                  self.n_iterations, self.migration_interval, self.migration,
+                                  self.migration_rate, shared_distances, shared_tours,
+                                  shared_pheromone, barrier, result_queue, island_stop,
+                                  self.progress_callback is not None, self.metrics is not None),
+                            daemon=True)
+            for i in range(self.n_islands)
+        ]
+        for process in processes:
+            process.start()
+
+        results = [None] * self.n_islands
+        island_routes = [None] * self.n_islands
+        island_best = [float('inf')] * self.n_islands
+        try:
+            remaining = self.n_islands
+            while remaining:
+                if self.stop_event is not None and self.stop_event.is_set():
+                    island_stop.set()
+                try:
+                    kind, index, payload = result_queue.get(timeout=0.1)
+                except queue.Empty:
+                    if any(p.exitcode not in (None, 0) for p in processes):
+                        barrier.abort()
+                        raise RuntimeError('Một tiến trình đảo đã dừng bất thường')
+                    continue
+                if kind == 'progress':
+                    if payload['best_route'] is not None:
+                        island_routes[index] = payload['best_route']
+                    island_best[index] = payload['best_distance']
+                    best = int(np.argmin(island_best))
+                    self.progress_callback({**payload, 'island': index, 'best_distance': island_best[best],
+                                            'best_route': island_routes[best],
+                                            'elapsed': time.perf_counter() - start_time})
+                    continue
+                results[index] = payload
+                remaining -= 1
+        finally:
+            for process in processes:
+                process.join(timeout=1)
+                if process.is_alive():
+                    process.terminate()
+
+        self.island_distances = [result[0] for result in results]
+        self.island_iterations = [result[3] for result in results]
+        self.stop_reasons = [result[4] for result in results]
+        self.cancelled = island_stop.is_set()
+        best_island = int(np.argmin(self.island_distances))
+        self.best_distance, self.best_route = results[best_island][:2]
+        # Đường hội tụ gộp: đảo đã dừng sớm giữ khoảng cách tốt nhất cuối cùng của nó
+        histories = [result[2] for result in results if result[2]]
+        length = max((len(history) for history in histories), default=0)
+        self.convergence_data = np.min([history + history[-1:] * (length - len(history))
+                                        for history in histories], axis=0).tolist() if histories else []
+        for i, distance in enumerate(self.island_distances):
+            self.steps_log.append(f"Đảo {i + 1}: khoảng cách tốt nhất {distance:.2f} "
+                                  f"({self.island_iterations[i]} vòng lặp, {self.stop_reasons[i]})")
+        if self.metrics is not None:
+            for result in results:
+                self.metrics.merge(result[5])
+
+        self.execution_time = time.perf_counter() - start_time
+
+        # Chuyển đổi route từ index sang tên thành phố
+        best_route_names = [self.cities[i] for i in self.best_route] if self.best_route is not None else []
+
+        if verbose and best_route_names:
+            print(f"\nKết quả:")
+            print(f"Tuyến đường tốt nhất: {' -> '.join(best_route_names)} -> {best_route_names[0]}")
+            print(f"Tổng khoảng cách: {self.best_distance:.2f} km (đảo {best_island + 1})")
+            print(f"Thời gian thực thi: {self.execution_time:.4f} giây")
+            print(f"{'='*70}\n")
+
+        return {
+            'route': best_route_names,
+            'distance': self.best_distance,
+            'time': self.execution_time,
+            'algorithm': 'ACO Island Model (Mô hình đảo)',
+            'convergence': self.convergence_data,
+            'steps': self.steps_log,
+            'islands': self.island_distances,
+            'island_iterations': self.island_iterations,
+            'stop_reasons': self.stop_reasons,
+            'iterations': max(self.island_iterations),
+            'cancelled': self.cancelled,
+            'parameters': {
+                'n_islands': self.n_islands,
+                'n_iterations': self.n_iterations,
+                'migration': self.migration,
+                'migration_interval': self.migration_interval,
+                'migration_rate': self.migration_rate,
+                'islands': [{k: v for k, v in p.items() if k != 'seed'} for p in self.island_params],
+                **self.aco_params
+            }
+        }
@@ -3,34 +3,281 @@ Travelling Salesman Problem - Backtracking Solution (No Library)
 Giải bài toán người du lịch bằng thuật toán quay lui thuần túy
 """
 
+import math
+import os
 import time
-from typing import List, Tuple
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from tsp_metrics import GAIN_BUCKETS, Metrics
+
+# Sai số tương đối khi so sánh cận dưới với lời giải tốt nhất (tránh cắt nhầm do làm tròn số thực)
+BOUND_TOLERANCE = 1e-12
+
+
+def _reduce(matrix: np.ndarray) -> float:
+    """
+    Rút gọn ma trận chi phí tại chỗ: trừ mỗi hàng rồi mỗi cột cho giá trị nhỏ nhất của nó
+    (hàng/cột đã bị loại, toàn inf, giữ nguyên)
+
+    Returns:
+        Tổng đã trừ
+    """
+    rows = matrix.min(axis=1)
+    rows[rows == np.inf] = 0.0
+    matrix -= rows[:, None]
+    cols = matrix.min(axis=0)
+    cols[cols == np.inf] = 0.0
+    matrix -= cols
+    return float(rows.sum() + cols.sum())
 
 class TSPBacktracking:
-    def __init__(self, cities: List[str], distance_matrix):
+    BOUNDS = ('two_edges', 'mst', 'reduced')
+    
+    ENGINES = ('recursive', 'iterative')
+    
+    # Số nút giữa hai lần đọc lời giải tốt nhất chung giữa các tiến trình
+    # (và giữa hai lần kiểm tra yêu cầu dừng / báo tiến độ)
+    SYNC_INTERVAL = 1024
+    
+    # Khoảng thời gian tối thiểu (giây) giữa hai lần gọi progress_callback
+    PROGRESS_INTERVAL = 0.1
+    
+    def __init__(self, cities: List[str], distance_matrix, bound: Optional[str] = None,
+                 engine: str = 'recursive', n_workers: Optional[int] = 1,
+                 stop_event=None, progress_callback: Optional[Callable[[dict], None]] = None,
+                 time_limit: Optional[float] = None, initial_route: Optional[List[int]] = None,
+                 metrics: Optional[Metrics] = None):
         """
         Khởi tạo bài toán TSP với Backtracking
         
         Args:
             cities: Danh sách tên các thành phố
-            distance_matrix: Ma trận khoảng cách giữa các thành phố
+            distance_matrix: Ma trận khoảng cách giữa các thành phố, hoặc DistanceOracle
+                             (được chuyển thành ma trận đầy đủ vì bài toán nhỏ)
+            bound: Cận dưới cho chế độ nhánh cận (branch and bound):
+                   None - quay lui thuần túy,
+                   'two_edges' - hai cạnh rẻ nhất của mỗi thành phố chưa thăm,
+                   'mst' - cây khung nhỏ nhất (1-tree) trên các thành phố chưa thăm,
+                   'reduced' - ma trận chi phí rút gọn (Little và cộng sự): ma trận đã rút gọn
+                   và cận của nó được mang xuống từng nhánh, mỗi nút con chỉ loại một hàng,
+                   một cột rồi rút gọn lại
+            engine: 'recursive' - hàm đệ quy backtrack() có ghi log từng bước,
+                    'iterative' - vòng lặp với ngăn xếp tường minh, tập chưa thăm là bitmask,
+                    không cấp phát và không ghi log trong vòng lặp chính
+            n_workers: Số tiến trình song song (None - số lõi CPU). Khi > 1, các cây con
+                       ở mức 1 (hoặc mức 2) được chia cho các tiến trình, dùng chung lời giải
+                       tốt nhất qua bộ nhớ chia sẻ; kết quả giống hệt engine 'iterative' tuần tự
+            stop_event: Đối tượng có is_set() (ví dụ threading.Event); khi được đặt, việc tìm
+                        kiếm dừng sớm và trả về lời giải tốt nhất hiện có (cancelled=True)
+            progress_callback: Hàm nhận dict {'nodes', 'best_distance', 'best_route', 'elapsed'},
+                               được gọi định kỳ (tối đa mỗi PROGRESS_INTERVAL giây) trong lúc
+                               tìm kiếm; best_route (chỉ số thành phố, có thể None) là tuyến tốt
+                               nhất đã biết, với nhiều tiến trình có thể trễ hơn best_distance
+            time_limit: Giới hạn thời gian (giây). Hết giờ thì trả về lời giải tốt nhất hiện có
+                        với optimal=False và lower_bound là cận dưới tốt nhất của phần chưa duyệt
+            initial_route: Tuyến đường ban đầu (chỉ số thành phố), ví dụ tuyến của lần giải trước
+                           đã được sửa: dùng làm lời giải tốt nhất ban đầu để cắt nhánh ngay từ đầu
+            metrics: Metrics (tsp_metrics) nhận số liệu sau khi giải: số nút, số lá, số nhánh bị
+                     cắt theo lý do, thời gian từng giai đoạn và histogram các lần cải thiện
         """
+        if bound is not None and bound not in self.BOUNDS:
+            raise ValueError(f"bound phải là một trong {self.BOUNDS}, nhận được: {bound!r}")
+        if engine not in self.ENGINES:
+            raise ValueError(f"engine phải là một trong {self.ENGINES}, nhận được: {engine!r}")
+        if time_limit is not None and time_limit <= 0:
+            raise ValueError(f"time_limit phải > 0, nhận được: {time_limit}")
+        if initial_route is not None and sorted(initial_route) != list(range(len(cities))):
+            raise ValueError("initial_route phải là một hoán vị của các chỉ số thành phố")
+        
         self.cities = cities
         self.distance_matrix = distance_matrix
         self.n_cities = len(cities)
+        self.bound = bound
+        self.engine = engine
+        self.n_workers = n_workers if n_workers is not None else (os.cpu_count() or 1)
+        self._dist = [[float(d) for d in row] for row in distance_matrix]
+        if bound is not None:
+            self._init_bounds()
         self.best_route = None
         self.best_distance = float('inf')
         self.execution_time = 0
         self.steps_log = []
         self.explored_routes = 0
+        self.nodes_per_sec = 0.0
+        # Số nút được mở rộng và số nút bị cắt theo cận dưới, theo độ sâu (độ dài tuyến đường - 1).
+        # Engine 'iterative' chỉ đếm trên nhánh đã tốn nhiều công (mở rộng, tính cận); engine
+        # 'recursive' chỉ đếm khi có metrics (_counting_backtrack). Số lá và số nút bị cắt theo
+        # khoảng cách được suy ra trong node_counts(). Gộp trong một thuộc tính: đối tượng có
+        # quá nhiều thuộc tính thì mọi lần truy cập self.x đều chậm hơn.
+        self.depth_counts = {'expanded': [0] * max(self.n_cities, 1),
+                             'pruned_bound': [0] * max(self.n_cities, 1)}
+        self.metrics = metrics
+        self.stop_event = stop_event
+        self.progress_callback = progress_callback
+        self.time_limit = time_limit
+        self.initial_route = [int(city) for city in initial_route] if initial_route is not None else None
+        self._monitored = stop_event is not None or progress_callback is not None or time_limit is not None
+        self._start_time = 0.0
+        self._last_progress = 0.0
+        self._deadline = None
+        
+        # Trạng thái dừng sớm: stopped = cancelled (stop_event) hoặc timed_out (time_limit).
+        # Khi dừng sớm, _frontier_bound là cận dưới nhỏ nhất của các nhánh chưa duyệt
+        self.cancelled = False
+        self.timed_out = False
+        self.stopped = False
+        self.optimal = False
+        self.best_lower_bound = -math.inf
+        self._frontier_bound = math.inf
+    
+    def _checkpoint(self, nodes: int, best: float) -> bool:
+        """Báo tiến độ (nếu đã đủ PROGRESS_INTERVAL), kiểm tra yêu cầu dừng và hết giờ; True nếu phải dừng"""
+        now = time.perf_counter()
+        if self.progress_callback is not None and now - self._last_progress >= self.PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.progress_callback({'nodes': nodes, 'best_distance': best, 'best_route': self.best_route,
+                                    'elapsed': now - self._start_time})
+        if self.stop_event is not None and self.stop_event.is_set():
+            self.cancelled = True
+        elif self._deadline is not None and now >= self._deadline:
+            self.timed_out = True
+        self.stopped = self.cancelled or self.timed_out
+        return self.stopped
+    
+    def _init_bounds(self):
+        """Tính trước dữ liệu dùng cho các cận dưới"""
+        n = self.n_cities
+        dist = np.array(self._dist)
+        np.fill_diagonal(dist, np.inf)
         
+        # Chi phí hai cạnh rẻ nhất của mỗi thành phố (đồ thị đối xứng),
+        # hoặc cạnh vào rẻ nhất + cạnh ra rẻ nhất (đồ thị bất đối xứng)
+        if n < 3:
+            self._two_edge_cost = [0.0] * n
+        elif np.array_equal(dist, dist.T):
+            cheapest = np.sort(dist, axis=1)[:, :2]
+            self._two_edge_cost = cheapest.sum(axis=1).tolist()
+        else:
+            self._two_edge_cost = (dist.min(axis=0) + dist.min(axis=1)).tolist()
+        self._two_edge_remaining = 0.0
+        
+        if self.bound == 'reduced':
+            # Ma trận rút gọn của nút gốc (chỉ đọc) và ngăn xếp (ma trận, cận) của engine 'recursive'
+            self._dist_inf = dist
+            self._reduced_root = dist.copy()
+            self._reduced_root_cost = _reduce(self._reduced_root)
+            self._reduced_root.flags.writeable = False
+            self._reduced_stack = []
+    
+    @staticmethod
+    def _reduced_step(parent: np.ndarray, child: np.ndarray, i: int, j: int) -> float:
+        """
+        Đi cạnh i -> j: ghi vào child ma trận rút gọn của nút con từ ma trận parent của nút cha
+        (loại hàng i, cột j, cấm j -> 0 rồi rút gọn lại)
+        
+        Returns:
+            Phần cận dưới tăng thêm: chi phí rút gọn của cạnh i -> j + tổng rút gọn mới
+        """
+        np.copyto(child, parent)
+        child[i] = np.inf
+        child[:, j] = np.inf
+        child[j, 0] = np.inf
+        return float(parent[i, j]) + _reduce(child)
+    
+    def _nearest_neighbour_tour(self) -> Tuple[List[int], float]:
+        """Tuyến đường tham lam bắt đầu từ thành phố 0 (dùng làm lời giải ban đầu)"""
+        route = [0]
+        unvisited = set(range(1, self.n_cities))
+        while unvisited:
+            row = self._dist[route[-1]]
+            next_city = min(unvisited, key=row.__getitem__)
+            route.append(next_city)
+            unvisited.remove(next_city)
+        return route, self.calculate_route_distance(route)
+    
+    def lower_bound(self, last_city: int, unvisited, current_distance: float) -> float:
+        """
+        Cận dưới của mọi tuyến đường hoàn chỉnh mở rộng từ tuyến đường hiện tại
+        
+        Phần còn lại phải rời last_city, thăm hết unvisited và quay về thành phố 0.
+        
+        Args:
+            last_city: Thành phố cuối của tuyến đường hiện tại
+            unvisited: Các thành phố chưa được thăm (tập hợp hoặc danh sách, khác rỗng)
+            current_distance: Khoảng cách tích lũy từ đầu
+        """
+        dist = self._dist
+        
+        if self.bound == 'two_edges':
+            leave = min(dist[last_city][u] for u in unvisited)
+            enter = min(dist[u][0] for u in unvisited)
+            return current_distance + (self._two_edge_remaining + leave + enter) / 2
+        
+        if self.bound == 'reduced':
+            # Tính từ đầu (API và cận của nhánh chưa duyệt khi dừng sớm); trong lúc tìm kiếm
+            # cận được lấy từ ma trận rút gọn mang theo nhánh
+            nodes = list(unvisited)
+            sub = self._dist_inf[np.ix_([last_city] + nodes, nodes + [0])]
+            sub[0, -1] = np.inf  # Không được quay về 0 khi còn thành phố chưa thăm
+            return current_distance + _reduce(sub)
+        
+        # 'mst'
+        return current_distance + self._mst_weight(unvisited) + \
+            min(dist[last_city][u] for u in unvisited) + min(dist[u][0] for u in unvisited)
+    
+    def _mst_weight(self, nodes) -> float:
+        """Trọng số cây khung nhỏ nhất trên tập thành phố (thuật toán Prim, O(k^2))"""
+        dist = self._dist
+        nodes = list(nodes)
+        root = nodes.pop()
+        best = {u: min(dist[root][u], dist[u][root]) for u in nodes}
+        total = 0.0
+        while best:
+            u = min(best, key=best.__getitem__)
+            total += best.pop(u)
+            row = dist[u]
+            for v in best:
+                weight = min(row[v], dist[v][u])
+                if weight < best[v]:
+                    best[v] = weight
+        return total
+    
+    def _node_bound(self, last_city: int, unvisited, current_distance: float) -> float:
+        """
+        Cận dưới của một nút chưa duyệt, không phụ thuộc trạng thái tìm kiếm (dùng khi dừng sớm)
+        
+        Không có bound: khoảng cách tích lũy + cạnh rời last_city rẻ nhất + cạnh về 0 rẻ nhất.
+        """
+        dist = self._dist
+        if not unvisited:
+            return current_distance + dist[last_city][0]
+        leave = min(dist[last_city][u] for u in unvisited)
+        enter = min(dist[u][0] for u in unvisited)
+        if self.bound is None:
+            return current_distance + leave + enter
+        if self.bound == 'two_edges':
+            remaining = sum(self._two_edge_cost[u] for u in unvisited)
+            return current_distance + (remaining + leave + enter) / 2
+        return self.lower_bound(last_city, unvisited, current_distance)
+    
+    def _record_frontier(self, last_city: int, unvisited, current_distance: float, children):
+        """Ghi nhận cận dưới của các nút con chưa thử (children) của một nút đang mở"""
+        row = self._dist[last_city]
+        for child in children:
+            rest = [u for u in unvisited if u != child]
+            bound = self._node_bound(child, rest, current_distance + row[child])
+            if bound < self._frontier_bound:
+                self._frontier_bound = bound
+    
     def calculate_route_distance(self, route: List[int]) -> float:
         """Tính tổng khoảng cách của một tuyến đường"""
         total_distance = 0
         for i in range(len(route) - 1):
-            total_distance += self.distance_matrix[route[i]][route[i + 1]]
+            total_distance += self._dist[route[i]][route[i + 1]]
         # Quay về thành phố xuất phát
-        total_distance += self.distance_matrix[route[-1]][route[0]]
+        total_distance += self._dist[route[-1]][route[0]]
         return total_distance
     
     def backtrack(self, current_route: List[int], unvisited: set, current_distance: float):
@@ -43,11 +290,16 @@ class TSPBacktracking:
             current_distance: Khoảng cách tích lũy từ đầu
         """
         self.explored_routes += 1
+        if self._monitored and not self.explored_routes % self.SYNC_INTERVAL:
+            if self._checkpoint(self.explored_routes, self.best_distance):
+                self._frontier_bound = min(self._frontier_bound,
+                                           self._node_bound(current_route[-1], unvisited, current_distance))
+                return
         
         # Nếu đã thăm hết tất cả các thành phố
         if len(unvisited) == 0:
             # Tính khoảng cách để quay về thành phố xuất phát
-            final_distance = current_distance + self.distance_matrix[current_route[-1]][current_route[0]]
+            final_distance = current_distance + self._dist[current_route[-1]][current_route[0]]
             
             if final_distance < self.best_distance:
                 self.best_distance = final_distance
@@ -60,12 +312,28 @@ class TSPBacktracking:
         if current_distance >= self.best_distance:
             return
         
+        last_city = current_route[-1]
+        if self.bound is not None:
+            # Nhánh cận: bỏ nhánh nếu cận dưới không thể tốt hơn lời giải hiện có,
+            # rồi thử các thành phố gần nhất trước để sớm có lời giải tốt
+            if self.bound == 'reduced':
+                bound = self._reduced_stack[-1][1]
+            else:
+                bound = self.lower_bound(last_city, unvisited, current_distance)
+            if bound * (1 - BOUND_TOLERANCE) >= self.best_distance:
+                return
+            children = sorted(unvisited, key=self._dist[last_city].__getitem__)
+        else:
+            children = list(unvisited)
+        # Log chỉ giữ các bước đầu tiên: khi đã đủ, vòng lặp không kiểm tra độ dài log nữa
+        log_steps = len(self.steps_log) < 50
+        
         # Thử tất cả các thành phố chưa thăm
-        for next_city in list(unvisited):
-            distance_to_next = self.distance_matrix[current_route[-1]][next_city]
+        for next_city in children:
+            distance_to_next = self._dist[last_city][next_city]
             
             # Ghi lại bước
-            if len(self.steps_log) < 50:  # Giới hạn log để không quá dài
+            if log_steps and len(self.steps_log) < 50:  # Giới hạn log để không quá dài
                 log_msg = f"→ Đi từ {self.cities[current_route[-1]]} sang {self.cities[next_city]} "
                 log_msg += f"(khoảng cách: {distance_to_next:.2f}, tích lũy: {current_distance + distance_to_next:.2f})"
                 self.steps_log.append(log_msg)
@@ -73,6 +341,10 @@ class TSPBacktracking:
             # Thêm thành phố vào tuyến đường
             current_route.append(next_city)
             unvisited.remove(next_city)
+            if self.bound is not None:
+                self._two_edge_remaining -= self._two_edge_cost[next_city]
+                if self.bound == 'reduced':
+                    self._push_reduced(last_city, next_city)
             
             # Gọi đệ quy
             self.backtrack(current_route, unvisited, current_distance + distance_to_next)
@@ -80,10 +352,560 @@ class TSPBacktracking:
             # Quay lui (backtrack)
             current_route.pop()
             unvisited.add(next_city)
+            if self.bound is not None:
+                self._two_edge_remaining += self._two_edge_cost[next_city]
+                if self.bound == 'reduced':
+                    self._reduced_stack.pop()
+            
+            if self.stopped:
+                rest = children[children.index(next_city) + 1:]
+                self._record_frontier(last_city, unvisited, current_distance, rest)
+                break
+    
+    def _push_reduced(self, last_city: int, next_city: int):
+        """Engine 'recursive': đẩy ma trận rút gọn và cận của nút con last_city -> next_city"""
+        parent, cost = self._reduced_stack[-1]
+        child = np.empty_like(parent)
+        self._reduced_stack.append((child, cost + self._reduced_step(parent, child, last_city, next_city)))
+    
+    def _counting_backtrack(self, nodes: List[int], pruned_distance: List[int]):
+        """
+        backtrack() có đếm, dùng cho engine 'recursive' khi có metrics: được gán vào self.backtrack
+        nên các lời gọi đệ quy đều đi qua nó; backtrack() gốc không tốn thêm gì khi không đo.
+        
+        Đếm số nút và số nút bị cắt theo khoảng cách theo độ sâu; số nút mở rộng được suy ra
+        trong _finish_counting() vì mỗi nút mở rộng ở độ sâu d gọi đúng n - 1 - d nút con.
+        """
+        backtrack = self.backtrack
+        
+        def counted(current_route: List[int], unvisited: set, current_distance: float):
+            depth = len(current_route) - 1
+            nodes[depth] += 1
+            if unvisited and current_distance >= self.best_distance:
+                pruned_distance[depth] += 1
+            backtrack(current_route, unvisited, current_distance)
+        return counted
+    
+    def _finish_counting(self, nodes: List[int], pruned_distance: List[int]):
+        """Suy ra số nút mở rộng / bị cắt theo cận từ số nút đếm được bởi _counting_backtrack()"""
+        n = self.n_cities
+        nodes[0] = max(nodes[0], 1)  # Nút gốc do _search_recursive() mở rộng trực tiếp
+        for d in range(n - 1):
+            expanded = -(-nodes[d + 1] // (n - 1 - d))
+            self.depth_counts['expanded'][d] += expanded
+            self.depth_counts['pruned_bound'][d] += max(nodes[d] - expanded - pruned_distance[d], 0)
+    
+    def _search_recursive(self) -> Iterator[int]:
+        """
+        Engine 'recursive' chia theo các cây con mức 1: gọi backtrack() cho từng thành phố
+        thứ hai và yield sau mỗi cây con. Đệ quy không thể tạm dừng giữa chừng nếu không
+        biến mọi nút thành generator (chậm hơn khoảng 1/3), nên sự kiện thưa hơn engine 'iterative'.
+        
+        Yields:
+            Tổng số nút đã khám phá sau mỗi cây con
+        """
+        route = [0]
+        unvisited = set(range(1, self.n_cities))
+        if not unvisited or self.bound is not None and \
+                self.lower_bound(0, unvisited, 0) * (1 - BOUND_TOLERANCE) >= self.best_distance:
+            self.backtrack(route, unvisited, 0)
+            return
+        
+        # Nút gốc, giống như backtrack(route, unvisited, 0)
+        self.explored_routes += 1
+        if self.bound is not None:
+            children = sorted(unvisited, key=self._dist[0].__getitem__)
+        else:
+            children = list(unvisited)
+        
+        finished = 0
+        try:
+            for next_city in children:
+                distance_to_next = self._dist[0][next_city]
+                if len(self.steps_log) < 50:
+                    log_msg = f"→ Đi từ {self.cities[0]} sang {self.cities[next_city]} "
+                    log_msg += f"(khoảng cách: {distance_to_next:.2f}, tích lũy: {distance_to_next:.2f})"
+                    self.steps_log.append(log_msg)
+                
+                route.append(next_city)
+                unvisited.remove(next_city)
+                if self.bound is not None:
+                    self._two_edge_remaining -= self._two_edge_cost[next_city]
+                    if self.bound == 'reduced':
+                        self._push_reduced(0, next_city)
+                
+                self.backtrack(route, unvisited, distance_to_next)
+                
+                route.pop()
+                unvisited.add(next_city)
+                if self.bound is not None:
+                    self._two_edge_remaining += self._two_edge_cost[next_city]
+                    if self.bound == 'reduced':
+                        self._reduced_stack.pop()
+                
+                # Phần chưa duyệt của cây con vừa dừng đã được backtrack() ghi nhận
+                finished += 1
+                if self.stopped:
+                    break
+                yield self.explored_routes
+        finally:
+            if finished < len(children):
+                self._record_frontier(0, unvisited, 0.0, children[finished:])
+    
+    def _search_iterative(self, prefix: List[int], shared_best=None) -> Iterator[int]:
+        """
+        Quay lui không đệ quy trên ngăn xếp tường minh (generator)
+        
+        Trạng thái được giữ trong các mảng cấp phát sẵn theo độ sâu: route (thành phố),
+        partial (khoảng cách tích lũy) và cursor (vị trí thử tiếp theo). Tập chưa thăm
+        là một số nguyên bitmask. Mỗi nút con được kiểm tra (lá, cắt tỉa) ngay khi sinh
+        ra, chỉ nút cần mở rộng mới được đẩy lên ngăn xếp.
+        
+        Args:
+            prefix: Tuyến đường bắt đầu (luôn bắt đầu bằng thành phố 0); chỉ khám phá
+                    cây con bên dưới tiền tố này
+            shared_best: multiprocessing.Value chứa lời giải tốt nhất chung giữa các tiến trình
+                         (tùy chọn). Nhánh chỉ bị cắt bởi giá trị chung khi lớn hơn hẳn, để các
+                         lời giải bằng nhau vẫn được tìm thấy giống như khi chạy tuần tự.
+        
+        Yields:
+            Tổng số nút đã khám phá, sau mỗi SYNC_INTERVAL nút và mỗi khi tìm được lời giải tốt hơn
+            (best_distance, best_route đã được cập nhật)
+        """
+        n = self.n_cities
+        dist = self._dist
+        bound = self.bound
+        tolerance = 1 - BOUND_TOLERANCE
+        
+        # Chế độ nhánh cận thử thành phố gần nhất trước; quay lui thuần túy dùng thứ tự
+        # tự nhiên và lấy bit thấp nhất của mask
+        natural = bound is None
+        child_order = [sorted(range(1, n), key=dist[c].__getitem__) for c in range(n)]
+        return_order = sorted(range(1, n), key=lambda c: dist[c][0])
+        two_edges = bound == 'two_edges'
+        two_edge_cost = self._two_edge_cost if two_edges else None
+        # 'mst': Prim chạy thẳng trên bitmask với trọng số cạnh đối xứng hóa (min hai chiều)
+        # và mảng khóa cấp phát một lần (mỗi cận được tính xong trước khi xuống sâu hơn)
+        if bound == 'mst':
+            sym = [[min(dist[a][b], dist[b][a]) for b in range(n)] for a in range(n)]
+            key = [0.0] * n
+        # 'reduced': ma trận rút gọn và cận của mỗi độ sâu trên ngăn xếp; nút con được ghi
+        # thẳng vào tầng kế tiếp nên khi đi xuống không phải tính lại
+        reduced = bound == 'reduced'
+        if reduced:
+            reduced_step = self._reduced_step
+            matrices = np.empty((n, n, n))
+            reduced_cost = [0.0] * n
+            matrices[0] = self._reduced_root
+            reduced_cost[0] = self._reduced_root_cost
+            for i in range(1, len(prefix)):
+                reduced_cost[i] = reduced_cost[i - 1] + reduced_step(matrices[i - 1], matrices[i],
+                                                                     prefix[i - 1], prefix[i])
+        
+        route = [0] * n
+        partial = [0.0] * n
+        cursor = [0] * n
+        depth = root_depth = len(prefix) - 1
+        mask = (1 << n) - 1
+        for i, city in enumerate(prefix):
+            route[i] = city
+            mask ^= 1 << city
+            if i > 0:
+                partial[i] = partial[i - 1] + dist[prefix[i - 1]][city]
+        two_edge_remaining = 0.0
+        if two_edges:
+            two_edge_remaining = sum(two_edge_cost[c] for c in range(n) if mask >> c & 1)
+        
+        # Cắt nhánh khi giá trị > cutoff, tương đương >= best (và > giá trị chung nếu có)
+        best = self.best_distance
+        cutoff = math.nextafter(best, -math.inf)
+        monitored = self._monitored
+        sync_at = self.SYNC_INTERVAL
+        if shared_best is not None:
+            cutoff = min(cutoff, shared_best.value)
+        improvements = []
+        nodes = 1
+        expanded = [0] * n
+        expanded[root_depth] = 1 if mask else 0
+        pruned_bound = [0] * n
+        if not mask:
+            depth = root_depth - 1  # Tiền tố đã là tuyến đường hoàn chỉnh
+            total = partial[root_depth] + dist[route[root_depth]][0]
+            if total < best:
+                best = self.best_distance = total
+                self.best_route = route[:]
+                improvements.append(total)
+        
+        # Cập nhật trạng thái cả khi người gọi đóng generator giữa chừng
+        try:
+            while depth >= root_depth:
+                last = route[depth]
+                
+                # Thành phố con tiếp theo chưa thăm
+                if natural:
+                    remaining = mask >> cursor[depth] << cursor[depth]
+                    if not remaining:
+                        city = -1
+                    else:
+                        bit = remaining & -remaining
+                        city = bit.bit_length() - 1
+                        cursor[depth] = city + 1
+                else:
+                    order = child_order[last]
+                    i = cursor[depth]
+                    while i < n - 1 and not mask >> order[i] & 1:
+                        i += 1
+                    if i < n - 1:
+                        city = order[i]
+                        bit = 1 << city
+                        cursor[depth] = i + 1
+                    else:
+                        city = -1
+                
+                if city < 0:
+                    # Đã thử hết: quay lui
+                    mask |= 1 << last
+                    if two_edges:
+                        two_edge_remaining += two_edge_cost[last]
+                    depth -= 1
+                    continue
+                
+                nodes += 1
+                if nodes == sync_at:
+                    sync_at += self.SYNC_INTERVAL
+                    if shared_best is not None:
+                        cutoff = min(cutoff, shared_best.value)
+                    if monitored and self._checkpoint(self.explored_routes + nodes, best):
+                        break
+                    yield self.explored_routes + nodes
+                current = partial[depth] + dist[last][city]
+                child_mask = mask ^ bit
+                if not child_mask:
+                    total = current + dist[city][0]
+                    if total < best:
+                        best = self.best_distance = total
+                        cutoff = min(cutoff, math.nextafter(best, -math.inf))
+                        route[depth + 1] = city
+                        self.best_route = route[:]
+                        improvements.append(total)
+                        if shared_best is not None:
+                            with shared_best.get_lock():
+                                if total < shared_best.value:
+                                    shared_best.value = total
+                        yield self.explored_routes + nodes
+                    continue
+                if current > cutoff:
+                    continue
+                
+                if reduced:
+                    estimate = reduced_cost[depth] + reduced_step(matrices[depth], matrices[depth + 1], last, city)
+                    if estimate * tolerance > cutoff:
+                        pruned_bound[depth + 1] += 1
+                        continue
+                    reduced_cost[depth + 1] = estimate
+                elif not natural:
+                    # Cạnh rời city và cạnh về 0 rẻ nhất: thành phố chưa thăm đầu tiên theo thứ tự gần nhất
+                    for c in child_order[city]:
+                        if child_mask >> c & 1:
+                            leave = dist[city][c]
+                            break
+                    for c in return_order:
+                        if child_mask >> c & 1:
+                            enter = dist[c][0]
+                            break
+                    if two_edges:
+                        estimate = current + (two_edge_remaining - two_edge_cost[city] + leave + enter) / 2
+                    else:
+                        # Cây khung nhỏ nhất trên child_mask: mỗi vòng vừa cập nhật khóa theo
+                        # đỉnh mới vào cây vừa chọn đỉnh có khóa nhỏ nhất cho vòng sau
+                        u = child_mask.bit_length() - 1
+                        pending = child_mask ^ (1 << u)
+                        row = sym[u]
+                        nearest = math.inf
+                        rest = pending
+                        while rest:
+                            b = rest & -rest
+                            c = b.bit_length() - 1
+                            k = key[c] = row[c]
+                            if k < nearest:
+                                nearest = k
+                                u = c
+                            rest ^= b
+                        tree = 0.0
+                        while pending:
+                            tree += nearest
+                            pending ^= 1 << u
+                            row = sym[u]
+                            nearest = math.inf
+                            rest = pending
+                            while rest:
+                                b = rest & -rest
+                                c = b.bit_length() - 1
+                                k = key[c]
+                                if row[c] < k:
+                                    k = key[c] = row[c]
+                                if k < nearest:
+                                    nearest = k
+                                    u = c
+                                rest ^= b
+                        estimate = current + tree + leave + enter
+                    if estimate * tolerance > cutoff:
+                        pruned_bound[depth + 1] += 1
+                        continue
+                    if two_edges:
+                        two_edge_remaining -= two_edge_cost[city]
+                
+                depth += 1
+                expanded[depth] += 1
+                route[depth] = city
+                partial[depth] = current
+                cursor[depth] = 0
+                mask = child_mask
+        finally:
+            if depth >= root_depth:
+                # Dừng giữa chừng: ghi nhận cận dưới của các nút con chưa thử trên ngăn xếp.
+                # Thành phố con vừa được sinh ra ở độ sâu cuối cùng chưa được xử lý.
+                cursor[depth] -= 1
+                for d in range(depth, root_depth - 1, -1):
+                    last = route[d]
+                    if natural:
+                        untried = [c for c in range(cursor[d], n) if mask >> c & 1]
+                    else:
+                        untried = [c for c in child_order[last][cursor[d]:] if mask >> c & 1]
+                    self._record_frontier(last, [c for c in range(1, n) if mask >> c & 1],
+                                          partial[d], untried)
+                    mask |= 1 << last
+            self.best_distance = best
+            self.explored_routes += nodes
+            for d in range(n):
+                self.depth_counts['expanded'][d] += expanded[d]
+                self.depth_counts['pruned_bound'][d] += pruned_bound[d]
+            self.steps_log.extend(f"Tìm tuyến đường tốt hơn: {d:.2f}" for d in improvements)
+    
+    def _subtree_prefixes(self) -> List[List[int]]:
+        """
+        Các tiền tố cây con theo đúng thứ tự duyệt của engine 'iterative'
+        
+        Dùng mức 2 (0, a, b) khi mức 1 không đủ nhánh để chia đều cho các tiến trình.
+        """
+        n = self.n_cities
+        if self.bound is None:
+            order = [list(range(1, n)) for _ in range(n)]
+        else:
+            order = [sorted(range(1, n), key=self._dist[c].__getitem__) for c in range(n)]
+        
+        prefixes = [[0, a] for a in order[0]]
+        if len(prefixes) < 4 * self.n_workers and n > 3:
+            prefixes = [[0, a, b] for a in order[0] for b in order[a] if b != a]
+        return prefixes
+    
+    def _search_parallel(self) -> Iterator[int]:
+        """
+        Chia các cây con cho nhiều tiến trình, gộp kết quả theo thứ tự duyệt tuần tự
+        
+        Khi có yêu cầu dừng, hết giờ (hoặc generator bị đóng), lời giải chung được đặt thành
+        -inf để mọi tiến trình cắt hết các nhánh còn lại, các cây con chưa bắt đầu bị hủy;
+        cận dưới của các cây con chưa xong được ghi nhận vào _frontier_bound.
+        
+        Yields:
+            Tổng số nút đã khám phá, sau mỗi PROGRESS_INTERVAL giây hoặc khi một cây con xong;
+            best_distance, best_route là lời giải tốt nhất trong các cây con đã xong
+        """
+        # Chỉ engine song song cần tới; nạp ở đây để import module nhanh hơn
+        import multiprocessing
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+        
+        prefixes = self._subtree_prefixes()
+        initial_best, initial_route = self.best_distance, self.best_route
+        shared_best = multiprocessing.Value('d', initial_best)
+        
+        def merge(results):
+            # Lời giải bằng nhau: ưu tiên cây con đứng trước, giống như khi duyệt tuần tự
+            best_distance, best_route, explored_total = initial_best, initial_route, 0
+            for prefix, (distance, route, explored, _) in results:
+                explored_total += explored
+                if route is not None and distance < best_distance:
+                    best_distance, best_route = distance, route
+            return best_distance, best_route, explored_total
+        
+        def abandon():
+            shared_best.value = -math.inf
+            for prefix, future in zip(prefixes, futures):
+                if not future.done():
+                    future.cancel()
+                    current = sum(self._dist[a][b] for a, b in zip(prefix, prefix[1:]))
+                    unvisited = [c for c in range(1, self.n_cities) if c not in prefix]
+                    self._frontier_bound = min(self._frontier_bound,
+                                               self._node_bound(prefix[-1], unvisited, current))
+        
+        with ProcessPoolExecutor(max_workers=self.n_workers,
+                                 initializer=_init_parallel_worker,
+                                 initargs=(self.cities, self._dist, self.bound, shared_best)) as executor:
+            futures = [executor.submit(_solve_subtree, prefix, initial_best) for prefix in prefixes]
+            pending = set(futures)
+            try:
+                while pending:
+                    _, pending = wait(pending, timeout=self.PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                    finished = [(prefix, f.result()) for prefix, f in zip(prefixes, futures)
+                                if f.done() and not f.cancelled()]
+                    self.best_distance, self.best_route, explored = merge(finished)
+                    if self._monitored and not self.stopped and \
+                            self._checkpoint(self.explored_routes + explored,
+                                             min(self.best_distance, shared_best.value)):
+                        abandon()
+                    yield self.explored_routes + explored
+            finally:
+                if pending and shared_best.value != -math.inf:
+                    abandon()
+            results = [(prefix, f.result()) for prefix, f in zip(prefixes, futures) if not f.cancelled()]
+        
+        self.best_distance, self.best_route = initial_best, initial_route
+        for prefix, (distance, route, explored, counts) in results:
+            self.explored_routes += explored
+            for name, by_depth in counts.items():
+                for d, count in enumerate(by_depth):
+                    self.depth_counts[name][d] += count
+            if route is not None and distance < self.best_distance:
+                self.best_distance = distance
+                self.best_route = route
+                self.steps_log.append(f"Nhánh {' -> '.join(self.cities[c] for c in prefix)}: "
+                                      f"tìm tuyến đường tốt hơn: {distance:.2f}")
+    
+    def solve_iter(self) -> Iterator[dict]:
+        """
+        Giải bài toán TSP bằng Backtracking, trả về sự kiện trong lúc tìm kiếm (lời giải "anytime")
+        
+        Sự kiện được sinh khi tìm được lời giải tốt hơn và định kỳ (tối đa mỗi PROGRESS_INTERVAL
+        giây) để báo số nút; engine 'recursive' chỉ sinh sự kiện sau mỗi cây con mức 1.
+        Người gọi có thể dừng bất cứ lúc nào (break hoặc close()); best_route, best_distance,
+        explored_routes và execution_time luôn phản ánh trạng thái tới thời điểm đó. Khi việc
+        tìm kiếm không chạy hết (dừng, hết giờ hoặc bị đóng), optimal=False và best_lower_bound
+        là cận dưới của độ dài tối ưu (nhỏ nhất giữa lời giải hiện có và các nhánh chưa duyệt).
+        
+        Yields:
+            dict: {'nodes', 'best_distance', 'best_route' (chỉ số thành phố, chỉ đọc),
+                  'improved', 'elapsed'}; sự kiện cuối cùng được sinh khi tìm kiếm kết thúc
+        """
+        start_time = time.perf_counter()
+        self._start_time = self._last_progress = start_time
+        self._deadline = start_time + self.time_limit if self.time_limit is not None else None
+        self.cancelled = self.timed_out = self.stopped = self.optimal = False
+        self._frontier_bound = math.inf
+        metrics = self.metrics
+        
+        if self.bound is not None and self.n_cities > 1:
+            # Lời giải ban đầu từ thuật toán láng giềng gần nhất
+            self.best_route, self.best_distance = self._nearest_neighbour_tour()
+            self.steps_log.append(f"Lời giải ban đầu (láng giềng gần nhất): {self.best_distance:.2f}")
+            self._two_edge_remaining = sum(self._two_edge_cost[u] for u in range(1, self.n_cities))
+            if self.bound == 'reduced':
+                self._reduced_stack = [(self._reduced_root, self._reduced_root_cost)]
+        
+        if self.initial_route is not None and self.n_cities > 1:
+            # Xoay tuyến cho trước để bắt đầu từ thành phố 0 như mọi tuyến của bộ giải
+            start = self.initial_route.index(0)
+            route = self.initial_route[start:] + self.initial_route[:start]
+            distance = self.calculate_route_distance(route)
+            if distance < self.best_distance:
+                self.best_route, self.best_distance = route, distance
+                self.steps_log.append(f"Lời giải ban đầu (tuyến cho trước): {distance:.2f}")
+        
+        search_start = time.perf_counter()
+        if metrics is not None:
+            metrics.add_time('backtracking_phase', search_start - start_time, phase='initial')
+        
+        counting = None
+        if self.n_workers > 1 and self.n_cities > 3:
+            search = self._search_parallel()
+        elif self.engine == 'iterative':
+            search = self._search_iterative([0])
+        else:
+            search = self._search_recursive()
+            if metrics is not None:
+                counting = [0] * self.n_cities, [0] * self.n_cities
+                self.backtrack = self._counting_backtrack(*counting)
+        
+        def event(nodes, improved):
+            return {'nodes': nodes, 'best_distance': self.best_distance, 'best_route': self.best_route,
+                    'improved': improved, 'elapsed': time.perf_counter() - start_time}
+        
+        started = completed = False
+        try:
+            last_event = start_time
+            best = self.best_distance
+            if self.best_route is not None:
+                yield event(0, True)
+            started = True
+            for nodes in search:
+                improved = self.best_distance < best
+                if improved and metrics is not None:
+                    self._observe_improvement(best, time.perf_counter() - start_time)
+                if improved or time.perf_counter() - last_event >= self.PROGRESS_INTERVAL:
+                    best = self.best_distance
+                    yield event(nodes, improved)
+                    last_event = time.perf_counter()
+            completed = True
+        finally:
+            search.close()
+            self.execution_time = time.perf_counter() - start_time
+            if counting is not None:
+                del self.backtrack
+                self._finish_counting(*counting)
+            if metrics is not None:
+                metrics.add_time('backtracking_phase', start_time + self.execution_time - search_start,
+                                 phase='search')
+                self._record_counters()
+            self.nodes_per_sec = self.explored_routes / self.execution_time if self.execution_time > 0 else 0.0
+            self.optimal = completed and not self.stopped
+            if self.optimal:
+                self.best_lower_bound = self.best_distance
+            else:
+                if not started:
+                    self._frontier_bound = self._node_bound(0, list(range(1, self.n_cities)), 0.0)
+                self.best_lower_bound = min(self.best_distance, self._frontier_bound)
+            if self.cancelled:
+                self.steps_log.append(f"Đã dừng theo yêu cầu sau {self.explored_routes} nút")
+            elif self.timed_out:
+                self.steps_log.append(f"Hết thời gian sau {self.explored_routes} nút, "
+                                      f"cận dưới tốt nhất: {self.best_lower_bound:.2f}")
+        yield event(self.explored_routes, self.best_distance < best)
+    
+    def _observe_improvement(self, previous: float, elapsed: float):
+        """Ghi một lần tìm được lời giải tốt hơn vào histogram (mức cải thiện tương đối, thời điểm)"""
+        if previous < math.inf:
+            self.metrics.observe('backtracking_improvement_gain',
+                                 (previous - self.best_distance) / previous, GAIN_BUCKETS)
+        self.metrics.observe('backtracking_improvement_seconds', elapsed)
+    
+    def node_counts(self) -> dict:
+        """
+        Phân loại các nút đã khám phá: mở rộng, lá (tuyến hoàn chỉnh), bị cắt theo khoảng cách
+        tích lũy và bị cắt theo cận dưới
+        
+        Mỗi nút được mở rộng ở độ sâu n - 2 có đúng một nút con là lá, nên số lá bằng số nút
+        mở rộng ở độ sâu đó; nút bị cắt theo khoảng cách là phần còn lại. Khi dừng giữa chừng,
+        các số có thể lệch vài nút. Engine 'recursive' chỉ phân loại khi có metrics.
+        """
+        expanded = sum(self.depth_counts['expanded'])
+        pruned_bound = sum(self.depth_counts['pruned_bound'])
+        leaves = self.depth_counts['expanded'][self.n_cities - 2] if self.n_cities > 1 else 0
+        return {'nodes': self.explored_routes, 'expanded': expanded, 'leaves': leaves,
+                'pruned_distance': max(self.explored_routes - expanded - leaves - pruned_bound, 0),
+                'pruned_bound': pruned_bound}
+    
+    def _record_counters(self):
+        """Cộng các bộ đếm nút của lần giải vào metrics"""
+        counts = self.node_counts()
+        metrics = self.metrics
+        metrics.inc('backtracking_nodes', counts['nodes'])
+        metrics.inc('backtracking_expanded', counts['expanded'])
+        metrics.inc('backtracking_leaves', counts['leaves'])
+        metrics.inc('backtracking_pruned', counts['pruned_distance'], reason='distance')
+        metrics.inc('backtracking_pruned', counts['pruned_bound'], reason='bound')
     
     def solve(self, verbose: bool = False) -> dict:
         """
-        Giải bài toán TSP bằng Backtracking
+        Giải bài toán TSP bằng Backtracking (chạy hết solve_iter())
         
         Args:
             verbose: In chi tiết các bước
@@ -91,35 +913,36 @@ class TSPBacktracking:
         Returns:
             dict: Kết quả gồm tuyến đường, khoảng cách, thời gian, log
         """
-        start_time = time.time()
-        
         if verbose:
             print(f"\n{'='*70}")
             print(f"THUẬT TOÁN BACKTRACKING - GIẢI BÀI TOÁN NGƯỜI DU LỊCH")
             print(f"{'='*70}")
             print(f"Số thành phố: {self.n_cities}")
             print(f"Danh sách thành phố: {', '.join(self.cities)}")
-            print(f"Phương pháp: Quay lui (Backtracking)")
+            if self.bound is not None:
+                print(f"Phương pháp: Nhánh cận (Branch and Bound), cận dưới: {self.bound}")
+            else:
+                print(f"Phương pháp: Quay lui (Backtracking)")
             print(f"Độ phức tạp: O(n!) - Tất cả các hoán vị")
+            if self.n_workers > 1:
+                print(f"Số tiến trình song song: {self.n_workers}")
             print(f"{'='*70}\n")
         
-        # Bắt đầu từ thành phố 0
-        initial_route = [0]
-        unvisited = set(range(1, self.n_cities))
-        
-        self.backtrack(initial_route, unvisited, 0)
+        for _ in self.solve_iter():
+            pass
         
-        self.execution_time = time.time() - start_time
+        # Chuyển đổi route từ index sang tên thành phố (rỗng nếu bị dừng trước khi có lời giải)
+        best_route_names = [self.cities[i] for i in self.best_route] if self.best_route is not None else []
         
-        # Chuyển đổi route từ index sang tên thành phố
-        best_route_names = [self.cities[i] for i in self.best_route]
-        
-        if verbose:
+        if verbose and best_route_names:
             print(f"\nKếT QUẢ:")
             print(f"Tuyến đường tốt nhất: {' -> '.join(best_route_names)} -> {best_route_names[0]}")
             print(f"Tổng khoảng cách: {self.best_distance:.2f} km")
             print(f"Thời gian thực thi: {self.execution_time:.4f} giây")
             print(f"Số tuyến đường khám phá: {self.explored_routes}")
+            print(f"Tốc độ: {self.nodes_per_sec:,.0f} nút/giây")
+            if not self.optimal:
+                print(f"Chưa chứng minh tối ưu, cận dưới: {self.best_lower_bound:.2f}")
             print(f"{'='*70}\n")
         
         return {
@@ -128,5 +951,38 @@ class TSPBacktracking:
             'time': self.execution_time,
             'algorithm': 'Backtracking (Quay lui)',
             'explored_routes': self.explored_routes,
+            'nodes_per_sec': self.nodes_per_sec,
+            'bound': self.bound,
+            'cancelled': self.cancelled,
+            'timed_out': self.timed_out,
+            'optimal': self.optimal,
+            'lower_bound': self.best_lower_bound,
             'steps': self.steps_log
         }
+
+
+# Trạng thái của mỗi tiến trình con trong chế độ song song
+_worker_solver = None
+_worker_shared_best = None
+
+def _init_parallel_worker(cities: List[str], distance_matrix, bound: Optional[str], shared_best):
+    """Khởi tạo bộ giải một lần cho mỗi tiến trình con"""
+    global _worker_solver, _worker_shared_best
+    _worker_solver = TSPBacktracking(cities, distance_matrix, bound=bound, engine='iterative')
+    _worker_shared_best = shared_best
+
+def _solve_subtree(prefix: List[int], initial_best: float) -> Tuple[float, Optional[List[int]], int, dict]:
+    """
+    Khám phá một cây con; trả về (khoảng cách tốt nhất, tuyến đường hoặc None, số nút,
+    depth_counts)
+    """
+    solver = _worker_solver
+    solver.best_distance = initial_best
+    solver.best_route = None
+    solver.explored_routes = 0
+    solver.depth_counts = {name: [0] * solver.n_cities for name in solver.depth_counts}
+    solver.steps_log = []
+    for _ in solver._search_iterative(prefix, shared_best=_worker_shared_best):
+        pass
+    return (solver.best_distance, solver.best_route, solver.explored_routes,
+            solver.depth_counts)
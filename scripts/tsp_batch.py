@@ -0,0 +1,465 @@
+"""
+Travelling Salesman Problem - Batch Runner
+Giải hàng loạt bài toán từ một thư mục (.tsp, .tsp.gz, .json) hoặc một file nhiều bài toán
+(CSV, JSONL) bằng một nhóm tiến trình con; mỗi bài toán xong được ghi ngay thành một dòng JSONL
+
+Bài toán được đọc dần từ nguồn: chỉ khi có tiến trình rảnh mới đọc bài toán tiếp theo,
+nên số bài toán đang xử lý không vượt quá số tiến trình. Tiến trình chạy quá giờ bị dừng,
+tiến trình chết giữa chừng được khởi động lại và bài toán được giải lại (retries).
+
+Cách dùng:
+    python tsp_batch.py data/instances/ --solver aco --workers 4 -o results.jsonl
+    python tsp_batch.py routes.csv --solver backtracking --time-limit 5 --retries 2
+    python tsp_batch.py routes.jsonl --param n_iterations=50 --metrics metrics.json
+    python tsp_batch.py data/instances/ --solver held_karp --cache-dir .tsp_cache
+
+Định dạng đầu vào:
+    - Thư mục: mỗi file .tsp/.tsp.gz (TSPLIB) hoặc .json (một bài toán như một dòng JSONL)
+    - JSONL: mỗi dòng {"name": ..., "cities": [...], "coordinates": [[x, y], ...],
+      "metric": "euclidean"} hoặc {"name": ..., "distance_matrix": [[...], ...]};
+      "time_limit" (giây) tùy chọn, ghi đè --time-limit
+    - CSV: các cột instance, city (tùy chọn) và x, y (Euclid) hoặc lat, lon (haversine);
+      các dòng của cùng một bài toán phải liền nhau
+"""
+
+import argparse
+import collections
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing import connection
+from typing import Callable, Iterator, List, Optional, TextIO
+
+from tsp_benchmark import SOLVERS
+from tsp_cache import ResultCache, cached_solve
+from tsp_main import instance_from_record, load_instance, parse_param
+from tsp_metrics import Metrics
+
+# Đuôi file được nhận là một bài toán khi đọc thư mục
+INSTANCE_SUFFIXES = ('.tsp', '.tsp.gz', '.json')
+
+# Bộ giải hỗ trợ time_limit (dừng đúng hạn và trả về lời giải tốt nhất hiện có)
+TIME_LIMIT_SOLVERS = ('backtracking', 'aco', 'aco_ls')
+
+
+def _stem(path: str) -> str:
+    """Tên file không có thư mục và đuôi bài toán"""
+    name = os.path.basename(path)
+    for suffix in INSTANCE_SUFFIXES + ('.jsonl', '.csv'):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def _read_csv(path: str) -> Iterator[dict]:
+    """Các bài toán của file CSV, mỗi nhóm dòng liền nhau cùng cột instance là một bài toán"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        fields = set(reader.fieldnames or ())
+        if {'lat', 'lon'} <= fields:
+            columns, metric = ('lat', 'lon'), 'haversine'
+        elif {'x', 'y'} <= fields:
+            columns, metric = ('x', 'y'), 'euclidean'
+        else:
+            raise ValueError(f"File CSV phải có cột x, y hoặc lat, lon: {path}")
+        if 'instance' not in fields:
+            raise ValueError(f"File CSV phải có cột instance: {path}")
+
+        record = None
+        for row in reader:
+            if record is None or row['instance'] != record['name']:
+                if record is not None:
+                    yield record
+                record = {'name': row['instance'], 'cities': [], 'coordinates': [], 'metric': metric}
+            record['cities'].append(row.get('city') or f"Thanh pho {len(record['cities']) + 1}")
+            try:
+                record['coordinates'].append([float(row[column]) for column in columns])
+            except ValueError:
+                record['error'] = f"Tọa độ không hợp lệ ở dòng {reader.line_num}"
+        if record is not None:
+            yield record
+
+
+def _read_jsonl(path: str) -> Iterator[dict]:
+    """Các bài toán của file JSONL (mỗi dòng một bài toán); dòng lỗi thành bài toán có 'error'"""
+    stem = _stem(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError('mỗi dòng phải là một object JSON')
+            except ValueError as e:
+                yield {'name': f'{stem}-{line_number}', 'error': f"Dòng {line_number} không hợp lệ: {e}"}
+                continue
+            record.setdefault('name', f'{stem}-{line_number}')
+            yield record
+
+
+def iter_instances(path: str) -> Iterator[dict]:
+    """
+    Đọc dần các bài toán từ thư mục hoặc file
+
+    Bài toán trong thư mục hoặc file TSPLIB/JSON đơn được trả về dạng {'name', 'path'}
+    và chỉ được đọc trong tiến trình con; bài toán trong CSV/JSONL được trả về nguyên dạng.
+
+    Args:
+        path: Thư mục, hoặc file .csv, .jsonl, .tsp, .tsp.gz, .json
+
+    Yields:
+        dict: Mô tả một bài toán (luôn có 'name'; có 'error' nếu không đọc được)
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(INSTANCE_SUFFIXES):
+                yield {'name': _stem(name), 'path': os.path.join(path, name)}
+    elif path.endswith('.csv'):
+        yield from _read_csv(path)
+    elif path.endswith('.jsonl'):
+        yield from _read_jsonl(path)
+    elif path.endswith(INSTANCE_SUFFIXES):
+        yield {'name': _stem(path), 'path': path}
+    else:
+        raise ValueError(f"Không nhận ra định dạng đầu vào: {path}")
+
+
+def load_record(record: dict, metric: str = 'euclidean'):
+    """
+    Dựng bài toán từ mô tả của iter_instances (file, hoặc dict như một dòng JSONL)
+
+    Returns:
+        (cities, distance_matrix)
+    """
+    if 'path' in record:
+        cities, matrix, _ = load_instance(record['path'], metric)
+    else:
+        cities, matrix, _ = instance_from_record(record, metric)
+    return cities, matrix
+
+
+def solve_record(record: dict, solver_name: str, params: dict, seed: int,
+                 time_limit: Optional[float], metric: str = 'euclidean',
+                 cache: Optional[ResultCache] = None) -> dict:
+    """
+    Giải một bài toán (chạy trong tiến trình con)
+
+    Args:
+        cache: Bộ nhớ đệm kết quả (tsp_cache); None - luôn giải
+
+    Returns:
+        dict: Kết quả gồm n, distance, route (tên thành phố), time, timed_out và cached
+    """
+    spec = SOLVERS[solver_name]
+    cities, matrix = load_record(record, metric)
+    n = len(cities)
+    if spec['max_cities'] is not None and n > spec['max_cities']:
+        raise ValueError(f"Bài toán có {n} thành phố, vượt giới hạn {spec['max_cities']} của {solver_name}")
+
+    if time_limit is not None and solver_name in TIME_LIMIT_SOLVERS:
+        params = {'time_limit': time_limit, **params}
+    solver = spec['factory'](cities, matrix, seed, **params)
+    start = time.perf_counter()
+    result = cached_solve(solver, cache) if cache is not None else solver.solve()
+    elapsed = time.perf_counter() - start
+    return {
+        'n': n,
+        'distance': float(result['distance']),
+        'route': result['route'],
+        'time': elapsed,
+        'timed_out': bool(result.get('timed_out') or result.get('stop_reason') == 'time_limit'),
+        'cached': bool(result.get('cached')),
+    }
+
+
+def _worker(conn, solver_name: str, params: dict, seed: int, metric: str,
+            cache_dir: Optional[str] = None):
+    """Vòng lặp của tiến trình con: nhận (chỉ số, bài toán, time_limit), gửi lại kết quả"""
+    # Các tiến trình con dùng chung thư mục bộ nhớ đệm (file được ghi nguyên tử)
+    cache = ResultCache(cache_dir=cache_dir) if cache_dir is not None else None
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        index, record, time_limit = task
+        try:
+            reply = ('ok', index, solve_record(record, solver_name, params, seed, time_limit, metric, cache))
+        except Exception as e:
+            reply = ('error', index, f'{type(e).__name__}: {e}')
+        conn.send(reply)
+
+
+class _Task:
+    def __init__(self, index: int, record: dict, time_limit: Optional[float]):
+        self.index = index
+        self.record = record
+        self.time_limit = time_limit
+        self.attempts = 0
+
+
+class BatchRunner:
+    def __init__(self, solver: str = 'aco', params: Optional[dict] = None,
+                 n_workers: Optional[int] = None, time_limit: Optional[float] = None,
+                 kill_after: float = 5.0, retries: int = 1, seed: int = 0,
+                 metric: str = 'euclidean', metrics: Optional[Metrics] = None,
+                 cache_dir: Optional[str] = None):
+        """
+        Giải hàng loạt bài toán bằng một nhóm tiến trình con
+
+        Args:
+            solver: Tên bộ giải đã đăng ký trong tsp_benchmark.SOLVERS
+            params: Tham số truyền thêm cho bộ giải
+            n_workers: Số tiến trình con (None - số lõi CPU), cũng là số bài toán đang xử lý tối đa
+            time_limit: Giới hạn thời gian mỗi bài toán (giây, None - không giới hạn). Bộ giải
+                        hỗ trợ time_limit dừng đúng hạn và trả về lời giải tốt nhất hiện có
+            kill_after: Số giây chờ thêm sau time_limit trước khi dừng hẳn tiến trình con
+                        (bài toán bị ghi lỗi 'timeout')
+            retries: Số lần giải lại khi tiến trình con chết giữa chừng
+            seed: Hạt giống của bộ giải (ACO)
+            metric: Metric cho tọa độ khi bài toán không ghi 'metric'
+            metrics: Metrics (tsp_metrics) nhận số bài toán theo trạng thái, số lần giải lại,
+                     số lần dùng lại kết quả và histogram thời gian giải
+            cache_dir: Thư mục bộ nhớ đệm kết quả (tsp_cache.ResultCache) dùng chung giữa các
+                       tiến trình con và các lần chạy (None - không dùng). Chỉ kết quả dùng lại
+                       được mới được lưu (bộ giải chính xác giải xong, ACO có seed và không
+                       có time_limit)
+        """
+        if solver not in SOLVERS:
+            raise ValueError(f"Bộ giải không tồn tại: {solver!r}")
+        if time_limit is not None and time_limit <= 0:
+            raise ValueError(f"time_limit phải > 0, nhận được: {time_limit}")
+        if retries < 0:
+            raise ValueError(f"retries phải >= 0, nhận được: {retries}")
+
+        self.solver = solver
+        self.params = params or {}
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.time_limit = time_limit
+        self.kill_after = kill_after
+        self.retries = retries
+        self.seed = seed
+        self.metric = metric
+        self.metrics = metrics
+        self.cache_dir = os.fspath(cache_dir) if cache_dir is not None else None
+        self.context = multiprocessing.get_context()
+        self.stats = {}
+
+    def _start_worker(self):
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=_worker, daemon=True,
+                                       args=(child_conn, self.solver, self.params, self.seed, self.metric,
+                                             self.cache_dir))
+        process.start()
+        child_conn.close()
+        return {'process': process, 'conn': parent_conn, 'task': None, 'deadline': None}
+
+    @staticmethod
+    def _stop_worker(worker: dict):
+        process = worker['process']
+        if process.is_alive():
+            process.terminate()
+        process.join(timeout=1)
+        worker['conn'].close()
+
+    def _dispatch(self, worker: dict, task: _Task):
+        task.attempts += 1
+        worker['task'] = task
+        # Hạn chót cứng chỉ có khi có time_limit (bài toán hoặc mặc định)
+        worker['deadline'] = (time.monotonic() + task.time_limit + self.kill_after
+                              if task.time_limit is not None else None)
+        worker['conn'].send((task.index, task.record, task.time_limit))
+
+    def run(self, instances, on_result: Optional[Callable[[dict], None]] = None) -> dict:
+        """
+        Giải các bài toán, gọi on_result với từng dòng kết quả ngay khi bài toán xong
+
+        Dòng kết quả gồm index (thứ tự trong đầu vào), instance, solver, status ('ok', 'error'
+        hoặc 'timeout'), attempts, và n, distance, route, time, timed_out, cached khi status là 'ok'
+        hoặc error khi có lỗi. Kết quả đến theo thứ tự giải xong, không theo thứ tự đầu vào.
+
+        Args:
+            instances: Các mô tả bài toán (ví dụ iter_instances(path)), được đọc dần
+            on_result: Hàm nhận từng dòng kết quả
+
+        Returns:
+            dict: Thống kê: instances, ok, failed, timed_out (dừng theo time_limit), killed,
+                  retries, cached (lấy từ bộ nhớ đệm), elapsed, instances_per_second
+        """
+        stats = self.stats = {'instances': 0, 'ok': 0, 'failed': 0, 'timed_out': 0, 'killed': 0,
+                              'retries': 0, 'cached': 0, 'elapsed': 0.0, 'instances_per_second': 0.0}
+        metrics = self.metrics
+        start = time.perf_counter()
+        source = enumerate(instances)
+        retry_queue = collections.deque()
+        exhausted = False
+
+        def emit(task: _Task, row: dict):
+            row = {'index': task.index, 'instance': task.record.get('name'), 'solver': self.solver,
+                   'attempts': task.attempts, **row}
+            stats['instances'] += 1
+            if row['status'] == 'ok':
+                stats['ok'] += 1
+                stats['timed_out'] += row['timed_out']
+                stats['cached'] += row['cached']
+            else:
+                stats['failed'] += 1
+                stats['killed'] += row['status'] == 'timeout'
+            if metrics is not None:
+                metrics.inc('batch_instances', status=row['status'])
+                if row['status'] == 'ok':
+                    metrics.observe('batch_solve_seconds', row['time'])
+                    if row['cached']:
+                        metrics.inc('batch_cache_hits')
+            if on_result is not None:
+                on_result(row)
+
+        def next_task() -> Optional[_Task]:
+            nonlocal exhausted
+            while retry_queue or not exhausted:
+                if retry_queue:
+                    return retry_queue.popleft()
+                try:
+                    index, record = next(source)
+                except StopIteration:
+                    exhausted = True
+                    return None
+                task = _Task(index, record, record.get('time_limit', self.time_limit))
+                if 'error' in record:
+                    # Lỗi khi đọc đầu vào: ghi ngay, không gửi cho tiến trình con
+                    emit(task, {'status': 'error', 'error': record['error']})
+                    continue
+                return task
+            return None
+
+        def fail(worker: dict, status: str, error: str):
+            """Tiến trình con chết hoặc quá giờ: khởi động lại, giải lại bài toán nếu còn lượt"""
+            task = worker['task']
+            self._stop_worker(worker)
+            workers[workers.index(worker)] = self._start_worker()
+            if status == 'error' and task.attempts <= self.retries:
+                stats['retries'] += 1
+                if metrics is not None:
+                    metrics.inc('batch_retries')
+                retry_queue.append(task)
+            else:
+                emit(task, {'status': status, 'error': error})
+
+        workers = [self._start_worker() for _ in range(self.n_workers)]
+        try:
+            while True:
+                for worker in workers:
+                    if worker['task'] is None:
+                        task = next_task()
+                        if task is None:
+                            break
+                        self._dispatch(worker, task)
+                busy = [worker for worker in workers if worker['task'] is not None]
+                if not busy:
+                    break
+
+                deadlines = [worker['deadline'] for worker in busy if worker['deadline'] is not None]
+                timeout = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+                ready = connection.wait([worker['conn'] for worker in busy] +
+                                        [worker['process'].sentinel for worker in busy], timeout)
+
+                for worker in busy:
+                    if worker['conn'] in ready:
+                        try:
+                            status, _, payload = worker['conn'].recv()
+                        except (EOFError, OSError):
+                            worker['process'].join(timeout=1)
+                            fail(worker, 'error', f"Tiến trình con dừng bất thường (mã {worker['process'].exitcode})")
+                            continue
+                        task, worker['task'] = worker['task'], None
+                        if status == 'ok':
+                            emit(task, {'status': 'ok', **payload})
+                        else:
+                            emit(task, {'status': 'error', 'error': payload})
+                    elif worker['process'].sentinel in ready:
+                        worker['process'].join(timeout=1)
+                        fail(worker, 'error', f"Tiến trình con dừng bất thường (mã {worker['process'].exitcode})")
+                    elif worker['deadline'] is not None and time.monotonic() >= worker['deadline']:
+                        fail(worker, 'timeout', f"Quá thời gian {worker['task'].time_limit + self.kill_after:.1f} giây")
+        finally:
+            for worker in workers:
+                if worker['task'] is None and worker['process'].is_alive():
+                    try:
+                        worker['conn'].send(None)
+                    except OSError:
+                        pass
+                    worker['process'].join(timeout=1)
+                self._stop_worker(worker)
+
+        stats['elapsed'] = time.perf_counter() - start
+        stats['instances_per_second'] = stats['instances'] / stats['elapsed'] if stats['elapsed'] > 0 else 0.0
+        return stats
+
+
+def write_jsonl(stream: TextIO) -> Callable[[dict], None]:
+    """Hàm ghi mỗi dòng kết quả thành một dòng JSON và đẩy ngay ra stream"""
+    def write(row: dict):
+        stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+        stream.flush()
+    return write
+
+
+def format_stats(stats: dict) -> str:
+    """Thống kê một lần chạy dạng văn bản"""
+    return (f"{stats['instances']} bài toán ({stats['ok']} thành công, {stats['failed']} lỗi, "
+            f"{stats['killed']} quá giờ bị dừng, {stats['timed_out']} dừng theo time_limit, "
+            f"{stats['retries']} lần giải lại, {stats['cached']} lấy từ bộ nhớ đệm) trong {stats['elapsed']:.2f} giây - "
+            f"{stats['instances_per_second']:.2f} bài toán/giây")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Giải hàng loạt bài toán TSP')
+    parser.add_argument('input', help='Thư mục bài toán hoặc file .csv, .jsonl, .tsp, .json')
+    parser.add_argument('-o', '--output', help='File kết quả JSONL (mặc định: in ra màn hình)')
+    parser.add_argument('--solver', default='aco', choices=sorted(SOLVERS), help='Bộ giải (mặc định: aco)')
+    parser.add_argument('--param', action='append', metavar='NAME=VALUE',
+                        help='Tham số của bộ giải, ví dụ n_ants=20 (có thể lặp lại)')
+    parser.add_argument('--workers', type=int, help='Số tiến trình con (mặc định: số lõi CPU)')
+    parser.add_argument('--time-limit', type=float, help='Giới hạn thời gian mỗi bài toán (giây)')
+    parser.add_argument('--kill-after', type=float, default=5.0,
+                        help='Số giây chờ thêm sau time-limit trước khi dừng tiến trình con')
+    parser.add_argument('--retries', type=int, default=1, help='Số lần giải lại khi tiến trình con chết')
+    parser.add_argument('--seed', type=int, default=0, help='Hạt giống của bộ giải')
+    parser.add_argument('--metric', default='euclidean', choices=('euclidean', 'haversine'),
+                        help='Metric cho tọa độ khi bài toán không ghi metric')
+    parser.add_argument('--metrics', help='Ghi số liệu (tsp_metrics) ra file JSON')
+    parser.add_argument('--cache-dir', help='Thư mục bộ nhớ đệm kết quả, dùng lại giữa các lần chạy')
+    args = parser.parse_args(argv)
+
+    try:
+        params = parse_param(args.param)
+        metrics = Metrics() if args.metrics else None
+        runner = BatchRunner(args.solver, params, args.workers, args.time_limit, args.kill_after,
+                             args.retries, args.seed, args.metric, metrics, args.cache_dir)
+    except ValueError as e:
+        parser.error(str(e))
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        stats = runner.run(iter_instances(args.input), write_jsonl(output))
+    except (OSError, ValueError) as e:
+        # Đầu vào không đọc được (không tồn tại, sai định dạng, thiếu cột CSV)
+        parser.error(str(e))
+    finally:
+        if args.output:
+            output.close()
+
+    print(format_stats(stats), file=sys.stderr)
+    if metrics is not None:
+        metrics.to_json(args.metrics)
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
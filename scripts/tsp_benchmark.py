@@ -0,0 +1,469 @@
+"""
+Travelling Salesman Problem - Benchmark Suite
+Chạy các bộ giải trên bộ bài toán TSPLIB đi kèm (đã biết độ dài tối ưu) hoặc trên bài toán
+ngẫu nhiên theo số thành phố, báo cáo sai số so với tối ưu (gap), thời gian thực thi,
+thông lượng và bộ nhớ đỉnh; ghi kết quả JSON/CSV và so sánh với kết quả cơ sở
+
+Cách dùng:
+    python tsp_benchmark.py suite --solvers aco aco_ls --repeats 5 --json result.json
+    python tsp_benchmark.py sweep --sizes 8 10 12 --param aco:n_ants=10,20 --csv sweep.csv
+    python tsp_benchmark.py compare baseline.json result.json --threshold 10
+"""
+
+import argparse
+import ast
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: không đo được bộ nhớ đỉnh
+    resource = None
+
+from tsp_aco import TSP_ACO
+from tsp_backtracking import TSPBacktracking
+from tsp_distance import euclidean_matrix
+from tsp_held_karp import TSPHeldKarp
+from tsp_tsplib import load_tsplib
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'tsplib'))
+
+# Độ dài tối ưu đã công bố của các bài toán đi kèm (TSPLIB)
+KNOWN_OPTIMA = {
+    'burma14': 3323,
+    'ulysses16': 6859,
+    'gr17': 2085,
+    'ulysses22': 7013,
+    'att48': 10628,
+    'berlin52': 7542,
+}
+
+# Kích thước vùng sinh tọa độ của bài toán ngẫu nhiên
+RANDOM_EXTENT = 1000.0
+
+# Các cột của file CSV
+FIELDS = ('instance', 'n', 'solver', 'params', 'seed', 'distance', 'optimum', 'gap',
+          'time', 'throughput', 'unit', 'peak_rss_mb')
+
+# Các bộ giải được đo: tên -> factory(cities, distance_matrix, seed, **params), số thành phố
+# tối đa, hàm thông lượng (solver, result, elapsed) và đơn vị
+SOLVERS = {}
+
+
+def register_solver(name: str, factory: Callable, max_cities: Optional[int] = None,
+                    throughput: Optional[Callable] = None, unit: str = ''):
+    """
+    Đăng ký một bộ giải cho bộ benchmark
+
+    Args:
+        name: Tên bộ giải
+        factory: Hàm (cities, distance_matrix, seed, **params) -> đối tượng có phương thức solve()
+        max_cities: Bỏ qua các bài toán lớn hơn (None - không giới hạn)
+        throughput: Hàm (solver, result, elapsed) -> thông lượng (None - không báo cáo)
+        unit: Đơn vị thông lượng
+    """
+    SOLVERS[name] = {'factory': factory, 'max_cities': max_cities,
+                     'throughput': throughput, 'unit': unit}
+
+
+register_solver(
+    'backtracking',
+    lambda cities, matrix, seed, **params: TSPBacktracking(
+        cities, matrix, **{'bound': 'mst', 'engine': 'iterative', **params}),
+    max_cities=14,
+    throughput=lambda solver, result, elapsed: result['explored_routes'] / elapsed,
+    unit='nút/s')
+register_solver(
+    'held_karp',
+    lambda cities, matrix, seed, **params: TSPHeldKarp(
+        cities, matrix, **{'memory_bounded': True, **params}),
+    max_cities=22,
+    throughput=lambda solver, result, elapsed: result['explored_routes'] / elapsed,
+    unit='trạng thái/s')
+# ACO có thể dừng trước n_iterations (time_limit, stagnation_limit, convergence_tol):
+# thông lượng tính theo số vòng lặp đã chạy thật (iterations_run)
+register_solver(
+    'aco',
+    lambda cities, matrix, seed, **params: TSP_ACO(
+        cities, matrix, **{'n_iterations': 100, 'engine': 'numpy', 'seed': seed, **params}),
+    throughput=lambda solver, result, elapsed: solver.iterations_run / elapsed,
+    unit='vòng lặp/s')
+register_solver(
+    'aco_ls',
+    lambda cities, matrix, seed, **params: TSP_ACO(
+        cities, matrix, **{'n_iterations': 50, 'engine': 'numpy', 'seed': seed,
+                           'n_candidates': 15, 'local_search': 'best', **params}),
+    throughput=lambda solver, result, elapsed: solver.iterations_run / elapsed,
+    unit='vòng lặp/s')
+
+
+def list_instances(data_dir: str = DATA_DIR) -> List[str]:
+    """Tên các bài toán (.tsp) trong thư mục dữ liệu, sắp xếp theo tên"""
+    return sorted(name[:-len('.tsp')] for name in os.listdir(data_dir) if name.endswith('.tsp'))
+
+
+def random_instance(n: int, seed: int) -> Tuple[List[str], np.ndarray]:
+    """Bài toán ngẫu nhiên: n điểm đều trong hình vuông, khoảng cách Euclid"""
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0, RANDOM_EXTENT, size=(n, 2))
+    return [f'Thanh pho {i + 1}' for i in range(n)], euclidean_matrix(points)
+
+
+def _load_instance(source: tuple):
+    """Nạp bài toán từ mô tả ('tsplib', tên, thư mục) hoặc ('random', n, hạt giống)"""
+    if source[0] == 'tsplib':
+        _, name, data_dir = source
+        instance = load_tsplib(os.path.join(data_dir, name + '.tsp'))
+        return name, instance.cities, instance.distance_matrix(), KNOWN_OPTIMA.get(name)
+    _, n, seed = source
+    cities, matrix = random_instance(n, seed)
+    return f'random-{n}', cities, matrix, None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Bộ nhớ đỉnh (MB) của tiến trình hiện tại"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux trả về KB, macOS trả về byte
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def run_trial(source: tuple, solver_name: str, seed: int, params: Optional[dict] = None) -> dict:
+    """
+    Chạy một lần đo: nạp bài toán, giải và đo thời gian bằng time.perf_counter
+
+    Args:
+        source: ('tsplib', tên, thư mục) hoặc ('random', n, hạt giống bài toán)
+        solver_name: Tên bộ giải đã đăng ký
+        seed: Hạt giống của bộ giải
+        params: Tham số truyền thêm cho bộ giải
+
+    Returns:
+        dict: Một dòng kết quả với các cột trong FIELDS
+    """
+    params = params or {}
+    name, cities, matrix, optimum = _load_instance(source)
+    spec = SOLVERS[solver_name]
+    solver = spec['factory'](cities, matrix, seed, **params)
+
+    start = time.perf_counter()
+    result = solver.solve()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'instance': name,
+        'n': len(cities),
+        'solver': solver_name,
+        'params': params,
+        'seed': seed,
+        'distance': result['distance'],
+        'optimum': optimum,
+        'gap': 100.0 * (result['distance'] - optimum) / optimum if optimum else None,
+        'time': elapsed,
+        'throughput': spec['throughput'](solver, result, elapsed) if spec['throughput'] else None,
+        'unit': spec['unit'],
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _run_trials(trials: List[tuple], isolate: bool, verbose: bool) -> List[dict]:
+    """
+    Chạy danh sách lần đo (source, solver_name, seed, params)
+
+    Với isolate=True, mỗi lần đo chạy trong một tiến trình mới (forkserver nếu có) để bộ nhớ
+    đỉnh của lần đo không bị ảnh hưởng bởi các lần đo trước hoặc tiến trình cha.
+    """
+    rows = []
+    if isolate:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        with context.Pool(1, maxtasksperchild=1) as pool:
+            for trial in trials:
+                rows.append(pool.apply(run_trial, trial))
+                if verbose:
+                    print(format_row(rows[-1]), flush=True)
+    else:
+        for trial in trials:
+            rows.append(run_trial(*trial))
+            if verbose:
+                print(format_row(rows[-1]), flush=True)
+    return rows
+
+
+def _applicable(solver_name: str, n: int) -> bool:
+    max_cities = SOLVERS[solver_name]['max_cities']
+    return max_cities is None or n <= max_cities
+
+
+def _param_grid(solver_name: str, grid: Optional[Dict[str, Dict[str, list]]]) -> List[dict]:
+    """Tích Descartes các giá trị tham số của một bộ giải ([{}] nếu không có)"""
+    values = (grid or {}).get(solver_name, {})
+    keys = sorted(values)
+    return [dict(zip(keys, combination)) for combination in itertools.product(*(values[k] for k in keys))]
+
+
+def run_benchmark(instances: Optional[List[str]] = None, solvers: Optional[List[str]] = None,
+                  repeats: int = 1, seed: int = 0, data_dir: str = DATA_DIR,
+                  param_grid: Optional[Dict[str, Dict[str, list]]] = None,
+                  isolate: bool = False, verbose: bool = False) -> List[dict]:
+    """
+    Chạy các bộ giải trên các bài toán TSPLIB
+
+    Args:
+        instances: Tên bài toán (None - mọi bài toán trong data_dir)
+        solvers: Tên bộ giải đã đăng ký (None - tất cả)
+        repeats: Số lần chạy mỗi cặp (bài toán, bộ giải), lần thứ r dùng hạt giống seed + r
+        seed: Hạt giống ban đầu
+        data_dir: Thư mục chứa file .tsp
+        param_grid: {bộ giải: {tham số: [giá trị, ...]}} - chạy mọi tổ hợp giá trị
+        isolate: Mỗi lần đo chạy trong một tiến trình riêng (đo bộ nhớ đỉnh chính xác)
+        verbose: In từng kết quả khi chạy xong
+
+    Returns:
+        list: Mỗi phần tử là một dict với các cột trong FIELDS
+    """
+    trials = []
+    for name in instances or list_instances(data_dir):
+        n = load_tsplib(os.path.join(data_dir, name + '.tsp')).dimension
+        for solver_name in solvers or list(SOLVERS):
+            if not _applicable(solver_name, n):
+                continue
+            for params in _param_grid(solver_name, param_grid):
+                for r in range(repeats):
+                    trials.append((('tsplib', name, data_dir), solver_name, seed + r, params))
+    return _run_trials(trials, isolate, verbose)
+
+
+def run_sweep(sizes: List[int], solvers: Optional[List[str]] = None, repeats: int = 1,
+              seed: int = 0, param_grid: Optional[Dict[str, Dict[str, list]]] = None,
+              isolate: bool = False, verbose: bool = False) -> List[dict]:
+    """
+    Chạy các bộ giải trên bài toán ngẫu nhiên với các số thành phố khác nhau
+
+    Lần thứ r của mỗi cấu hình dùng bài toán và hạt giống bộ giải seed + r, nên hai lần
+    chạy cùng tham số giải đúng cùng các bài toán. Các tham số khác giống run_benchmark.
+    """
+    trials = []
+    for n in sizes:
+        for solver_name in solvers or list(SOLVERS):
+            if not _applicable(solver_name, n):
+                continue
+            for params in _param_grid(solver_name, param_grid):
+                for r in range(repeats):
+                    trials.append((('random', n, seed + r), solver_name, seed + r, params))
+    return _run_trials(trials, isolate, verbose)
+
+
+def format_row(row: dict) -> str:
+    """Một dòng của bảng kết quả"""
+    gap = f"{row['gap']:7.2f}%" if row['gap'] is not None else '       -'
+    rss = f"{row['peak_rss_mb']:8.1f}" if row.get('peak_rss_mb') is not None else '       -'
+    throughput = f"{row['throughput']:12.1f} {row['unit']}" if row['throughput'] is not None else ''
+    params = ' '.join(f'{k}={v}' for k, v in sorted(row.get('params', {}).items()))
+    return (f"{row['instance']:<12} {row['n']:>4} {row['solver']:<14} {row['distance']:>10.0f} "
+            f"{gap} {row['time']:>9.3f}s {rss} {throughput} {params}").rstrip()
+
+
+def format_table(rows: List[dict]) -> str:
+    """Bảng kết quả dạng văn bản"""
+    header = (f"{'Bài toán':<12} {'n':>4} {'Bộ giải':<14} {'Độ dài':>10} {'Gap':>8} "
+              f"{'Thời gian':>10} {'RSS (MB)':>8} Thông lượng")
+    return '\n'.join([header, '-' * len(header)] + [format_row(row) for row in rows])
+
+
+def save_json(rows: List[dict], path: str):
+    """Ghi kết quả và thông tin môi trường ra file JSON"""
+    document = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': rows,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+
+
+def save_csv(rows: List[dict], path: str):
+    """Ghi kết quả ra file CSV (tham số ghi dưới dạng JSON)"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, 'params': json.dumps(row['params'], sort_keys=True)})
+
+
+def load_results(path: str) -> List[dict]:
+    """Đọc kết quả đã lưu (JSON của save_json hoặc CSV của save_csv)"""
+    if path.endswith('.csv'):
+        rows = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                row['params'] = json.loads(row['params'] or '{}')
+                row['n'] = int(row['n'])
+                row['time'] = float(row['time'])
+                rows.append(row)
+        return rows
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def _group_times(rows: List[dict]) -> Dict[tuple, float]:
+    """Trung vị thời gian theo (bài toán, n, bộ giải, tham số)"""
+    groups = {}
+    for row in rows:
+        key = (row['instance'], row['n'], row['solver'], json.dumps(row['params'], sort_keys=True))
+        groups.setdefault(key, []).append(row['time'])
+    return {key: statistics.median(times) for key, times in groups.items()}
+
+
+def compare_results(baseline: List[dict], current: List[dict], threshold: float) -> List[dict]:
+    """
+    So sánh thời gian (trung vị qua các hạt giống) của các cấu hình có trong cả hai kết quả
+
+    Args:
+        baseline: Kết quả cơ sở
+        current: Kết quả mới
+        threshold: Ngưỡng chậm hơn cho phép (%)
+
+    Returns:
+        list: Mỗi cấu hình một dict gồm key, baseline, current, change (%) và regression
+    """
+    old, new = _group_times(baseline), _group_times(current)
+    comparison = []
+    for key in sorted(old.keys() & new.keys()):
+        change = 100.0 * (new[key] / old[key] - 1) if old[key] > 0 else 0.0
+        comparison.append({'key': key, 'baseline': old[key], 'current': new[key],
+                           'change': change, 'regression': change > threshold})
+    return comparison
+
+
+def format_comparison(comparison: List[dict]) -> str:
+    """Bảng so sánh dạng văn bản"""
+    lines = [f"{'Bài toán':<12} {'n':>4} {'Bộ giải':<14} {'Cơ sở':>10} {'Hiện tại':>10} {'Thay đổi':>9}"]
+    lines.append('-' * len(lines[0]))
+    for item in comparison:
+        instance, n, solver, params = item['key']
+        mark = '  CHẬM HƠN' if item['regression'] else ''
+        params = '' if params == '{}' else f' {params}'
+        lines.append(f"{instance:<12} {n:>4} {solver:<14} {item['baseline']:>9.4f}s {item['current']:>9.4f}s "
+                     f"{item['change']:>+8.1f}%{mark}{params}")
+    return '\n'.join(lines)
+
+
+def parse_params(specs: Optional[List[str]]) -> Dict[str, Dict[str, list]]:
+    """
+    Đọc tham số dạng 'bộ_giải:tên=giá_trị1,giá_trị2' thành {bộ giải: {tên: [giá trị, ...]}}
+
+    Giá trị được đọc như literal Python (số, True/False/None, chuỗi có nháy),
+    ngược lại giữ nguyên chuỗi.
+    """
+    grid = {}
+    for spec in specs or []:
+        try:
+            target, assignment = spec.split(':', 1)
+            key, values = assignment.split('=', 1)
+        except ValueError:
+            raise ValueError(f"Tham số phải có dạng bộ_giải:tên=giá_trị,...: {spec!r}") from None
+        if target not in SOLVERS:
+            raise ValueError(f"Bộ giải không tồn tại: {target!r}")
+        parsed = []
+        for value in values.split(','):
+            try:
+                parsed.append(ast.literal_eval(value))
+            except (ValueError, SyntaxError):
+                parsed.append(value)
+        grid.setdefault(target, {})[key] = parsed
+    return grid
+
+
+def _report(rows: List[dict], args) -> int:
+    """In bảng, ghi file và so sánh với kết quả cơ sở; trả về mã thoát"""
+    print(format_table(rows))
+    if args.json:
+        save_json(rows, args.json)
+    if args.csv:
+        save_csv(rows, args.csv)
+    if args.baseline:
+        return _compare(load_results(args.baseline), rows, args.threshold)
+    return 0
+
+
+def _compare(baseline: List[dict], current: List[dict], threshold: float) -> int:
+    comparison = compare_results(baseline, current, threshold)
+    print()
+    print(format_comparison(comparison))
+    regressions = sum(item['regression'] for item in comparison)
+    if regressions:
+        print(f"\n{regressions} cấu hình chậm hơn ngưỡng {threshold}%")
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark các bộ giải TSP')
+    commands = parser.add_subparsers(dest='command')
+
+    def add_run_options(command):
+        command.add_argument('--solvers', nargs='+', choices=sorted(SOLVERS), help='Bộ giải (mặc định: tất cả)')
+        command.add_argument('--repeats', type=int, default=1, help='Số lần chạy mỗi cấu hình (hạt giống seed, seed+1, ...)')
+        command.add_argument('--seed', type=int, default=0, help='Hạt giống ban đầu')
+        command.add_argument('--param', action='append', metavar='SOLVER:NAME=V1,V2',
+                             help='Giá trị tham số cần quét, ví dụ aco:n_ants=10,20 (có thể lặp lại)')
+        command.add_argument('--isolate', action='store_true',
+                             help='Mỗi lần đo chạy trong tiến trình riêng (bộ nhớ đỉnh chính xác)')
+        command.add_argument('--json', help='Ghi kết quả ra file JSON')
+        command.add_argument('--csv', help='Ghi kết quả ra file CSV')
+        command.add_argument('--baseline', help='So sánh với kết quả cơ sở (JSON/CSV)')
+        command.add_argument('--threshold', type=float, default=10.0, help='Ngưỡng chậm hơn cho phép (%%)')
+
+    suite = commands.add_parser('suite', help='Chạy trên bài toán TSPLIB đi kèm')
+    suite.add_argument('--instances', nargs='+', help='Tên bài toán (mặc định: tất cả)')
+    suite.add_argument('--data-dir', default=DATA_DIR, help='Thư mục chứa file .tsp')
+    add_run_options(suite)
+
+    sweep = commands.add_parser('sweep', help='Chạy trên bài toán ngẫu nhiên theo số thành phố')
+    sweep.add_argument('--sizes', nargs='+', type=int, required=True, help='Các số thành phố')
+    add_run_options(sweep)
+
+    compare = commands.add_parser('compare', help='So sánh hai file kết quả')
+    compare.add_argument('baseline', help='Kết quả cơ sở')
+    compare.add_argument('current', help='Kết quả mới')
+    compare.add_argument('--threshold', type=float, default=10.0, help='Ngưỡng chậm hơn cho phép (%%)')
+
+    if argv is None:
+        argv = sys.argv[1:]
+    args = parser.parse_args(argv or ['suite'])
+
+    if args.command == 'compare':
+        return _compare(load_results(args.baseline), load_results(args.current), args.threshold)
+
+    try:
+        grid = parse_params(args.param)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.command == 'sweep':
+        rows = run_sweep(args.sizes, args.solvers, args.repeats, args.seed, grid, args.isolate)
+    else:
+        rows = run_benchmark(args.instances, args.solvers, args.repeats, args.seed,
+                             args.data_dir, grid, args.isolate)
+    return _report(rows, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
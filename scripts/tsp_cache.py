@@ -0,0 +1,282 @@
+"""
+Travelling Salesman Problem - Result Cache
+Bộ nhớ đệm theo nội dung cho kết quả giải và ma trận khoảng cách: khóa là mã băm SHA-256
+của dữ liệu bài toán (ma trận, hoặc tọa độ + metric) và tham số bộ giải; LRU trong bộ nhớ
+và thư mục trên đĩa (tùy chọn) giới hạn theo dung lượng
+
+Kết quả của bộ giải chính xác (Backtracking, Held-Karp) được dùng lại mãi mãi khi đã giải
+xong; kết quả ACO chỉ được lưu khi có seed cố định (và không giới hạn thời gian).
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from tsp_distance import EARTH_RADIUS_KM, DistanceOracle, distance_matrix, haversine_matrix
+
+# Tăng khi định dạng khóa hoặc giá trị thay đổi để bỏ qua các mục cũ trên đĩa
+CACHE_VERSION = 2
+
+# Tham số của TSP_ACO quyết định kết quả (cùng bài toán, cùng seed)
+ACO_PARAMETERS = ('n_ants', 'n_iterations', 'alpha', 'beta', 'evaporation_rate', 'q', 'engine',
+                  'n_candidates', 'seed', 'local_search', 'lazy_evaporation', 'tau_min', 'tau_max',
+                  'stagnation_limit', 'convergence_tol', 'initial_route')
+
+# Phần kết quả được lưu: lời giải, không có số liệu của lần chạy (time, explored_routes,
+# nodes_per_sec, steps...) vì khóa không phân biệt cận, engine hay số tiến trình
+SOLUTION_FIELDS = ('route', 'distance', 'optimal', 'algorithm')
+
+
+def _json_default(value):
+    """Đổi kiểu NumPy sang kiểu JSON"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Không ghi được kiểu {type(value).__name__} vào bộ nhớ đệm")
+
+
+def array_digest(array) -> str:
+    """Mã băm SHA-256 của nội dung một mảng (kiểu, kích thước và dữ liệu)"""
+    array = np.ascontiguousarray(array, dtype=np.float64)
+    digest = hashlib.sha256(f'{array.dtype.str}{array.shape}'.encode())
+    digest.update(memoryview(array).cast('B'))
+    return digest.hexdigest()
+
+
+def make_key(*parts) -> str:
+    """Khóa bộ nhớ đệm từ các thành phần có thể ghi ra JSON (mảng NumPy dùng array_digest trước)"""
+    text = json.dumps([CACHE_VERSION, *parts], sort_keys=True, default=_json_default)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def instance_digest(distance_matrix) -> str:
+    """Mã băm của bài toán: ma trận khoảng cách, hoặc tọa độ + metric với DistanceOracle"""
+    if isinstance(distance_matrix, DistanceOracle):
+        return make_key('oracle', array_digest(distance_matrix.coordinates),
+                        distance_matrix.metric, distance_matrix.radius)
+    return array_digest(distance_matrix)
+
+
+def solver_key(solver) -> Optional[str]:
+    """
+    Khóa kết quả của một bộ giải (trước khi giải)
+
+    Returns:
+        Khóa, hoặc None nếu kết quả không dùng lại được (ACO không có seed, có time_limit,
+        hoặc đã nạp trạng thái bằng load_state)
+    """
+    name = type(solver).__name__
+    instance = instance_digest(solver.distance_matrix)
+    if name in ('TSPBacktracking', 'TSPHeldKarp'):
+        # Lời giải tối ưu không phụ thuộc cận, engine hay số tiến trình
+        return make_key(name, list(solver.cities), instance)
+    if name == 'TSP_ACO':
+        if solver.seed is None or solver.time_limit is not None or solver.state_loaded:
+            return None
+        params = {param: getattr(solver, param) for param in ACO_PARAMETERS}
+        return make_key(name, list(solver.cities), instance, params)
+    return None
+
+
+def _reusable(result: dict) -> bool:
+    """Kết quả giải trọn vẹn (không bị hủy, không hết giờ giữa chừng)"""
+    return not result.get('cancelled') and not result.get('timed_out') and result.get('optimal', True)
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = 64, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 2**20):
+        """
+        Bộ nhớ đệm LRU cho kết quả (dict ghi được ra JSON) và ma trận (mảng NumPy)
+
+        Args:
+            max_entries: Số mục tối đa giữ trong bộ nhớ (mục ít dùng gần đây nhất bị bỏ trước)
+            cache_dir: Thư mục lưu trên đĩa (None - chỉ dùng bộ nhớ). Mỗi mục là một file
+                       <khóa>.json hoặc <khóa>.npy, ghi nguyên tử (file tạm rồi os.replace)
+            max_disk_bytes: Tổng dung lượng tối đa của thư mục; vượt quá thì xóa các file
+                            có thời điểm dùng (mtime) cũ nhất
+        """
+        if max_entries < 0:
+            raise ValueError(f"max_entries phải >= 0, nhận được: {max_entries}")
+        self.max_entries = max_entries
+        self.cache_dir = os.fspath(cache_dir) if cache_dir is not None else None
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        # Có thể dùng chung giữa các luồng (giao diện chạy hai bộ giải song song)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries or self._disk_path(key) is not None
+
+    def _remember(self, key: str, value):
+        if self.max_entries == 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Optional[str]:
+        """Đường dẫn file của khóa trên đĩa, None nếu không có"""
+        if self.cache_dir is None:
+            return None
+        for suffix in ('.json', '.npy'):
+            path = os.path.join(self.cache_dir, key + suffix)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def get(self, key: str):
+        """
+        Giá trị của khóa, hoặc None nếu không có
+
+        dict được trả về dưới dạng bản sao; mảng NumPy là chỉ đọc.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                value = self._load(key)
+                if value is None:
+                    self.misses += 1
+                    return None
+                self._remember(key, value)
+            else:
+                self._entries.move_to_end(key)
+            self.hits += 1
+            return value if isinstance(value, np.ndarray) else copy.deepcopy(value)
+
+    def _load(self, key: str):
+        """Đọc mục từ đĩa và đánh dấu vừa dùng; file hỏng bị xóa"""
+        path = self._disk_path(key)
+        if path is None:
+            return None
+        try:
+            if path.endswith('.npy'):
+                value = np.load(path)
+                value.flags.writeable = False
+            else:
+                with open(path, encoding='utf-8') as f:
+                    value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self._remove(path)
+            return None
+        return value
+
+    def put(self, key: str, value):
+        """Lưu giá trị (dict ghi được ra JSON, hoặc mảng NumPy) cho khóa"""
+        with self._lock:
+            if isinstance(value, np.ndarray):
+                # Lưu dạng xem chỉ đọc (không sao chép); người gọi không nên sửa mảng gốc sau đó
+                value = value.view()
+                value.flags.writeable = False
+            else:
+                value = copy.deepcopy(value)
+            self._remember(key, value)
+            if self.cache_dir is None:
+                return
+
+            suffix = '.npy' if isinstance(value, np.ndarray) else '.json'
+            path = os.path.join(self.cache_dir, key + suffix)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            try:
+                if suffix == '.npy':
+                    with open(tmp_path, 'wb') as f:
+                        np.save(f, value)
+                else:
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump(value, f, ensure_ascii=False, default=_json_default)
+                os.replace(tmp_path, path)
+            finally:
+                self._remove(tmp_path)
+            self._evict()
+
+    def _evict(self):
+        """Xóa các file dùng lâu nhất tới khi tổng dung lượng không vượt max_disk_bytes"""
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(('.json', '.npy')):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:  # tiến trình khác vừa xóa
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Xóa toàn bộ bộ nhớ đệm (cả trên đĩa)"""
+        with self._lock:
+            self._entries.clear()
+            if self.cache_dir is not None:
+                for entry in os.scandir(self.cache_dir):
+                    if entry.is_file() and entry.name.endswith(('.json', '.npy')):
+                        self._remove(entry.path)
+
+
+def cached_solve(solver, cache: ResultCache, verbose: bool = False) -> dict:
+    """
+    Giải qua bộ nhớ đệm: dùng lại kết quả đã lưu nếu có, ngược lại gọi solver.solve()
+    và lưu kết quả nếu dùng lại được
+
+    Khi dùng lại, solver.best_route và solver.best_distance được đặt theo kết quả đã lưu.
+
+    Returns:
+        dict: Kết quả của solver.solve(), thêm 'cached' (False); hoặc khi lấy từ bộ nhớ đệm
+              chỉ có SOLUTION_FIELDS, 'time' (thời gian tra cứu), 'steps' (rỗng) và 'cached' (True)
+    """
+    start = time.perf_counter()
+    key = solver_key(solver)
+    if key is not None:
+        entry = cache.get(key)
+        if entry is not None:
+            solver.best_route = entry['best_route']
+            solver.best_distance = entry['result']['distance']
+            return {**entry['result'], 'time': time.perf_counter() - start, 'steps': [], 'cached': True}
+
+    result = solver.solve(verbose=verbose)
+    if key is not None and solver.best_route is not None and _reusable(result):
+        solution = {field: result[field] for field in SOLUTION_FIELDS if field in result}
+        cache.put(key, {'result': solution, 'best_route': [int(city) for city in solver.best_route]})
+    return {**result, 'cached': False}
+
+
+def cached_distance_matrix(cache: ResultCache, coordinates, metric: str = 'haversine',
+                           radius: float = EARTH_RADIUS_KM) -> np.ndarray:
+    """Ma trận khoảng cách (chỉ đọc) từ tọa độ, lấy từ bộ nhớ đệm nếu đã tính"""
+    key = make_key('matrix', array_digest(coordinates), metric, radius)
+    matrix = cache.get(key)
+    if matrix is None:
+        if metric == 'haversine':
+            matrix = haversine_matrix(coordinates, radius=radius)
+        else:
+            matrix = distance_matrix(coordinates, metric)
+        matrix.flags.writeable = False
+        cache.put(key, matrix)
+    return matrix
@@ -0,0 +1,443 @@
+"""
+Travelling Salesman Problem - Distance Matrix Builders
+Tính ma trận khoảng cách (haversine theo km hoặc Euclid) bằng NumPy, theo từng khối hàng,
+hoặc tính khoảng cách theo yêu cầu từ tọa độ (DistanceOracle) cho bài toán rất lớn
+"""
+
+import math
+from collections import OrderedDict
+from typing import Sequence, Tuple
+
+import numpy as np
+
+# Bán kính trung bình của Trái Đất (km)
+EARTH_RADIUS_KM = 6371.0088
+
+# Số phần tử tối đa của một khối tạm (khoảng 8 MB với float64)
+BLOCK_ELEMENTS = 1 << 20
+
+METRICS = ('haversine', 'euclidean')
+
+
+def _unit_vectors(coordinates) -> np.ndarray:
+    """Chuyển (vĩ độ, kinh độ) theo độ sang vector đơn vị 3 chiều, dạng (n, 3)"""
+    coords = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    lat = np.radians(coords[:, 0])
+    lon = np.radians(coords[:, 1])
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def _row_blocks(n: int, chunk_size: int):
+    """Sinh các khoảng hàng [start, stop) sao cho mỗi khối có khoảng chunk_size hàng"""
+    if chunk_size is None:
+        chunk_size = max(1, BLOCK_ELEMENTS // max(n, 1))
+    for start in range(0, n, chunk_size):
+        yield start, min(start + chunk_size, n)
+
+
+def _chord_lengths(vectors: np.ndarray, start: int, stop: int, out: np.ndarray,
+                   others: np.ndarray = None) -> np.ndarray:
+    """
+    Độ dài dây cung giữa các vector hàng [start, stop) và mọi vector của others
+    (mặc định chính vectors), ghi vào out dạng (stop - start, len(others))
+    """
+    if others is None:
+        others = vectors
+    block = vectors[start:stop]
+    squared = out[:stop - start]
+    diff = np.empty_like(squared)
+    np.subtract(block[:, 0, None], others[None, :, 0], out=squared)
+    np.multiply(squared, squared, out=squared)
+    for axis in range(1, vectors.shape[1]):
+        np.subtract(block[:, axis, None], others[None, :, axis], out=diff)
+        np.multiply(diff, diff, out=diff)
+        squared += diff
+    return np.sqrt(squared, out=squared)
+
+
+def haversine_matrix(coordinates: Sequence[Tuple[float, float]], radius: float = EARTH_RADIUS_KM,
+                     dtype=np.float64, chunk_size: int = None) -> np.ndarray:
+    """
+    Ma trận khoảng cách đường tròn lớn (km) giữa các điểm (vĩ độ, kinh độ) theo độ
+
+    Dùng độ dài dây cung giữa các vector đơn vị: d = 2R * arcsin(chord / 2),
+    tương đương công thức haversine nhưng không cần hàm lượng giác cho từng cặp.
+
+    Args:
+        coordinates: Danh sách hoặc mảng (n, 2) các cặp (vĩ độ, kinh độ)
+        radius: Bán kính cầu (mặc định: bán kính Trái Đất theo km)
+        dtype: Kiểu dữ liệu kết quả (np.float32 giảm một nửa bộ nhớ)
+        chunk_size: Số hàng tính mỗi khối (None - tự chọn để bộ nhớ tạm khoảng 8 MB)
+    """
+    vectors = _unit_vectors(coordinates)
+    n = len(vectors)
+    matrix = np.empty((n, n), dtype=dtype)
+    buffer = None
+    for start, stop in _row_blocks(n, chunk_size):
+        if buffer is None:
+            buffer = np.empty((stop - start, n))
+        chord = _chord_lengths(vectors, start, stop, buffer)
+        chord *= 0.5
+        np.minimum(chord, 1.0, out=chord)
+        np.arcsin(chord, out=chord)
+        chord *= 2 * radius
+        matrix[start:stop] = chord
+    np.fill_diagonal(matrix, 0)
+    return matrix
+
+
+def euclidean_matrix(points, dtype=np.float64, chunk_size: int = None) -> np.ndarray:
+    """
+    Ma trận khoảng cách Euclid giữa các điểm
+
+    Args:
+        points: Danh sách hoặc mảng (n, d) tọa độ
+        dtype: Kiểu dữ liệu kết quả (np.float32 giảm một nửa bộ nhớ)
+        chunk_size: Số hàng tính mỗi khối (None - tự chọn để bộ nhớ tạm khoảng 8 MB)
+    """
+    points = np.asarray(points, dtype=np.float64)
+    points = points.reshape(len(points), -1)
+    n = len(points)
+    matrix = np.empty((n, n), dtype=dtype)
+    buffer = None
+    for start, stop in _row_blocks(n, chunk_size):
+        if buffer is None:
+            buffer = np.empty((stop - start, n))
+        matrix[start:stop] = _chord_lengths(points, start, stop, buffer)
+    np.fill_diagonal(matrix, 0)
+    return matrix
+
+
+def distance_matrix(coordinates, metric: str = 'haversine', dtype=np.float64,
+                    chunk_size: int = None) -> np.ndarray:
+    """
+    Tính ma trận khoảng cách theo metric
+
+    Args:
+        coordinates: Tọa độ; với 'haversine' là các cặp (vĩ độ, kinh độ) theo độ
+        metric: 'haversine' (km trên mặt cầu) hoặc 'euclidean'
+        dtype: Kiểu dữ liệu kết quả
+        chunk_size: Số hàng tính mỗi khối
+    """
+    if metric == 'haversine':
+        return haversine_matrix(coordinates, dtype=dtype, chunk_size=chunk_size)
+    if metric == 'euclidean':
+        return euclidean_matrix(coordinates, dtype=dtype, chunk_size=chunk_size)
+    raise ValueError(f"metric phải là một trong {METRICS}, nhận được: {metric!r}")
+
+
+def _grid_neighbors(points: np.ndarray, k: int) -> np.ndarray:
+    """
+    k láng giềng gần nhất của mỗi điểm bằng chỉ mục lưới đều (không cần scipy)
+
+    Các điểm cùng ô được xử lý cùng lúc: xét các ô trong hộp bán kính r ô quanh ô đó,
+    mở rộng r cho tới khi láng giềng thứ k của mọi điểm nằm trong bán kính r * cạnh ô
+    (mọi điểm gần hơn chắc chắn đã nằm trong hộp).
+    """
+    n, d = points.shape
+    lower = points.min(axis=0)
+    span = points.max(axis=0) - lower
+    active = span > 0
+    n_active = int(active.sum())
+    if n_active:
+        volume = float(np.prod(span[active]))
+        cell = (volume * max(k, 2) / n) ** (1.0 / n_active)
+    else:
+        cell = 1.0
+    shape = np.maximum(np.ceil(span / cell).astype(np.int64), 1)
+    keys = np.minimum(((points - lower) / cell).astype(np.int64), shape - 1)
+    strides = np.ones(d, dtype=np.int64)
+    for axis in range(d - 2, -1, -1):
+        strides[axis] = strides[axis + 1] * shape[axis + 1]
+
+    linear = keys @ strides
+    order = np.argsort(linear, kind='stable')
+    cells, starts, counts = np.unique(linear[order], return_index=True, return_counts=True)
+    stops = starts + counts
+    lookup = dict(zip(cells.tolist(), zip(starts.tolist(), stops.tolist())))
+
+    neighbors = np.empty((n, k), dtype=np.intp)
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        members = order[start:stop]
+        key = keys[members[0]]
+        ring = 1
+        while True:
+            lo = np.maximum(key - ring, 0)
+            hi = np.minimum(key + ring, shape - 1)
+            covers_all = bool((lo == 0).all() and (hi == shape - 1).all())
+            box = np.stack(np.meshgrid(*[np.arange(a, b + 1) for a, b in zip(lo, hi)],
+                                       indexing='ij'), axis=-1).reshape(-1, d) @ strides
+            spans = [lookup[c] for c in box.tolist() if c in lookup]
+            candidates = np.concatenate([order[a:b] for a, b in spans])
+            if len(candidates) > k or covers_all:
+                squared = np.zeros((len(members), len(candidates)))
+                for axis in range(d):
+                    diff = points[members, axis, None] - points[None, candidates, axis]
+                    squared += diff * diff
+                squared[members[:, None] == candidates[None, :]] = np.inf
+                nearest = np.argpartition(squared, k - 1, axis=1)[:, :k]
+                nearest_squared = np.take_along_axis(squared, nearest, axis=1)
+                if covers_all or (nearest_squared.max(axis=1) <= (ring * cell) ** 2).all():
+                    rank = nearest_squared.argsort(axis=1, kind='stable')
+                    neighbors[members] = candidates[np.take_along_axis(nearest, rank, axis=1)]
+                    break
+            ring += 1
+    return neighbors
+
+
+class _OracleRow:
+    """Một hàng ảo của DistanceOracle: row[j] tính một khoảng cách, np.asarray(row) tính cả hàng"""
+    __slots__ = ('_oracle', '_index')
+
+    def __init__(self, oracle: 'DistanceOracle', index: int):
+        self._oracle = oracle
+        self._index = index
+
+    def __getitem__(self, j):
+        if isinstance(j, (int, np.integer)):
+            return self._oracle.distance(self._index, j)
+        return self._oracle.row(self._index)[j]
+
+    def __len__(self) -> int:
+        return len(self._oracle)
+
+    def __iter__(self):
+        return iter(self._oracle.row(self._index).tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        row = self._oracle.row(self._index)
+        return row.astype(dtype) if dtype is not None else row.copy()
+
+
+class DistanceOracle:
+    def __init__(self, coordinates, metric: str = 'haversine', cache_size: int = 32,
+                 radius: float = EARTH_RADIUS_KM):
+        """
+        Khoảng cách tính theo yêu cầu từ tọa độ, không lưu ma trận n x n
+
+        Dùng thay cho distance_matrix: oracle[i][j] là khoảng cách giữa i và j,
+        oracle.row(i) là cả hàng i (giữ trong bộ nhớ đệm LRU gồm cache_size hàng),
+        oracle.nearest(k) là danh sách k láng giềng gần nhất (KD-tree nếu có scipy,
+        ngược lại dùng chỉ mục lưới). Bộ nhớ O(n) cho tọa độ, O(n * k) cho láng giềng.
+
+        Args:
+            coordinates: Tọa độ; với 'haversine' là các cặp (vĩ độ, kinh độ) theo độ
+            metric: 'haversine' (km trên mặt cầu) hoặc 'euclidean'
+            cache_size: Số hàng khoảng cách tối đa giữ trong bộ nhớ đệm
+            radius: Bán kính cầu khi metric='haversine'
+        """
+        if metric not in METRICS:
+            raise ValueError(f"metric phải là một trong {METRICS}, nhận được: {metric!r}")
+
+        self.coordinates = np.asarray(coordinates, dtype=np.float64)
+        self.metric = metric
+        self.cache_size = cache_size
+        self.radius = radius
+        if metric == 'haversine':
+            self._points = _unit_vectors(self.coordinates)
+        else:
+            self._points = self.coordinates.reshape(len(self.coordinates), -1)
+        self._point_list = self._points.tolist()
+        self._rows = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __getitem__(self, i) -> _OracleRow:
+        return _OracleRow(self, int(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._compute_rows(np.array([i]))[0]
+
+    def __array__(self, dtype=None, copy=None):
+        """Ma trận đầy đủ n x n (chỉ nên dùng với bài toán nhỏ, ví dụ các bộ giải chính xác)"""
+        return self.to_matrix(dtype=dtype or np.float64)
+
+    def _to_distance(self, chord: np.ndarray) -> np.ndarray:
+        """Đổi độ dài dây cung (hoặc khoảng cách Euclid) sang khoảng cách, tại chỗ"""
+        if self.metric == 'haversine':
+            chord *= 0.5
+            np.minimum(chord, 1.0, out=chord)
+            np.arcsin(chord, out=chord)
+            chord *= 2 * self.radius
+        return chord
+
+    def distance(self, i: int, j: int) -> float:
+        """Khoảng cách giữa hai thành phố"""
+        chord = math.dist(self._point_list[i], self._point_list[j])
+        if self.metric == 'haversine':
+            return 2 * self.radius * math.asin(min(chord * 0.5, 1.0))
+        return chord
+
+    def pairwise(self, a, b) -> np.ndarray:
+        """Khoảng cách giữa a[...] và b[...] theo từng phần tử (a, b là mảng chỉ số cùng dạng)"""
+        a, b = np.broadcast_arrays(np.asarray(a), np.asarray(b))
+        squared = np.zeros(a.shape)
+        for axis in range(self._points.shape[1]):
+            coordinate = self._points[:, axis]
+            diff = coordinate[a] - coordinate[b]
+            squared += diff * diff
+        return self._to_distance(np.sqrt(squared, out=squared))
+
+    def _compute_rows(self, indices: np.ndarray) -> np.ndarray:
+        """Tính các hàng khoảng cách (không qua bộ nhớ đệm)"""
+        block = np.empty((len(indices), len(self)))
+        return self._to_distance(_chord_lengths(self._points[indices], 0, len(indices), block,
+                                                others=self._points))
+
+    def row(self, i: int) -> np.ndarray:
+        """Hàng khoảng cách từ thành phố i (chỉ đọc), lấy từ bộ nhớ đệm LRU nếu có"""
+        row = self._rows.get(i)
+        if row is not None:
+            self._rows.move_to_end(i)
+            self.cache_hits += 1
+            return row
+        self.cache_misses += 1
+        row = self._compute_rows(np.array([i]))[0]
+        row.flags.writeable = False
+        if self.cache_size > 0:
+            self._rows[i] = row
+            if len(self._rows) > self.cache_size:
+                self._rows.popitem(last=False)
+        return row
+
+    def rows(self, indices) -> np.ndarray:
+        """Các hàng khoảng cách, dạng (len(indices), n)"""
+        return np.stack([self.row(int(i)) for i in indices]) if len(indices) else np.empty((0, len(self)))
+
+    def nearest(self, k: int) -> np.ndarray:
+        """Mảng (n, k): k thành phố gần nhất của mỗi thành phố, từ gần đến xa"""
+        n = len(self)
+        k = min(k, n - 1)
+        if k <= 0:
+            return np.empty((n, 0), dtype=np.intp)
+        # Nạp scipy khi cần lần đầu (import scipy tốn thời gian hơn nhiều so với phần còn lại)
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:  # scipy là tùy chọn: dùng chỉ mục lưới thay cho KD-tree
+            return _grid_neighbors(self._points, k)
+
+        # Khoảng cách dây cung đồng biến với khoảng cách trên mặt cầu nên dùng trực tiếp
+        _, found = cKDTree(self._points).query(self._points, k=k + 1)
+        found = np.asarray(found, dtype=np.intp).reshape(n, k + 1)
+        own = found == np.arange(n)[:, None]
+        own[~own.any(axis=1), -1] = True
+        return found[~own].reshape(n, k)
+
+    def to_matrix(self, dtype=np.float64) -> np.ndarray:
+        """Ma trận khoảng cách đầy đủ n x n"""
+        return distance_matrix(self.coordinates, metric=self.metric, dtype=dtype)
+
+
+class IncrementalDistanceMatrix:
+    def __init__(self, coordinates=(), metric: str = 'haversine', radius: float = EARTH_RADIUS_KM,
+                 matrix=None):
+        """
+        Ma trận khoảng cách cho bài toán được sửa từng thành phố (ví dụ trên giao diện)
+
+        Thêm một thành phố chỉ tính một hàng/cột mới, xóa chỉ chép một hàng/cột: O(n) mỗi
+        thao tác. Ma trận nằm trong bộ đệm có sức chứa tăng gấp đôi khi đầy (O(n) trung bình
+        mỗi lần thêm), matrix là view (n, n) của bộ đệm. Xóa thành phố i chuyển thành phố cuối
+        vào vị trí i thay vì dịch chuyển cả ma trận.
+
+        Args:
+            coordinates: Tọa độ ban đầu; với 'haversine' là các cặp (vĩ độ, kinh độ) theo độ
+            metric: 'haversine' (km trên mặt cầu) hoặc 'euclidean'
+            radius: Bán kính cầu khi metric='haversine'
+            matrix: Ma trận đã tính sẵn cho coordinates (ví dụ từ bộ nhớ đệm), được sao chép
+                    vào bộ đệm thay vì tính lại
+        """
+        if metric not in METRICS:
+            raise ValueError(f"metric phải là một trong {METRICS}, nhận được: {metric!r}")
+
+        self.metric = metric
+        self.radius = radius
+        n = len(coordinates)
+        capacity = max(16, n)
+        self._buffer = np.empty((capacity, capacity))
+        self._points = None  # Cấp phát ở lần thêm đầu tiên khi chưa có tọa độ (chưa biết số chiều)
+        self._n = n
+        if n:
+            coordinates = np.asarray(coordinates, dtype=np.float64).reshape(n, -1)
+            points = self._to_points(coordinates)
+            self._points = np.empty((capacity, points.shape[1]))
+            self._points[:n] = points
+            if matrix is not None:
+                matrix = np.asarray(matrix, dtype=np.float64)
+                if matrix.shape != (n, n):
+                    raise ValueError(f"matrix phải có kích thước ({n}, {n}), nhận được: {matrix.shape}")
+                self._buffer[:n, :n] = matrix
+            elif metric == 'haversine':
+                self._buffer[:n, :n] = haversine_matrix(coordinates, radius=radius)
+            else:
+                self._buffer[:n, :n] = euclidean_matrix(coordinates)
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Ma trận khoảng cách hiện tại (view, không sao chép; thay đổi sau mỗi lần thêm/xóa)"""
+        return self._buffer[:self._n, :self._n]
+
+    def _to_points(self, coordinates: np.ndarray) -> np.ndarray:
+        """Tọa độ sang điểm dùng để tính khoảng cách (vector đơn vị với 'haversine')"""
+        return _unit_vectors(coordinates) if self.metric == 'haversine' else coordinates
+
+    def _distances_to(self, point: np.ndarray) -> np.ndarray:
+        """Khoảng cách từ point tới n điểm hiện có"""
+        diff = self._points[:self._n] - point
+        chord = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+        if self.metric == 'haversine':
+            chord *= 0.5
+            np.minimum(chord, 1.0, out=chord)
+            np.arcsin(chord, out=chord)
+            chord *= 2 * self.radius
+        return chord
+
+    def append(self, coordinate) -> int:
+        """Thêm một thành phố, trả về chỉ số của nó (= n cũ)"""
+        point = self._to_points(np.asarray(coordinate, dtype=np.float64).reshape(1, -1))[0]
+        n = self._n
+        if self._points is None:
+            self._points = np.empty((len(self._buffer), len(point)))
+        if n == len(self._buffer):
+            capacity = 2 * n
+            buffer = np.empty((capacity, capacity))
+            buffer[:n, :n] = self._buffer[:n, :n]
+            self._buffer = buffer
+            points = np.empty((capacity, self._points.shape[1]))
+            points[:n] = self._points[:n]
+            self._points = points
+
+        row = self._distances_to(point)
+        self._buffer[n, :n] = row
+        self._buffer[:n, n] = row
+        self._buffer[n, n] = 0.0
+        self._points[n] = point
+        self._n = n + 1
+        return n
+
+    def remove(self, index: int):
+        """
+        Xóa thành phố index; thành phố cuối (chỉ số n - 1) được chuyển vào vị trí index
+
+        Returns:
+            Chỉ số cũ của thành phố đã được chuyển vào vị trí index, hoặc None nếu index là
+            thành phố cuối (không có thành phố nào đổi chỉ số)
+        """
+        n = self._n
+        if not 0 <= index < n:
+            raise IndexError(f"Chỉ số thành phố ngoài phạm vi: {index}")
+        last = n - 1
+        if index != last:
+            self._buffer[index, :n] = self._buffer[last, :n]
+            self._buffer[:n, index] = self._buffer[:n, last]
+            self._buffer[index, index] = 0.0
+            self._points[index] = self._points[last]
+        self._n = last
+        return last if index != last else None
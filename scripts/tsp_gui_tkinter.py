@@ -8,24 +8,331 @@ from tkinter import ttk, filedialog, messagebox, scrolledtext
 import numpy as np
 from tsp_backtracking import TSPBacktracking
 from tsp_aco import TSP_ACO
+from tsp_cache import ResultCache, cached_distance_matrix, cached_solve
+from tsp_distance import DistanceOracle, IncrementalDistanceMatrix
+from tsp_local_search import insert_cheapest, remove_from_route
 import csv
 import os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+import queue
+import threading
+import time
+
+class LiveChart:
+    """
+    Bảng biểu đồ cố định: bản đồ tuyến đường (tuyến tốt nhất của từng bộ giải) và đường
+    hội tụ ACO, cập nhật tại chỗ khi có tiến độ
+
+    Các thành phần thay đổi (tuyến, đường hội tụ, nhãn) là artist "animated": mỗi khung hình
+    chỉ khôi phục nền đã lưu (trục, lưới, các thành phố) rồi vẽ lại chúng và blit. Nền chỉ
+    được vẽ lại toàn bộ khi đổi bài toán, đổi thang trục hoặc đổi kích thước cửa sổ.
+    Mỗi tuyến là một đường gấp khúc khép kín (một Line2D, cập nhật bằng set_data), tính lại
+    bằng NumPy chỉ khi tuyến thay đổi; với 5000 thành phố vẽ một đường nhanh hơn khoảng
+    3 lần so với LineCollection (mỗi cạnh một đoạn) nên vẫn mượt với hàng nghìn thành phố.
+    """
+    
+    # Tối đa một lần vẽ mỗi khung hình (~60 Hz); các cập nhật giữa hai lần vẽ được gộp lại
+    FRAME_INTERVAL = 1 / 60
+    COLORS = {'bt': '#FF6B6B', 'aco': '#4ECDC4'}
+    LABELS = {'bt': 'Backtracking', 'aco': 'ACO'}
+    
+    def __init__(self, master):
+        # matplotlib chỉ được nạp khi bảng biểu đồ được tạo lần đầu (giao diện mở nhanh hơn)
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        
+        self.figure = Figure(figsize=(10, 5), dpi=100)
+        self.ax_route = self.figure.add_subplot(121)
+        self.ax_convergence = self.figure.add_subplot(122)
+        
+        self.ax_route.set_title('Tuyen duong tot nhat', fontsize=11, fontweight='bold')
+        self.ax_route.set_aspect('equal', adjustable='box')
+        self.ax_route.grid(alpha=0.3)
+        self.city_points = self.ax_route.scatter([], [], s=12, c='black', zorder=3)
+        self.tours = {}
+        for name in ('bt', 'aco'):
+            self.tours[name], = self.ax_route.plot([], [], '-', color=self.COLORS[name], animated=True,
+                                                   linewidth=2.5 if name == 'bt' else 1.5,
+                                                   label=self.LABELS[name])
+        self.ax_route.legend(loc='upper right', fontsize=9)
+        self.route_text = self.ax_route.text(0.02, 0.02, '', transform=self.ax_route.transAxes,
+                                             fontsize=9, animated=True)
+        
+        self.ax_convergence.set_title('Qua trinh hoi tu ACO', fontsize=11, fontweight='bold')
+        self.ax_convergence.set_xlabel('Lap', fontsize=11)
+        self.ax_convergence.set_ylabel('Khoang cach', fontsize=11)
+        self.ax_convergence.grid(alpha=0.3)
+        self.convergence_line, = self.ax_convergence.plot([], [], '-', color=self.COLORS['aco'],
+                                                         linewidth=2, animated=True, label='ACO')
+        self.bt_line, = self.ax_convergence.plot([], [], '--', color=self.COLORS['bt'],
+                                                 linewidth=2, animated=True, label='Backtracking')
+        self.ax_convergence.legend(loc='upper right', fontsize=9)
+        self.figure.tight_layout()
+        
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.widget = self.canvas.get_tk_widget()
+        self.widget.pack(fill='both', expand=True)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        
+        self.points = None
+        self.routes = {'bt': None, 'aco': None}
+        self.distances = {'bt': None, 'aco': None}
+        self.history_x, self.history_y = [], []
+        self.n_iterations = 1
+        self._dirty_tours = set()
+        self._y_range = None
+        self._background = None
+        self._full_draw = True
+        self._pending = None
+        self._last_render = 0.0
+    
+    def reset(self, points, n_iterations: int):
+        """
+        Bắt đầu lần giải mới: đặt các thành phố (mảng (n, 2) tọa độ x, y), xóa tuyến và đường hội tụ
+        """
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.routes = {'bt': None, 'aco': None}
+        self.distances = {'bt': None, 'aco': None}
+        self.history_x, self.history_y = [], []
+        self.n_iterations = max(n_iterations, 1)
+        for line in (*self.tours.values(), self.bt_line):
+            line.set_data([], [])
+        self._dirty_tours.clear()
+        
+        self.city_points.set_offsets(self.points)
+        # Điểm nhỏ dần khi có nhiều thành phố để tuyến đường vẫn nhìn rõ
+        self.city_points.set_sizes([12 if len(self.points) <= 200 else max(1, 2400 / len(self.points))])
+        if len(self.points):
+            low, high = self.points.min(axis=0), self.points.max(axis=0)
+            margin = np.maximum((high - low) * 0.05, 1.0)
+            self.ax_route.set_xlim(low[0] - margin[0], high[0] + margin[0])
+            self.ax_route.set_ylim(low[1] - margin[1], high[1] + margin[1])
+        self.ax_convergence.set_xlim(0, self.n_iterations)
+        self._y_range = None
+        self._full_draw = True
+        self.request_redraw()
+    
+    def set_tour(self, name: str, route, distance: float):
+        """Tuyến tốt nhất hiện tại của bộ giải name ('bt' hoặc 'aco'); chỉ lưu lại, vẽ ở khung hình sau"""
+        if route is None or self.points is None:
+            return
+        self.distances[name] = distance
+        if route is not self.routes[name]:
+            self.routes[name] = route
+            self._dirty_tours.add(name)
+        self._fit_convergence(distance)
+        self.request_redraw()
+    
+    def add_convergence(self, iteration: int, distance: float):
+        """Thêm một điểm (vòng lặp, khoảng cách tốt nhất) vào đường hội tụ ACO"""
+        self.history_x.append(iteration)
+        self.history_y.append(distance)
+        if iteration > self.n_iterations:
+            self.n_iterations = iteration
+            self.ax_convergence.set_xlim(0, iteration)
+            self._full_draw = True
+        self._fit_convergence(distance)
+        self.request_redraw()
+    
+    def add_convergence_history(self, distances):
+        """Đặt cả đường hội tụ một lần (kết quả lấy từ bộ nhớ đệm không có tiến độ)"""
+        for iteration, distance in enumerate(distances, 1):
+            self.add_convergence(iteration, distance)
+    
+    def _fit_convergence(self, distance: float):
+        """Mở rộng trục tung khi giá trị mới nằm ngoài (đòi vẽ lại nền, hiếm khi xảy ra)"""
+        if not np.isfinite(distance):
+            return
+        values = [v for v in (distance, self.distances['bt']) if v is not None and np.isfinite(v)]
+        if self.history_y:
+            values.append(self.history_y[0])
+        lower, upper = min(values), max(values)
+        if self._y_range is None or lower < self._y_range[0] or upper > self._y_range[1]:
+            # Chừa nhiều khoảng trống phía dưới: khoảng cách chỉ giảm dần nên ít phải mở rộng lại
+            span = max(upper - lower, abs(lower) * 0.1, 1e-9)
+            self._y_range = (lower - 0.25 * span, upper + 0.05 * span)
+            self.ax_convergence.set_ylim(*self._y_range)
+            self._full_draw = True
+    
+    def request_redraw(self):
+        """Hẹn một lần vẽ, không sớm hơn FRAME_INTERVAL kể từ lần vẽ trước"""
+        if self._pending is not None:
+            return
+        delay = self._last_render + self.FRAME_INTERVAL - time.perf_counter()
+        self._pending = self.widget.after(max(int(delay * 1000), 0), self._render)
+    
+    def _render(self):
+        self._pending = None
+        self._last_render = time.perf_counter()
+        self._update_artists()
+        if self._full_draw or self._background is None:
+            # Vẽ lại toàn bộ; _on_draw lưu nền mới và vẽ các artist động
+            self._full_draw = False
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.figure.bbox)
+    
+    def _update_artists(self):
+        """Đưa dữ liệu đã nhận vào các artist (chỉ các tuyến đã thay đổi)"""
+        for name in self._dirty_tours:
+            route = np.asarray(self.routes[name], dtype=np.intp)
+            if len(route) > 1 and route.max() < len(self.points):
+                closed = self.points[np.append(route, route[0])]
+                self.tours[name].set_data(closed[:, 0], closed[:, 1])
+        self._dirty_tours.clear()
+        
+        self.convergence_line.set_data(self.history_x, self.history_y)
+        bt = self.distances['bt']
+        if bt is not None and np.isfinite(bt):
+            self.bt_line.set_data([0, self.n_iterations], [bt, bt])
+        self.route_text.set_text('   '.join(
+            f"{self.LABELS[name]}: {distance:.2f}" for name, distance in self.distances.items()
+            if distance is not None and np.isfinite(distance)))
+    
+    def _draw_animated(self):
+        for artist in (*self.tours.values(), self.route_text, self.convergence_line, self.bt_line):
+            artist.axes.draw_artist(artist)
+    
+    def _on_draw(self, event):
+        # Sau mỗi lần vẽ toàn bộ (kể cả khi đổi kích thước cửa sổ): lưu nền, vẽ lại artist động
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+class CityList(ttk.Frame):
+    """
+    Danh sách thành phố ảo hóa: Treeview chỉ giữ đúng số hàng đang hiển thị, nội dung các
+    hàng được điền lại từ nguồn dữ liệu khi cuộn hoặc khi danh sách thay đổi
+
+    Mỗi lần cập nhật tốn O(số hàng hiển thị) thay vì dựng lại cả danh sách (O(n)), nên vẫn
+    nhanh với hàng chục nghìn thành phố. Thanh cuộn được điều khiển theo chỉ số hàng đầu tiên.
+    """
+    
+    COLUMNS = (('index', '#', 50), ('name', 'Ten', 120), ('lat', 'Lat', 70), ('lon', 'Lon', 70))
+    # Số hàng cuộn mỗi nấc con lăn chuột
+    WHEEL_ROWS = 3
+    
+    def __init__(self, master, source, rows: int = 10):
+        """
+        Args:
+            master: Widget cha
+            source: Hàm trả về (tên các thành phố, tọa độ (vĩ độ, kinh độ)) hiện tại
+            rows: Số hàng hiển thị ban đầu (sau đó tính lại theo kích thước widget)
+        """
+        super().__init__(master)
+        self.source = source
+        self.top = 0
+        
+        self.title = ttk.Label(self)
+        self.title.pack(fill='x')
+        body = ttk.Frame(self)
+        body.pack(fill='both', expand=True)
+        self.tree = ttk.Treeview(body, columns=[column for column, _, _ in self.COLUMNS],
+                                 show='headings', height=rows, selectmode='browse')
+        for column, heading, width in self.COLUMNS:
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, minwidth=30, stretch=column == 'name',
+                             anchor='w' if column == 'name' else 'e')
+        self.scrollbar = ttk.Scrollbar(body, orient='vertical', command=self._on_scrollbar)
+        self.scrollbar.pack(side='right', fill='y')
+        self.tree.pack(side='left', fill='both', expand=True)
+        
+        self._items = []
+        self._set_rows(rows)
+        self.tree.bind('<Configure>', self._on_resize)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.tree.bind(sequence, self._on_wheel)
+        for sequence, action in (('<Prior>', lambda: -len(self._items)), ('<Next>', lambda: len(self._items)),
+                                 ('<Home>', lambda: -self.top), ('<End>', lambda: len(self.source()[0]))):
+            self.tree.bind(sequence, lambda event, action=action: self._scroll(action()) or 'break')
+    
+    def _set_rows(self, rows: int):
+        """Đặt số hàng của Treeview (tạo thêm hoặc xóa bớt các hàng dùng lại)"""
+        while len(self._items) < rows:
+            self._items.append(self.tree.insert('', 'end', values=('', '', '', '')))
+        if len(self._items) > rows:
+            self.tree.delete(*self._items[rows:])
+            del self._items[rows:]
+    
+    def _on_resize(self, event):
+        # Chỉ giữ các hàng nằm trọn trong widget; chiều cao hàng đo từ hàng đầu tiên
+        bbox = self.tree.bbox(self._items[0]) if self._items else ''
+        if not bbox:
+            return
+        _, y, _, row_height = bbox
+        rows = max(1, (event.height - y) // max(row_height, 1))
+        if rows != len(self._items):
+            self._set_rows(rows)
+            self.refresh()
+    
+    def refresh(self, scroll_to_end: bool = False):
+        """Điền lại các hàng đang hiển thị theo dữ liệu hiện tại (O(số hàng hiển thị))"""
+        names, coordinates = self.source()
+        n, rows = len(names), len(self._items)
+        if scroll_to_end:
+            self.top = n - rows
+        self.top = max(0, min(self.top, n - rows))
+        for offset, item in enumerate(self._items):
+            i = self.top + offset
+            if i < n:
+                lat, lon = coordinates[i]
+                self.tree.item(item, values=(i + 1, names[i], f'{lat:.4f}', f'{lon:.4f}'))
+            else:
+                self.tree.item(item, values=('', '', '', ''))
+        self.title.config(text=f'Danh sach ({n} thanh pho)')
+        if n > rows:
+            self.scrollbar.set(self.top / n, (self.top + rows) / n)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def _scroll(self, rows: int):
+        self.top += rows
+        self.refresh()
+    
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.top = int(float(amount) * len(self.source()[0]))
+            self.refresh()
+        elif action == 'scroll':
+            self._scroll(int(amount) * (len(self._items) if unit == 'pages' else 1))
+    
+    def _on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self._scroll(-self.WHEEL_ROWS)
+        elif event.num == 5 or event.delta < 0:
+            self._scroll(self.WHEEL_ROWS)
+        return 'break'
 
 class TSPGUI:
+    # Chu kỳ đọc hàng đợi tiến độ khi đang giải (ms); biểu đồ tự giới hạn theo khung hình
+    POLL_INTERVAL_MS = 16
+    # Backtracking (nhánh cận 'mst', engine 'iterative') chỉ chạy tới số thành phố này, lớn hơn
+    # chỉ chạy ACO: bài toán ngẫu nhiên 16 thành phố giải xong dưới 0.3 giây, từ 18 thành phố
+    # có bài toán mất hàng chục giây
+    EXACT_MAX_CITIES = 16
+    # Giới hạn thời gian của Backtracking (giây) cho các bài toán khó (thành phố phân cụm):
+    # hết giờ thì hiển thị lời giải tốt nhất hiện có, chưa chứng minh tối ưu
+    EXACT_TIME_LIMIT = 30
+    # Từ số thành phố này ACO dùng engine 'numpy' với danh sách ứng viên
+    NUMPY_ENGINE_MIN_CITIES = 200
+    # Lớn hơn thì không lưu ma trận n x n (10000 thành phố ~ 800 MB) mà dùng DistanceOracle
+    MATRIX_MAX_CITIES = 2000
+    MAX_RANDOM_CITIES = 20000
+    
+    DEFAULT_CITIES = ['Ha Noi', 'Hai Phong', 'Da Nang', 'TP.HCM', 'Can Tho']
+    DEFAULT_COORDINATES = [
+        (21.0285, 105.8542), (20.8449, 106.6881), (16.0544, 108.2022),
+        (10.7769, 106.6964), (10.0379, 105.7869)
+    ]
+    
     def __init__(self, root):
         self.root = root
         self.root.title("TSP: Backtracking vs ACO")
         self.root.geometry("1000x700")
         self.root.resizable(False, False)
         
-        self.cities = ['Ha Noi', 'Hai Phong', 'Da Nang', 'TP.HCM', 'Can Tho']
-        self.coordinates = [
-            (21.0285, 105.8542), (20.8449, 106.6881), (16.0544, 108.2022),
-            (10.7769, 106.6964), (10.0379, 105.7869)
-        ]
+        self.cities = list(self.DEFAULT_CITIES)
+        self.coordinates = list(self.DEFAULT_COORDINATES)
         self.distance_matrix = np.array([
             [0, 120, 764, 1710, 1840],
             [120, 0, 840, 1830, 1960],
@@ -37,7 +344,30 @@ class TSPGUI:
         self.result_backtracking = None
         self.result_aco = None
         self.normalized_coordinates = None
+        self.bt_solver = None
         self.aco_solver = None
+        self.live_chart = None
+        
+        # Ma trận khoảng cách sửa tăng dần (thêm/bớt một hàng và cột O(n)) và tuyến
+        # tốt nhất của lần giải trước, được sửa theo mỗi lần thêm/bớt thành phố để làm
+        # lời giải ban đầu cho lần giải sau. instance_version tăng khi bài toán thay đổi.
+        self._distances = None
+        self.best_tour = None
+        self.instance_version = 0
+        self.solve_version = 0
+        
+        # Kết quả đã giải (Backtracking luôn, ACO khi có seed) theo mã băm ma trận và tham số:
+        # bấm giải lại cùng bài toán không phải chạy lại
+        self.cache = ResultCache()
+        # Ma trận khoảng cách theo mã băm tọa độ; bộ nhớ đệm riêng, ít mục vì mỗi ma trận
+        # tới MATRIX_MAX_CITIES thành phố chiếm tới ~32 MB
+        self.matrix_cache = ResultCache(max_entries=4)
+        
+        # Trạng thái giải nền: các luồng solver gửi tiến độ qua hàng đợi,
+        # luồng Tk đọc hàng đợi định kỳ bằng root.after
+        self.stop_event = None
+        self.progress_queue = queue.Queue()
+        self.running = set()
         
         self.create_widgets()
     
@@ -83,10 +413,12 @@ class TSPGUI:
         sub_notebook.add(default_tab, text='Mac dinh')
         ttk.Button(default_tab, text='Su dung 5 thanh pho', 
                   command=self.use_default_cities).pack(pady=5)
-        default_text = scrolledtext.ScrolledText(default_tab, height=8, width=35)
-        default_text.pack(fill='both', expand=True, padx=3, pady=3)
-        default_text.insert('end', self.format_cities())
-        default_text.config(state='disabled')
+        default_list = CityList(default_tab, lambda: (self.DEFAULT_CITIES, self.DEFAULT_COORDINATES), rows=8)
+        default_list.pack(fill='both', expand=True, padx=3, pady=3)
+        default_list.refresh()
+        
+        # Các danh sách còn lại hiển thị bài toán hiện tại, làm mới bằng update_city_lists()
+        current = lambda: (self.cities, self.coordinates)
         
         # Manual Tab
         manual_tab = ttk.Frame(sub_notebook)
@@ -113,8 +445,8 @@ class TSPGUI:
         ttk.Button(btn_frame, text='Xoa', command=self.remove_city, width=8).pack(side='left', padx=1)
         ttk.Button(btn_frame, text='Xoa tat', command=self.clear_cities, width=8).pack(side='left', padx=1)
         
-        self.text_manual_cities = scrolledtext.ScrolledText(manual_tab, height=6, width=35)
-        self.text_manual_cities.pack(fill='both', expand=True, padx=3, pady=3)
+        self.list_manual_cities = CityList(manual_tab, current, rows=6)
+        self.list_manual_cities.pack(fill='both', expand=True, padx=3, pady=3)
         
         # CSV Tab
         csv_tab = ttk.Frame(sub_notebook)
@@ -128,8 +460,8 @@ class TSPGUI:
         ttk.Button(frame_csv, text='Browse', command=self.browse_csv, width=8).pack(side='left', padx=1)
         ttk.Button(frame_csv, text='Load', command=self.load_csv, width=8).pack(side='left', padx=1)
         
-        self.text_csv_cities = scrolledtext.ScrolledText(csv_tab, height=10, width=35)
-        self.text_csv_cities.pack(fill='both', expand=True, padx=3, pady=3)
+        self.list_csv_cities = CityList(csv_tab, current)
+        self.list_csv_cities.pack(fill='both', expand=True, padx=3, pady=3)
         
         # Random Tab
         random_tab = ttk.Frame(sub_notebook)
@@ -138,14 +470,14 @@ class TSPGUI:
         frame_random = ttk.Frame(random_tab)
         frame_random.pack(fill='x', padx=3, pady=3)
         
-        ttk.Label(frame_random, text='N (5-15):', width=10).pack(side='left')
-        self.spin_n_cities = ttk.Spinbox(frame_random, from_=5, to=15, width=8)
+        ttk.Label(frame_random, text=f'N (5-{self.MAX_RANDOM_CITIES}):', width=12).pack(side='left')
+        self.spin_n_cities = ttk.Spinbox(frame_random, from_=5, to=self.MAX_RANDOM_CITIES, width=8)
         self.spin_n_cities.set(10)
         self.spin_n_cities.pack(side='left', padx=2)
         ttk.Button(frame_random, text='Random', command=self.generate_random_cities, width=10).pack(side='left', padx=2)
         
-        self.text_random_cities = scrolledtext.ScrolledText(random_tab, height=10, width=35)
-        self.text_random_cities.pack(fill='both', expand=True, padx=3, pady=3)
+        self.list_random_cities = CityList(random_tab, current)
+        self.list_random_cities.pack(fill='both', expand=True, padx=3, pady=3)
     
     def create_params_tab(self, parent):
         """Create parameters tab"""
@@ -175,17 +507,28 @@ class TSPGUI:
         button_frame = ttk.Frame(parent)
         button_frame.pack(fill='x', padx=3, pady=5)
         
-        ttk.Button(button_frame, text='Giai bai toan', 
-                  command=self.solve_problem).pack(fill='x', pady=2)
+        self.solve_button = ttk.Button(button_frame, text='Giai bai toan', 
+                                       command=self.solve_problem)
+        self.solve_button.pack(fill='x', pady=2)
+        self.cancel_button = ttk.Button(button_frame, text='Huy', 
+                                        command=self.cancel_solve, state='disabled')
+        self.cancel_button.pack(fill='x', pady=2)
         ttk.Button(button_frame, text='Xem bieu do', 
                   command=self.show_comparison_chart).pack(fill='x', pady=2)
         ttk.Button(button_frame, text='In chi tiet', 
                   command=self.print_details).pack(fill='x', pady=2)
+        
+        # Progress of the running solvers
+        self.progress_labels = {}
+        for name, label in (('bt', 'Backtracking'), ('aco', 'ACO')):
+            self.progress_labels[name] = ttk.Label(button_frame, text=f'{label}: -')
+            self.progress_labels[name].pack(fill='x', pady=1)
     
     def create_right_panel(self, parent):
         """Create right panel for results"""
         notebook = ttk.Notebook(parent)
         notebook.pack(fill='both', expand=True)
+        self.right_notebook = notebook
         
         # Results Tab
         results_frame = ttk.Frame(notebook)
@@ -194,19 +537,17 @@ class TSPGUI:
         self.text_results = scrolledtext.ScrolledText(results_frame, height=25, width=60)
         self.text_results.pack(fill='both', expand=True, padx=3, pady=3)
         
-        # Chart Tab
+        # Chart Tab: LiveChart được tạo ở lần giải đầu tiên rồi giữ lại, cập nhật tại chỗ
         self.chart_frame = ttk.Frame(notebook)
         notebook.add(self.chart_frame, text='Bieu do')
     
     def use_default_cities(self):
         """Load default cities"""
-        self.cities = ['Ha Noi', 'Hai Phong', 'Da Nang', 'TP.HCM', 'Can Tho']
-        self.coordinates = [
-            (21.0285, 105.8542), (20.8449, 106.6881), (16.0544, 108.2022),
-            (10.7769, 106.6964), (10.0379, 105.7869)
-        ]
+        self.cities = list(self.DEFAULT_CITIES)
+        self.coordinates = list(self.DEFAULT_COORDINATES)
         self.normalize_coordinates()
         self.distance_matrix = self.calculate_distance_matrix()
+        self.update_city_lists()
         messagebox.showinfo('Thanh cong', f'Da load {len(self.cities)} thanh pho')
     
     def add_city(self):
@@ -224,13 +565,21 @@ class TSPGUI:
             self.cities.append(name)
             self.coordinates.append((lat, lon))
             self.normalize_coordinates()
-            self.distance_matrix = self.calculate_distance_matrix()
+            if (self._distances is not None and len(self._distances) == len(self.coordinates) - 1
+                    and len(self.coordinates) <= self.MATRIX_MAX_CITIES):
+                index = self._distances.append((lat, lon))
+                self.distance_matrix = self._distances.matrix
+                if self.best_tour is not None:
+                    self.best_tour, _ = insert_cheapest(self.best_tour, index, self.distance_matrix)
+                self.instance_version += 1
+            else:
+                self.distance_matrix = self.calculate_distance_matrix()
             
             self.entry_city_name.delete(0, 'end')
             self.entry_lon.delete(0, 'end')
             self.entry_lat.delete(0, 'end')
             
-            self.update_manual_cities_display()
+            self.update_city_lists(scroll_to_end=True)
             messagebox.showinfo('Thanh cong', f'Da them {name}')
         except ValueError:
             messagebox.showerror('Loi', 'Toa do phai la so!')
@@ -241,17 +590,25 @@ class TSPGUI:
             removed = self.cities.pop()
             self.coordinates.pop()
             self.normalize_coordinates()
-            if self.cities:
+            if self._distances is not None and len(self._distances) == len(self.coordinates) + 1:
+                index = len(self.coordinates)
+                if self.best_tour is not None:
+                    self.best_tour, _ = remove_from_route(self.best_tour, index, self.distance_matrix)
+                self._distances.remove(index)
+                self.distance_matrix = self._distances.matrix
+                self.instance_version += 1
+            elif self.cities:
                 self.distance_matrix = self.calculate_distance_matrix()
-            self.update_manual_cities_display()
+            self.update_city_lists(scroll_to_end=True)
     
     def clear_cities(self):
         """Clear all cities from the list"""
         self.cities = []
         self.coordinates = []
-        self.text_manual_cities.config(state='normal')
-        self.text_manual_cities.delete('1.0', 'end')
-        self.text_manual_cities.config(state='disabled')
+        self._distances = None
+        self.best_tour = None
+        self.instance_version += 1
+        self.update_city_lists()
     
     def browse_csv(self):
         """Browse for a CSV file"""
@@ -280,15 +637,9 @@ class TSPGUI:
                         self.cities.append(name)
                         self.coordinates.append((lat, lon))
             
-            if len(self.cities) > 15:
-                messagebox.showwarning('Canh bao', 
-                    f'CSV co {len(self.cities)} thanh pho. Chi su dung toi da 15.')
-                self.cities = self.cities[:15]
-                self.coordinates = self.coordinates[:15]
-            
             self.normalize_coordinates()
             self.distance_matrix = self.calculate_distance_matrix()
-            self.update_csv_cities_display()
+            self.update_city_lists()
             messagebox.showinfo('Thanh cong', f'Da load {len(self.cities)} thanh pho')
         except Exception as e:
             messagebox.showerror('Loi', f'Loi load CSV: {str(e)}')
@@ -296,54 +647,23 @@ class TSPGUI:
     def generate_random_cities(self):
         """Generate random cities"""
         n = int(self.spin_n_cities.get())
+        if not 5 <= n <= self.MAX_RANDOM_CITIES:
+            messagebox.showerror('Loi', f'N phai tu 5 den {self.MAX_RANDOM_CITIES}!')
+            return
         self.cities = [f'Thanh pho {i+1}' for i in range(n)]
-        self.coordinates = [(np.random.uniform(16, 22), np.random.uniform(103, 108)) for _ in range(n)]
+        lats, lons = np.random.uniform(16, 22, n), np.random.uniform(103, 108, n)
+        self.coordinates = list(zip(lats.tolist(), lons.tolist()))
         
         self.normalize_coordinates()
         self.distance_matrix = self.calculate_distance_matrix()
-        
-        text = f'Sinh {n} thanh pho ngau nhien:\n\n'
-        for i, city in enumerate(self.cities):
-            lat, lon = self.coordinates[i]
-            text += f'{i+1}. {city}\n'
-        
-        self.text_random_cities.config(state='normal')
-        self.text_random_cities.delete('1.0', 'end')
-        self.text_random_cities.insert('end', text)
-        self.text_random_cities.config(state='disabled')
+        self.update_city_lists()
         
         messagebox.showinfo('Thanh cong', f'Sinh {n} thanh pho')
     
-    def update_manual_cities_display(self):
-        """Update display for manually added cities"""
-        text = f'Danh sach ({len(self.cities)} thanh pho):\n\n'
-        for i, city in enumerate(self.cities):
-            text += f'{i+1}. {city}\n'
-        
-        self.text_manual_cities.config(state='normal')
-        self.text_manual_cities.delete('1.0', 'end')
-        self.text_manual_cities.insert('end', text)
-        self.text_manual_cities.config(state='disabled')
-    
-    def update_csv_cities_display(self):
-        """Update display for cities loaded from CSV"""
-        text = f'Tong {len(self.cities)} thanh pho:\n\n'
-        for i, city in enumerate(self.cities[:10]):
-            text += f'{i+1}. {city}\n'
-        if len(self.cities) > 10:
-            text += f'... va {len(self.cities)-10} thanh pho khac\n'
-        
-        self.text_csv_cities.config(state='normal')
-        self.text_csv_cities.delete('1.0', 'end')
-        self.text_csv_cities.insert('end', text)
-        self.text_csv_cities.config(state='disabled')
-    
-    def format_cities(self):
-        """Format the city list for display"""
-        text = 'Danh sach 5 thanh pho:\n\n'
-        for i, city in enumerate(self.cities):
-            text += f'{i+1}. {city}\n'
-        return text
+    def update_city_lists(self, scroll_to_end=False):
+        """Làm mới các danh sách thành phố (chỉ các hàng đang hiển thị)"""
+        for city_list in (self.list_manual_cities, self.list_csv_cities, self.list_random_cities):
+            city_list.refresh(scroll_to_end)
     
     def normalize_coordinates(self):
         """Normalize coordinates to a [0, 100] range"""
@@ -364,28 +684,26 @@ class TSPGUI:
         ]
     
     def calculate_distance_matrix(self):
-        """Calculate the distance matrix between cities"""
-        n = len(self.cities)
-        matrix = np.zeros((n, n))
-        
-        for i in range(n):
-            for j in range(i+1, n):
-                lat1, lon1 = self.normalized_coordinates[i]
-                lat2, lon2 = self.normalized_coordinates[j]
-                dist = np.sqrt((lat2-lat1)**2 + (lon2-lon1)**2)
-                matrix[i][j] = dist
-                matrix[j][i] = dist
-        
-        return matrix
+        """Calculate the distance matrix between cities (great-circle km)"""
+        # Dựng lại toàn bộ: tuyến tốt nhất cũ không còn ứng với bài toán mới
+        self.best_tour = None
+        self.instance_version += 1
+        if len(self.coordinates) > self.MATRIX_MAX_CITIES:
+            # Bài toán lớn: khoảng cách tính theo yêu cầu từ tọa độ, ACO chỉ lưu các cạnh ứng viên
+            self._distances = None
+            return DistanceOracle(self.coordinates)
+        # Nạp lại cùng bộ tọa độ (mở lại file, xóa rồi thêm lại thành phố) dùng lại ma trận đã tính
+        matrix = cached_distance_matrix(self.matrix_cache, self.coordinates)
+        self._distances = IncrementalDistanceMatrix(self.coordinates, matrix=matrix)
+        return self._distances.matrix
     
     def solve_problem(self):
-        """Solve TSP using both algorithms"""
-        if len(self.cities) < 3:
-            messagebox.showerror('Loi', 'Can it nhat 3 thanh pho!')
+        """Solve TSP using both algorithms in background threads"""
+        if self.running:
             return
         
-        if len(self.cities) > 15:
-            messagebox.showerror('Loi', f'Toi da 15 thanh pho (hien co {len(self.cities)})')
+        if len(self.cities) < 3:
+            messagebox.showerror('Loi', 'Can it nhat 3 thanh pho!')
             return
         
         # Get ACO parameters
@@ -400,21 +718,164 @@ class TSPGUI:
         self.text_results.delete('1.0', 'end')
         self.text_results.insert('end', 'Dang giai bai toan...\n')
         self.text_results.config(state='disabled')
-        self.root.update()
         
-        # Solve with Backtracking
-        bt_solver = TSPBacktracking(self.cities, self.distance_matrix)
-        self.result_backtracking = bt_solver.solve(verbose=False)
+        # Hai solver chạy đồng thời trên hai luồng nền; NumPy nhả GIL trong các phép
+        # toán mảng nên giao diện vẫn phản hồi. Hủy bằng stop_event (dừng hợp tác).
+        self.stop_event = threading.Event()
+        self.progress_queue = queue.Queue()
+        self.result_backtracking = None
+        self.result_aco = None
         
-        # Solve with ACO
-        aco_solver = TSP_ACO(self.cities, self.distance_matrix,
+        # Solver nhận bản sao của ma trận (ma trận tăng dần có thể bị sửa tại chỗ khi
+        # người dùng thêm/bớt thành phố trong lúc đang giải; DistanceOracle được tạo mới
+        # mỗi khi bài toán đổi nên dùng chung được) và tuyến tốt nhất đã sửa của lần giải
+        # trước làm lời giải ban đầu
+        n = len(self.cities)
+        if isinstance(self.distance_matrix, DistanceOracle):
+            distance_matrix = self.distance_matrix
+        else:
+            distance_matrix = np.array(self.distance_matrix, dtype=float)
+        
+        # Chọn bộ giải theo kích thước: Backtracking chỉ khi n nhỏ, ACO dùng engine 'numpy'
+        # với danh sách ứng viên khi n lớn
+        bt_solver = None
+        if n <= self.EXACT_MAX_CITIES:
+            bt_solver = TSPBacktracking(list(self.cities), distance_matrix,
+                                        bound='mst', engine='iterative',
+                                        time_limit=self.EXACT_TIME_LIMIT,
+                                        stop_event=self.stop_event,
+                                        progress_callback=self._progress_reporter('bt'),
+                                        initial_route=self.best_tour)
+        aco_options = {}
+        if n >= self.NUMPY_ENGINE_MIN_CITIES:
+            aco_options = {'engine': 'numpy', 'n_candidates': TSP_ACO.SPARSE_CANDIDATES}
+        aco_solver = TSP_ACO(list(self.cities), distance_matrix,
                             n_ants=n_ants, n_iterations=n_iter,
-                            alpha=alpha, beta=beta, evaporation_rate=evap, q=q)
-        self.result_aco = aco_solver.solve(verbose=False)
-        
+                            alpha=alpha, beta=beta, evaporation_rate=evap, q=q,
+                            stop_event=self.stop_event,
+                            progress_callback=self._progress_reporter('aco'),
+                            initial_route=self.best_tour, **aco_options)
+        self.bt_solver = bt_solver
         self.aco_solver = aco_solver
+        self.solve_version = self.instance_version
+        
+        self._start_live_chart(n_iter)
+        
+        self.running = set()
+        for name, solver in (('bt', bt_solver), ('aco', aco_solver)):
+            label = 'Backtracking' if name == 'bt' else 'ACO'
+            if solver is None:
+                self.progress_labels[name].config(text=f'{label}: bo qua (n > {self.EXACT_MAX_CITIES})')
+                continue
+            self.running.add(name)
+            self.progress_labels[name].config(text=f'{label}: dang chay...')
+            threading.Thread(target=self._run_solver, args=(name, solver), daemon=True).start()
+        
+        self.solve_button.config(state='disabled')
+        self.cancel_button.config(state='normal')
+        self.root.after(self.POLL_INTERVAL_MS, self._poll_progress)
+    
+    def _start_live_chart(self, n_iterations):
+        """Tạo bảng biểu đồ nếu chưa có, đặt lại theo bài toán hiện tại"""
+        if self.live_chart is None:
+            self.live_chart = LiveChart(self.chart_frame)
+        if self.normalized_coordinates is None or len(self.normalized_coordinates) != len(self.cities):
+            self.normalize_coordinates()
+        # normalized_coordinates là (vĩ độ, kinh độ): trục hoành là kinh độ
+        self.live_chart.reset([(lon, lat) for lat, lon in self.normalized_coordinates], n_iterations)
+    
+    def cancel_solve(self):
+        """Request the running solvers to stop; they return their best result so far"""
+        if self.stop_event is not None:
+            self.stop_event.set()
+            self.cancel_button.config(state='disabled')
+    
+    def _progress_reporter(self, name):
+        """Callback chạy trên luồng solver: chỉ đưa tiến độ vào hàng đợi, không chạm Tk"""
+        return lambda info: self.progress_queue.put(('progress', name, info))
+    
+    def _run_solver(self, name, solver):
+        """Thân luồng nền: giải và gửi kết quả (hoặc lỗi) về luồng Tk"""
+        try:
+            self.progress_queue.put(('done', name, cached_solve(solver, self.cache)))
+        except Exception as exc:
+            self.progress_queue.put(('error', name, exc))
+    
+    def _poll_progress(self):
+        """Đọc hàng đợi tiến độ trên luồng Tk, cập nhật nhãn và hiển thị kết quả khi xong"""
+        errors = []
+        chart = self.live_chart
+        # Nhãn chỉ cập nhật theo tiến độ mới nhất của mỗi bộ giải; biểu đồ nhận mọi điểm
+        latest = {}
+        while True:
+            try:
+                kind, name, payload = self.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            label = 'Backtracking' if name == 'bt' else 'ACO'
+            if kind == 'progress':
+                latest[name] = payload
+                if name == 'aco':
+                    chart.add_convergence(payload['iteration'], payload['best_distance'])
+                chart.set_tour(name, payload.get('best_route'), payload['best_distance'])
+                continue
+            
+            latest.pop(name, None)
+            self.running.discard(name)
+            if kind == 'error':
+                errors.append(f'{label}: {payload}')
+                self.progress_labels[name].config(text=f'{label}: loi')
+                continue
+            if name == 'bt':
+                self.result_backtracking = payload
+                chart.set_tour(name, self.bt_solver.best_route, payload['distance'])
+            else:
+                self.result_aco = payload
+                if not chart.history_x:
+                    chart.add_convergence_history(payload.get('convergence') or [])
+                chart.set_tour(name, self.aco_solver.best_route, payload['distance'])
+            status = 'da huy' if payload.get('cancelled') else 'xong'
+            self.progress_labels[name].config(text=f"{label}: {status} ({payload['time']:.2f}s)")
+        
+        for name, payload in latest.items():
+            if name == 'bt':
+                text = f"Backtracking: {payload['nodes']:,} nut, tot nhat {payload['best_distance']:.2f}"
+            else:
+                text = (f"ACO: vong {payload['iteration']}/{payload['n_iterations']}, "
+                        f"tot nhat {payload['best_distance']:.2f}")
+            self.progress_labels[name].config(text=f"{text} ({payload['elapsed']:.1f}s)")
+        
+        if errors:
+            messagebox.showerror('Loi', '\n'.join(errors))
+        
+        if self.running:
+            self.root.after(self.POLL_INTERVAL_MS, self._poll_progress)
+            return
         
-        self.display_results()
+        self.solve_button.config(state='normal')
+        self.cancel_button.config(state='disabled')
+        self._remember_best_tour()
+        # Backtracking bị bỏ qua với bài toán lớn: chỉ cần kết quả ACO
+        bt_done = self.bt_solver is None or (self.result_backtracking and self.result_backtracking['route'])
+        if bt_done and self.result_aco and self.result_aco['route']:
+            self.display_results()
+        else:
+            self.text_results.config(state='normal')
+            self.text_results.delete('1.0', 'end')
+            self.text_results.insert('end', 'Da huy truoc khi co ket qua.\n')
+            self.text_results.config(state='disabled')
+            self.result_backtracking = None
+            self.result_aco = None
+    
+    def _remember_best_tour(self):
+        """Giữ tuyến tốt nhất (chỉ số) của lần giải vừa xong nếu bài toán chưa bị sửa trong lúc giải"""
+        if self.instance_version != self.solve_version:
+            return
+        routes = [solver for solver in (self.bt_solver, self.aco_solver)
+                  if solver is not None and solver.best_route]
+        if routes:
+            best = min(routes, key=lambda solver: solver.best_distance)
+            self.best_tour = list(best.best_route)
     
     def display_results(self):
         """Display results"""
@@ -431,13 +892,24 @@ class TSPGUI:
         # Backtracking results
         text += "1. BACKTRACKING (Quay lui)\n"
         text += "=" * 60 + "\n"
-        text += f"Tuyen duong: {' THEN '.join(self.result_backtracking['route'][:5])}"
-        if len(self.result_backtracking['route']) > 5:
-            text += " ..."
-        text += "\n"
-        text += f"Khoang cach: {self.result_backtracking['distance']:.2f}\n"
-        text += f"Thoi gian: {self.result_backtracking['time']:.6f} giay\n"
-        text += f"Pham vi: O(n!)\n\n"
+        if self.result_backtracking is None:
+            text += f"Bo qua: hon {self.EXACT_MAX_CITIES} thanh pho, chi chay ACO\n\n"
+        else:
+            text += f"Tuyen duong: {' THEN '.join(self.result_backtracking['route'][:5])}"
+            if len(self.result_backtracking['route']) > 5:
+                text += " ..."
+            text += "\n"
+            text += f"Khoang cach: {self.result_backtracking['distance']:.2f}"
+            if self.result_backtracking.get('cancelled'):
+                text += " (da huy, chua chac toi uu)"
+            elif self.result_backtracking.get('timed_out'):
+                text += f" (het {self.EXACT_TIME_LIMIT} giay, chua chac toi uu)"
+            text += "\n"
+            text += f"Thoi gian: {self.result_backtracking['time']:.6f} giay"
+            if self.result_backtracking.get('cached'):
+                text += " (lay tu bo nho dem)"
+            text += "\n"
+            text += f"Pham vi: O(n!)\n\n"
         
         # ACO results
         text += "2. ACO (Ant Colony Optimization)\n"
@@ -446,8 +918,14 @@ class TSPGUI:
         if len(self.result_aco['route']) > 5:
             text += " ..."
         text += "\n"
-        text += f"Khoang cach: {self.result_aco['distance']:.2f}\n"
-        text += f"Thoi gian: {self.result_aco['time']:.6f} giay\n"
+        text += f"Khoang cach: {self.result_aco['distance']:.2f}"
+        if self.result_aco.get('cancelled'):
+            text += " (da huy)"
+        text += "\n"
+        text += f"Thoi gian: {self.result_aco['time']:.6f} giay"
+        if self.result_aco.get('cached'):
+            text += " (lay tu bo nho dem)"
+        text += "\n"
         text += f"Pham vi: O(n^2 x m x iterations)\n\n"
         
         text += "THONG SO ACO:\n"
@@ -456,26 +934,27 @@ class TSPGUI:
         text += f"  Bay hoi: {self.aco_solver.evaporation_rate}, Q: {self.aco_solver.q}\n\n"
         
         # Comparison
-        text += "3. SO SANH\n"
-        text += "=" * 60 + "\n"
-        
-        dist_diff = abs(self.result_backtracking['distance'] - self.result_aco['distance'])
-        if self.result_backtracking['distance'] > 0:
-            percent_diff = (dist_diff / self.result_backtracking['distance']) * 100
-        else:
-            percent_diff = 0
-        
-        text += f"Khoang cach: BT={self.result_backtracking['distance']:.2f} / ACO={self.result_aco['distance']:.2f}\n"
-        text += f"Chenh lech: {dist_diff:.2f} ({percent_diff:.1f}%)\n\n"
-        
-        time_diff = abs(self.result_backtracking['time'] - self.result_aco['time'])
-        if self.result_backtracking['time'] > 0:
-            time_percent = (time_diff / self.result_backtracking['time']) * 100
-        else:
-            time_percent = 0
-        
-        text += f"Thoi gian: BT={self.result_backtracking['time']:.6f}s / ACO={self.result_aco['time']:.6f}s\n"
-        text += f"Chenh lech: {time_diff:.6f}s\n"
+        if self.result_backtracking is not None:
+            text += "3. SO SANH\n"
+            text += "=" * 60 + "\n"
+            
+            dist_diff = abs(self.result_backtracking['distance'] - self.result_aco['distance'])
+            if self.result_backtracking['distance'] > 0:
+                percent_diff = (dist_diff / self.result_backtracking['distance']) * 100
+            else:
+                percent_diff = 0
+            
+            text += f"Khoang cach: BT={self.result_backtracking['distance']:.2f} / ACO={self.result_aco['distance']:.2f}\n"
+            text += f"Chenh lech: {dist_diff:.2f} ({percent_diff:.1f}%)\n\n"
+            
+            time_diff = abs(self.result_backtracking['time'] - self.result_aco['time'])
+            if self.result_backtracking['time'] > 0:
+                time_percent = (time_diff / self.result_backtracking['time']) * 100
+            else:
+                time_percent = 0
+            
+            text += f"Thoi gian: BT={self.result_backtracking['time']:.6f}s / ACO={self.result_aco['time']:.6f}s\n"
+            text += f"Chenh lech: {time_diff:.6f}s\n"
         
         self.text_results.config(state='normal')
         self.text_results.delete('1.0', 'end')
@@ -483,53 +962,15 @@ class TSPGUI:
         self.text_results.config(state='disabled')
     
     def show_comparison_chart(self):
-        """Show comparison charts"""
-        if not self.result_backtracking or not self.result_aco:
+        """Chuyển sang bảng biểu đồ (tuyến đường và hội tụ ACO, cập nhật trong lúc giải)"""
+        if self.live_chart is None:
             messagebox.showerror('Loi', 'Giai bai toan truoc!')
             return
-        
-        for widget in self.chart_frame.winfo_children():
-            widget.destroy()
-        
-        fig = Figure(figsize=(10, 5), dpi=100)
-        
-        # Chart 1: Distance comparison
-        ax1 = fig.add_subplot(121)
-        algorithms = ['Backtracking', 'ACO']
-        distances = [self.result_backtracking['distance'], self.result_aco['distance']]
-        colors = ['#FF6B6B', '#4ECDC4']
-        bars = ax1.bar(algorithms, distances, color=colors, alpha=0.7, edgecolor='black', linewidth=2)
-        ax1.set_ylabel('Khoang cach', fontsize=11)
-        ax1.set_title('So sanh khoang cach', fontsize=11, fontweight='bold')
-        ax1.grid(axis='y', alpha=0.3)
-        
-        for bar, dist in zip(bars, distances):
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{dist:.1f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
-        
-        # Chart 2: ACO convergence
-        ax2 = fig.add_subplot(122)
-        iterations = range(1, len(self.aco_solver.convergence_data) + 1)
-        ax2.plot(iterations, self.aco_solver.convergence_data, 'o-', 
-                color='#4ECDC4', linewidth=2, markersize=4)
-        ax2.axhline(y=self.result_backtracking['distance'], color='#FF6B6B', 
-                   linestyle='--', linewidth=2, label=f'BT: {self.result_backtracking["distance"]:.1f}')
-        ax2.set_xlabel('Lap', fontsize=11)
-        ax2.set_ylabel('Khoang cach', fontsize=11)
-        ax2.set_title('Qua trinh hoi tu ACO', fontsize=11, fontweight='bold')
-        ax2.legend()
-        ax2.grid(alpha=0.3)
-        
-        fig.tight_layout()
-        
-        canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.right_notebook.select(self.chart_frame)
     
     def print_details(self):
         """Print detailed steps"""
-        if not self.result_backtracking or not self.result_aco:
+        if not self.result_aco:
             messagebox.showerror('Loi', 'Giai bai toan truoc!')
             return
         
@@ -537,7 +978,9 @@ class TSPGUI:
         
         output += "BACKTRACKING - CAN PHAT HIEN:\n"
         output += "=" * 70 + "\n"
-        if self.result_backtracking['steps']:
+        if self.result_backtracking is None:
+            output += f"Bo qua (hon {self.EXACT_MAX_CITIES} thanh pho)\n"
+        elif self.result_backtracking['steps']:
             for step in self.result_backtracking['steps'][:30]:
                 output += step + "\n"
             if len(self.result_backtracking['steps']) > 30:
@@ -0,0 +1,186 @@
+"""
+Travelling Salesman Problem - Held-Karp Dynamic Programming
+Giải chính xác bài toán người du lịch bằng quy hoạch động trên tập con (bitmask)
+"""
+
+import time
+from typing import List
+
+import numpy as np
+
+
+def popcount(masks: np.ndarray, n_bits: int) -> np.ndarray:
+    """Đếm số bit 1 của từng phần tử trong mảng bitmask"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks)
+    counts = np.zeros(len(masks), dtype=np.uint8)
+    for bit in range(n_bits):
+        counts += ((masks >> bit) & 1).astype(np.uint8)
+    return counts
+
+
+class TSPHeldKarp:
+    # Số dòng tối đa xử lý trong một khối khi vector hóa (giới hạn bộ nhớ tạm)
+    CHUNK_SIZE = 1 << 16
+    
+    def __init__(self, cities: List[str], distance_matrix, memory_bounded: bool = False):
+        """
+        Khởi tạo bài toán TSP với Held-Karp
+        
+        Bảng DP: cost[S, j] = độ dài ngắn nhất đi từ thành phố 0, thăm đúng tập S
+        (không chứa thành phố 0) và kết thúc tại j. Các tập con cùng kích thước
+        được tính cùng lúc bằng phép toán mảng NumPy.
+        
+        Args:
+            cities: Danh sách tên các thành phố
+            distance_matrix: Ma trận khoảng cách giữa các thành phố, hoặc DistanceOracle
+                             (được chuyển thành ma trận đầy đủ vì bài toán nhỏ)
+            memory_bounded: True - chỉ giữ lớp chi phí trước đó và con trỏ cha,
+                            False - giữ toàn bộ bảng chi phí trong self.cost_layers
+        """
+        self.cities = cities
+        self.distance_matrix = distance_matrix
+        self.n_cities = len(cities)
+        self.memory_bounded = memory_bounded
+        self.best_route = None
+        self.best_distance = float('inf')
+        self.execution_time = 0
+        self.steps_log = []
+        self.explored_routes = 0
+        self.cost_layers = []
+        self.parent_layers = []
+    
+    @staticmethod
+    def estimate_memory(n_cities: int, memory_bounded: bool = False) -> int:
+        """Ước lượng số byte cần cho các bảng DP với n_cities thành phố"""
+        m = max(n_cities - 1, 0)
+        sizes = [0] * (m + 1)
+        count = 1
+        for s in range(1, m + 1):
+            count = count * (m - s + 1) // s
+            sizes[s] = count * m
+        parents = sum(sizes)
+        costs = 8 * (2 * max(sizes) if memory_bounded else sum(sizes))
+        ranks = 4 * (1 << m)
+        return parents + costs + ranks
+    
+    def _run_dp(self, dist: np.ndarray) -> float:
+        """Chạy quy hoạch động theo từng lớp kích thước tập con, trả về độ dài tối ưu"""
+        m = self.n_cities - 1
+        inner = dist[1:, 1:]
+        
+        masks = np.arange(1 << m, dtype=np.int64)
+        sizes = popcount(masks, m)
+        self._layers = [None] + [np.flatnonzero(sizes == s) for s in range(1, m + 1)]
+        
+        # rank[mask] = vị trí của mask trong lớp của nó
+        self._rank = np.empty(1 << m, dtype=np.int32)
+        for s in range(1, m + 1):
+            self._rank[self._layers[s]] = np.arange(len(self._layers[s]), dtype=np.int32)
+        
+        # Lớp 1: đi thẳng từ thành phố 0 đến j
+        previous = np.full((m, m), np.inf)
+        previous[np.arange(m), np.arange(m)] = dist[0, 1:]
+        self.parent_layers = [None, np.full((m, m), -1, dtype=np.int8)]
+        self.cost_layers = [None, previous]
+        self.explored_routes = m
+        
+        for s in range(2, m + 1):
+            layer = self._layers[s]
+            cost = np.full((len(layer), m), np.inf)
+            parent = np.full((len(layer), m), -1, dtype=np.int8)
+            
+            for j in range(m):
+                bit = 1 << j
+                rows = np.flatnonzero(layer & bit)
+                for start in range(0, len(rows), self.CHUNK_SIZE):
+                    chunk = rows[start:start + self.CHUNK_SIZE]
+                    prev_rows = self._rank[layer[chunk] ^ bit]
+                    candidates = previous[prev_rows] + inner[:, j]
+                    best = np.argmin(candidates, axis=1)
+                    cost[chunk, j] = candidates[np.arange(len(chunk)), best]
+                    parent[chunk, j] = best
+            
+            self.explored_routes += len(layer) * s
+            self.parent_layers.append(parent)
+            if self.memory_bounded:
+                self.cost_layers = [None]
+            else:
+                self.cost_layers.append(cost)
+            previous = cost
+            
+            if len(self.steps_log) < 50:
+                self.steps_log.append(f"Lớp {s}/{m}: {len(layer)} tập con, "
+                                      f"chi phí nhỏ nhất hiện tại {previous.min():.2f}")
+        
+        # Đóng chu trình: quay về thành phố 0
+        closing = previous[0] + dist[1:, 0]
+        self._last_city = int(np.argmin(closing))
+        return float(closing[self._last_city])
+    
+    def _reconstruct_route(self) -> List[int]:
+        """Lần ngược con trỏ cha để khôi phục tuyến đường tối ưu"""
+        m = self.n_cities - 1
+        mask = (1 << m) - 1
+        city = self._last_city
+        reversed_route = []
+        for s in range(m, 0, -1):
+            reversed_route.append(city + 1)
+            previous_city = int(self.parent_layers[s][self._rank[mask], city])
+            mask ^= 1 << city
+            city = previous_city
+        return [0] + reversed_route[::-1]
+    
+    def solve(self, verbose: bool = False) -> dict:
+        """
+        Giải bài toán TSP bằng Held-Karp
+        
+        Args:
+            verbose: In chi tiết các bước
+        
+        Returns:
+            dict: Kết quả gồm tuyến đường, khoảng cách, thời gian, log
+        """
+        start_time = time.perf_counter()
+        
+        if verbose:
+            print(f"\n{'='*70}")
+            print(f"THUẬT TOÁN HELD-KARP - QUY HOẠCH ĐỘNG TRÊN TẬP CON")
+            print(f"{'='*70}")
+            print(f"Số thành phố: {self.n_cities}")
+            print(f"Danh sách thành phố: {', '.join(self.cities)}")
+            print(f"Chế độ tiết kiệm bộ nhớ: {'Có' if self.memory_bounded else 'Không'}")
+            print(f"Bộ nhớ ước tính: {self.estimate_memory(self.n_cities, self.memory_bounded) / 2**20:.1f} MB")
+            print(f"Độ phức tạp: O(n^2 * 2^n)")
+            print(f"{'='*70}\n")
+        
+        dist = np.asarray(self.distance_matrix, dtype=float)
+        
+        if self.n_cities == 1:
+            self.best_route = [0]
+            self.best_distance = 0.0
+        else:
+            self.best_distance = self._run_dp(dist)
+            self.best_route = self._reconstruct_route()
+        
+        self.execution_time = time.perf_counter() - start_time
+        
+        # Chuyển đổi route từ index sang tên thành phố
+        best_route_names = [self.cities[i] for i in self.best_route]
+        
+        if verbose:
+            print(f"\nKẾT QUẢ:")
+            print(f"Tuyến đường tốt nhất: {' -> '.join(best_route_names)} -> {best_route_names[0]}")
+            print(f"Tổng khoảng cách: {self.best_distance:.2f} km")
+            print(f"Thời gian thực thi: {self.execution_time:.4f} giây")
+            print(f"Số trạng thái DP: {self.explored_routes}")
+            print(f"{'='*70}\n")
+        
+        return {
+            'route': best_route_names,
+            'distance': self.best_distance,
+            'time': self.execution_time,
+            'algorithm': 'Held-Karp (Quy hoạch động)',
+            'explored_routes': self.explored_routes,
+            'steps': self.steps_log
+        }
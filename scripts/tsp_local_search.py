@@ -0,0 +1,214 @@
+"""
+Travelling Salesman Problem - Local Search (2-opt, Or-opt)
+Cải thiện tuyến đường bằng tìm kiếm cục bộ với danh sách láng giềng và bit "don't-look"
+
+Các hàm giả định ma trận khoảng cách đối xứng. Mỗi bước chỉ tính chênh lệch
+độ dài O(1) cho các cạnh thay đổi, không tính lại cả tuyến đường. insert_cheapest và
+remove_from_route sửa tuyến đường khi bài toán được thêm/bớt một thành phố.
+"""
+
+import math
+from collections import deque
+from typing import List, Sequence, Tuple
+
+# Ngưỡng cải thiện tối thiểu để tránh lặp vô hạn do sai số số thực
+EPSILON = 1e-10
+
+
+def route_length(route: Sequence[int], dist) -> float:
+    """Tổng độ dài chu trình (bao gồm cạnh quay về thành phố đầu)"""
+    total = 0.0
+    for i in range(len(route) - 1):
+        total += dist[route[i]][route[i + 1]]
+    return total + dist[route[-1]][route[0]]
+
+
+def _reverse(tour: List[int], pos: List[int], i: int, j: int):
+    """Đảo đoạn vòng từ vị trí i đến j; đảo phần bù nếu phần bù ngắn hơn"""
+    n = len(tour)
+    length = (j - i) % n + 1
+    if 2 * length > n:
+        i, j = (j + 1) % n, (i - 1) % n
+        length = n - length
+    for _ in range(length // 2):
+        a, b = tour[i], tour[j]
+        tour[i] = b
+        pos[b] = i
+        tour[j] = a
+        pos[a] = j
+        i = i + 1 if i + 1 < n else 0
+        j = j - 1 if j > 0 else n - 1
+
+
+def _exchange(tour: List[int], pos: List[int], a: int, b: int, c: int, d: int):
+    """
+    Bước 2-opt: bỏ hai cạnh (a, b), (c, d), thêm (a, c), (b, d)
+
+    b, d là thành phố kề a, c theo cùng một chiều (cùng là thành phố sau, hoặc cùng là thành
+    phố trước); chiều của mảng có thể bị đảo sau mỗi lần _reverse nên được kiểm tra lại.
+    """
+    n = len(tour)
+    if tour[pos[a] + 1 if pos[a] + 1 < n else 0] == b:
+        _reverse(tour, pos, pos[b], pos[c])
+    else:
+        _reverse(tour, pos, pos[c], pos[b])
+
+
+def _try_two_opt(a: int, tour: List[int], pos: List[int], dist, neighbors) -> Tuple[int, ...]:
+    """
+    Thử một bước 2-opt quanh thành phố a
+
+    Returns:
+        Các thành phố đầu mút của bước đã áp dụng, hoặc () nếu không cải thiện được
+    """
+    n = len(tour)
+    i = pos[a]
+    for forward in (True, False):
+        b = tour[i + 1 if i + 1 < n else 0] if forward else tour[i - 1]
+        d_ab = dist[a][b]
+        for c in neighbors[a]:
+            d_ac = dist[a][c]
+            if d_ac >= d_ab:
+                break
+            j = pos[c]
+            d = tour[j + 1 if j + 1 < n else 0] if forward else tour[j - 1]
+            if c == b or d == a:
+                continue
+            delta = d_ac + dist[b][d] - d_ab - dist[c][d]
+            if delta < -EPSILON:
+                if forward:
+                    _reverse(tour, pos, pos[b], j)
+                else:
+                    _reverse(tour, pos, i, pos[d])
+                return a, b, c, d
+    return ()
+
+
+def _try_or_opt(a: int, tour: List[int], pos: List[int], dist, neighbors,
+                max_segment: int) -> Tuple[int, ...]:
+    """
+    Thử di chuyển đoạn 1..max_segment thành phố bắt đầu từ a tới vị trí khác (Or-opt)
+
+    Đoạn có thể được chèn xuôi hoặc ngược giữa hai thành phố kề nhau x, y,
+    trong đó x hoặc y là láng giềng gần của một đầu đoạn.
+
+    Returns:
+        Các thành phố đầu mút của bước đã áp dụng, hoặc () nếu không cải thiện được
+    """
+    n = len(tour)
+    start = pos[a]
+    for length in range(1, max_segment + 1):
+        if n < length + 3:
+            break
+        s1 = a
+        s2 = tour[(start + length - 1) % n]
+        p = tour[start - 1]
+        nx = tour[(start + length) % n]
+        removal_gain = dist[p][s1] + dist[s2][nx] - dist[p][nx]
+        if removal_gain <= EPSILON:
+            continue
+
+        for end in (s1, s2):
+            for c in neighbors[end]:
+                if dist[end][c] >= removal_gain:
+                    break
+                j = pos[c]
+                if (j - start) % n < length:
+                    continue
+                for x, y in ((c, tour[(j + 1) % n]), (tour[j - 1], c)):
+                    if (pos[x] - start) % n < length or (pos[y] - start) % n < length:
+                        continue
+                    d_xy = dist[x][y]
+                    forward_cost = dist[x][s1] + dist[s2][y] - d_xy
+                    backward_cost = dist[x][s2] + dist[s1][y] - d_xy
+                    insertion = min(forward_cost, backward_cost)
+                    if removal_gain - insertion > EPSILON:
+                        # Di chuyển tại chỗ bằng hai bước 2-opt (mỗi bước chỉ đảo phần ngắn hơn):
+                        # p s1..s2 nx..x y -> p x..nx s2..s1 y -> p nx..x s2..s1 y,
+                        # thêm một lần đảo đoạn (<= max_segment thành phố) nếu chèn xuôi
+                        _exchange(tour, pos, p, s1, x, y)
+                        _exchange(tour, pos, p, x, nx, s2)
+                        if forward_cost <= backward_cost:
+                            _exchange(tour, pos, x, s2, s1, y)
+                        return p, nx, s1, s2, x, y
+    return ()
+
+
+def improve_route(route: Sequence[int], dist, neighbors,
+                  or_opt: bool = True, max_segment: int = 3) -> Tuple[List[int], float]:
+    """
+    Cải thiện một tuyến đường bằng 2-opt và Or-opt tới khi đạt cực tiểu cục bộ
+
+    Mỗi thành phố có một bit "don't-look": thành phố không tìm được bước cải thiện
+    sẽ bị bỏ qua cho tới khi một cạnh kề nó thay đổi.
+
+    Args:
+        route: Tuyến đường ban đầu (danh sách chỉ số thành phố)
+        dist: Ma trận khoảng cách (nên là danh sách lồng nhau để truy cập nhanh)
+        neighbors: Danh sách láng giềng của mỗi thành phố, sắp xếp từ gần đến xa
+        or_opt: Thử thêm bước Or-opt (di chuyển đoạn 1-3 thành phố)
+        max_segment: Độ dài đoạn tối đa cho Or-opt
+
+    Returns:
+        (route, distance): Tuyến đường đã cải thiện và độ dài của nó
+    """
+    tour = list(route)
+    n = len(tour)
+    if n < 4:
+        return tour, route_length(tour, dist)
+
+    pos = [0] * n
+    for index, city in enumerate(tour):
+        pos[city] = index
+
+    active = deque(tour)
+    queued = [True] * n
+    while active:
+        a = active.popleft()
+        queued[a] = False
+        changed = _try_two_opt(a, tour, pos, dist, neighbors)
+        if not changed and or_opt:
+            changed = _try_or_opt(a, tour, pos, dist, neighbors, max_segment)
+        if changed:
+            for city in (a,) + changed:
+                if not queued[city]:
+                    queued[city] = True
+                    active.append(city)
+
+    return tour, route_length(tour, dist)
+
+
+def insert_cheapest(route: Sequence[int], city: int, dist) -> Tuple[List[int], float]:
+    """
+    Chèn city vào chu trình tại cạnh làm tăng độ dài ít nhất (O(n))
+
+    Returns:
+        (route, delta): Tuyến đường mới và độ dài tăng thêm
+    """
+    tour = list(route)
+    if not tour:
+        return [city], 0.0
+    row = dist[city]
+    best_delta, best_at = math.inf, 0
+    for i in range(len(tour)):
+        a, b = tour[i - 1], tour[i]
+        delta = dist[a][city] + row[b] - dist[a][b]
+        if delta < best_delta:
+            best_delta, best_at = delta, i
+    tour.insert(best_at, city)
+    return tour, best_delta
+
+
+def remove_from_route(route: Sequence[int], city: int, dist) -> Tuple[List[int], float]:
+    """
+    Bỏ city khỏi chu trình, nối trực tiếp hai thành phố kề nó (O(n))
+
+    Returns:
+        (route, delta): Tuyến đường mới và độ dài thay đổi (<= 0 nếu thỏa bất đẳng thức tam giác)
+    """
+    tour = list(route)
+    i = tour.index(city)
+    a, b = tour[i - 1], tour[(i + 1) % len(tour)]
+    delta = dist[a][b] - dist[a][city] - dist[city][b] if len(tour) > 2 else -route_length(tour, dist)
+    del tour[i]
+    return tour, delta
@@ -0,0 +1,262 @@
+"""
+Travelling Salesman Problem - Main Entry Point
+Mở giao diện (mặc định) hoặc giải một bài toán không cần giao diện và in/ghi kết quả
+
+Cách dùng:
+    python tsp_main.py                                   # giao diện Tkinter
+    python tsp_main.py solve data/tsplib/burma14.tsp
+    python tsp_main.py solve cities.csv --solver aco --time-limit 5 --format json -o result.json
+    python -m scripts solve instance.json --plot route.png   # từ thư mục gốc của đồ án
+
+Module này chỉ import thư viện chuẩn khi nạp; NumPy, các bộ giải, matplotlib và Tkinter
+được nạp khi thật sự cần (giải, vẽ, mở giao diện) để lệnh giải khởi động nhanh.
+"""
+
+import argparse
+import ast
+import csv
+import json
+import sys
+from typing import List, Optional
+
+SOLVERS = ('auto', 'backtracking', 'held_karp', 'aco')
+
+# solver='auto': Held-Karp (lời giải tối ưu, memory_bounded) tới số thành phố này, lớn hơn
+# thì dùng ACO; 20 thành phố mất khoảng 1 giây, mỗi thành phố thêm gấp hơn đôi thời gian
+AUTO_EXACT_MAX_CITIES = 20
+
+
+def instance_from_record(record: dict, metric: str = 'euclidean'):
+    """
+    Dựng bài toán từ dict {"distance_matrix": ...} hoặc {"coordinates": ..., "metric": ...},
+    có thể kèm "cities" (tên thành phố)
+
+    Returns:
+        (cities, distance_matrix, coordinates): coordinates là None nếu chỉ có ma trận
+    """
+    import numpy as np
+
+    from tsp_distance import distance_matrix
+
+    coordinates = None
+    if 'distance_matrix' in record:
+        matrix = np.asarray(record['distance_matrix'], dtype=np.float64)
+        if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+            raise ValueError(f"distance_matrix phải là ma trận vuông, nhận được kích thước {matrix.shape}")
+    elif 'coordinates' in record:
+        coordinates = np.asarray(record['coordinates'], dtype=np.float64)
+        if coordinates.ndim != 2 or coordinates.shape[1] != 2:
+            raise ValueError(f"coordinates phải là danh sách cặp tọa độ, nhận được kích thước {coordinates.shape}")
+        matrix = distance_matrix(coordinates, record.get('metric', metric))
+    else:
+        raise ValueError("Bài toán phải có distance_matrix hoặc coordinates")
+
+    n = len(matrix)
+    cities = record.get('cities') or [f'Thanh pho {i + 1}' for i in range(n)]
+    if len(cities) != n:
+        raise ValueError(f"Số tên thành phố ({len(cities)}) khác số thành phố ({n})")
+    return list(cities), matrix, coordinates
+
+
+def _read_city_csv(path: str) -> dict:
+    """File CSV của giao diện: dòng tiêu đề, sau đó mỗi dòng tên, kinh độ, vĩ độ"""
+    cities, coordinates = [], []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for line_number, row in enumerate(reader, 2):
+            if len(row) < 3:
+                continue
+            try:
+                lon, lat = float(row[1]), float(row[2])
+            except ValueError:
+                raise ValueError(f"Tọa độ không hợp lệ ở dòng {line_number}: {path}") from None
+            cities.append(row[0])
+            coordinates.append((lat, lon))
+    return {'cities': cities, 'coordinates': coordinates, 'metric': 'haversine'}
+
+
+def load_instance(path: str, metric: str = 'euclidean'):
+    """
+    Đọc một bài toán từ file
+
+    - .tsp, .tsp.gz: TSPLIB (tsp_tsplib)
+    - .json: {"coordinates": [[x, y], ...], "metric": ...} hoặc {"distance_matrix": ...}
+    - .csv: định dạng của giao diện (tên, kinh độ, vĩ độ), khoảng cách haversine
+
+    Args:
+        path: Đường dẫn file
+        metric: Metric cho tọa độ trong file JSON không ghi 'metric'
+
+    Returns:
+        (cities, distance_matrix, coordinates): coordinates là None nếu file không có tọa độ
+    """
+    if path.endswith(('.tsp', '.tsp.gz')):
+        from tsp_tsplib import load_tsplib
+
+        instance = load_tsplib(path)
+        return instance.cities, instance.distance_matrix(), instance.coordinates
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return instance_from_record(json.load(f), metric)
+    if path.endswith('.csv'):
+        return instance_from_record(_read_city_csv(path))
+    raise ValueError(f"Không nhận ra định dạng bài toán (.tsp, .tsp.gz, .json, .csv): {path}")
+
+
+def parse_param(specs: Optional[List[str]]) -> dict:
+    """Đọc tham số dạng 'tên=giá_trị' (giá trị đọc như literal Python, ngược lại giữ chuỗi)"""
+    params = {}
+    for spec in specs or []:
+        key, sep, value = spec.partition('=')
+        if not sep:
+            raise ValueError(f"Tham số phải có dạng tên=giá_trị: {spec!r}")
+        try:
+            params[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            params[key] = value
+    return params
+
+
+def make_solver(name: str, cities: List[str], matrix, seed: Optional[int] = None,
+                time_limit: Optional[float] = None, **params):
+    """
+    Tạo bộ giải theo tên (chỉ nạp module của bộ giải được chọn)
+
+    Args:
+        name: 'auto', 'backtracking', 'held_karp' hoặc 'aco'
+        cities: Tên các thành phố
+        matrix: Ma trận khoảng cách
+        seed: Hạt giống (ACO)
+        time_limit: Giới hạn thời gian (giây); Held-Karp không hỗ trợ và bỏ qua
+        params: Tham số truyền thêm cho bộ giải
+    """
+    if name == 'auto':
+        name = 'held_karp' if len(cities) <= AUTO_EXACT_MAX_CITIES else 'aco'
+    if name == 'backtracking':
+        from tsp_backtracking import TSPBacktracking
+
+        return TSPBacktracking(cities, matrix, **{'bound': 'mst', 'engine': 'iterative',
+                                                  'time_limit': time_limit, **params})
+    if name == 'held_karp':
+        from tsp_held_karp import TSPHeldKarp
+
+        return TSPHeldKarp(cities, matrix, **{'memory_bounded': True, **params})
+    if name == 'aco':
+        from tsp_aco import TSP_ACO
+
+        return TSP_ACO(cities, matrix, **{'seed': seed, 'time_limit': time_limit,
+                                          'local_search': 'best', **params})
+    raise ValueError(f"solver phải là một trong {SOLVERS}, nhận được: {name!r}")
+
+
+def _json_default(value):
+    """Kiểu NumPy (mảng, số) sang kiểu JSON mà không cần import NumPy"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Không ghi được kiểu {type(value).__name__} ra JSON")
+
+
+def format_result(result: dict) -> str:
+    """Kết quả dạng văn bản"""
+    route = result['route']
+    lines = [
+        f"Thuật toán: {result['algorithm']}",
+        f"Tuyến đường: {' -> '.join(route + route[:1])}",
+        f"Tổng khoảng cách: {result['distance']:.2f}",
+        f"Thời gian: {result['time']:.4f} giây",
+    ]
+    if result.get('timed_out') or result.get('stop_reason') == 'time_limit':
+        lines.append("Dừng do hết thời gian (lời giải tốt nhất hiện có)")
+    return '\n'.join(lines)
+
+
+def plot_route(path: str, cities: List[str], coordinates, route: List[int], title: str = '',
+               geographic: bool = False):
+    """Vẽ tuyến đường ra file ảnh (matplotlib chỉ được nạp ở đây)"""
+    from matplotlib.figure import Figure
+
+    if geographic:
+        # Tọa độ (vĩ độ, kinh độ): trục hoành là kinh độ
+        xs, ys = [coordinates[i][1] for i in route], [coordinates[i][0] for i in route]
+    else:
+        xs, ys = [coordinates[i][0] for i in route], [coordinates[i][1] for i in route]
+    fig = Figure(figsize=(7, 7), dpi=100)
+    ax = fig.add_subplot(111)
+    ax.plot(xs + xs[:1], ys + ys[:1], 'o-', color='#4ECDC4', linewidth=1.5, markersize=4)
+    ax.plot(xs[:1], ys[:1], 's', color='#FF6B6B', markersize=8)
+    if len(route) <= 30:
+        for x, y, city in zip(xs, ys, route):
+            ax.annotate(cities[city], (x, y), fontsize=8, xytext=(3, 3), textcoords='offset points')
+    ax.set_title(title, fontsize=11, fontweight='bold')
+    ax.grid(alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def solve_command(args) -> int:
+    cities, matrix, coordinates = load_instance(args.instance, args.metric)
+    solver = make_solver(args.solver, cities, matrix, args.seed, args.time_limit,
+                         **parse_param(args.param))
+    result = solver.solve(verbose=args.verbose)
+
+    if args.format == 'json':
+        document = {key: value for key, value in result.items() if key != 'steps'}
+        text = json.dumps({'instance': args.instance, 'n': len(cities), **document},
+                          ensure_ascii=False, indent=2, default=_json_default)
+    else:
+        text = format_result(result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.plot:
+        if coordinates is None:
+            raise ValueError("Bài toán không có tọa độ, không vẽ được tuyến đường")
+        geographic = args.instance.endswith('.csv') or args.metric == 'haversine'
+        plot_route(args.plot, cities, coordinates, [int(city) for city in solver.best_route],
+                   f"{result['algorithm']}: {result['distance']:.2f}", geographic)
+    return 0
+
+
+def gui_command(args) -> int:
+    from tsp_gui_tkinter import main as gui_main
+
+    gui_main()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Giải bài toán TSP (Backtracking, Held-Karp, ACO)')
+    commands = parser.add_subparsers(dest='command')
+
+    commands.add_parser('gui', help='Mở giao diện Tkinter (mặc định)')
+
+    solve = commands.add_parser('solve', help='Giải một bài toán không cần giao diện')
+    solve.add_argument('instance', help='File bài toán: .tsp, .tsp.gz, .json hoặc .csv (tên, kinh độ, vĩ độ)')
+    solve.add_argument('--solver', default='auto', choices=SOLVERS,
+                       help=f'Bộ giải (mặc định auto: Held-Karp tới {AUTO_EXACT_MAX_CITIES} thành phố, lớn hơn dùng ACO)')
+    solve.add_argument('--time-limit', type=float, help='Giới hạn thời gian (giây), không áp dụng cho Held-Karp')
+    solve.add_argument('--seed', type=int, help='Hạt giống của ACO')
+    solve.add_argument('--param', action='append', metavar='NAME=VALUE',
+                       help='Tham số của bộ giải, ví dụ n_ants=20 (có thể lặp lại)')
+    solve.add_argument('--metric', default='euclidean', choices=('euclidean', 'haversine'),
+                       help='Metric cho tọa độ trong file JSON không ghi metric')
+    solve.add_argument('--format', default='text', choices=('text', 'json'), help='Định dạng kết quả')
+    solve.add_argument('-o', '--output', help='Ghi kết quả ra file (mặc định: in ra màn hình)')
+    solve.add_argument('--plot', metavar='IMAGE', help='Vẽ tuyến đường ra file ảnh (cần matplotlib)')
+    solve.add_argument('-v', '--verbose', action='store_true', help='In chi tiết quá trình giải')
+
+    args = parser.parse_args(argv)
+    if args.command == 'solve':
+        try:
+            return solve_command(args)
+        except (ImportError, OSError, ValueError) as e:
+            parser.error(str(e))
+    return gui_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
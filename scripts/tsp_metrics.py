@@ -0,0 +1,282 @@
+"""
+Travelling Salesman Problem - Instrumentation
+Số liệu có cấu trúc cho các bộ giải: bộ đếm, thời gian theo giai đoạn và histogram,
+xuất ra JSON hoặc định dạng văn bản của Prometheus; đo CPU (cProfile) và bộ nhớ (tracemalloc)
+
+Bộ giải chỉ ghi số liệu khi được truyền metrics=Metrics(); mặc định (None) không có
+lời gọi nào tới module này trong vòng lặp chính.
+"""
+
+import bisect
+import io
+import json
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+# Ngưỡng (cận trên) mặc định của histogram theo từng loại số liệu
+GAIN_BUCKETS = (1e-4, 1e-3, 0.01, 0.05, 0.1, 0.25, 0.5)
+SECONDS_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0, 60.0, 600.0)
+
+
+def _labels_text(labels: Tuple[Tuple[str, str], ...]) -> str:
+    """Nhãn theo cú pháp Prometheus: {a="1",b="2"}"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        """
+        Histogram với các ngưỡng cố định (tăng dần); giá trị lớn hơn ngưỡng cuối vào ô +Inf
+
+        Args:
+            buckets: Các cận trên của từng ô
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: 'Histogram'):
+        if other.buckets != self.buckets:
+            raise ValueError("Không gộp được hai histogram có ngưỡng khác nhau")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def as_dict(self) -> dict:
+        return {'buckets': list(self.buckets), 'counts': list(self.counts),
+                'sum': self.sum, 'count': self.count}
+
+
+class Metrics:
+    def __init__(self, prefix: str = 'tsp'):
+        """
+        Tập số liệu của một hoặc nhiều lần giải
+
+        Mỗi số liệu có tên và nhãn tùy chọn (ví dụ reason='bound'):
+        - bộ đếm: inc(name, value, **labels)
+        - thời gian: add_time(name, seconds, **labels), hoặc lap()/timer() để đo
+        - histogram: observe(name, value, buckets, **labels)
+
+        Args:
+            prefix: Tiền tố tên số liệu khi xuất Prometheus
+        """
+        self.prefix = prefix
+        self.counters: Dict[tuple, float] = {}
+        self.timings: Dict[tuple, list] = {}
+        self.histograms: Dict[tuple, Histogram] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Cộng value vào bộ đếm"""
+        key = self._key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def add_time(self, name: str, seconds: float, **labels):
+        """Cộng thời gian (giây) vào số liệu thời gian và tăng số lần đo"""
+        key = self._key(name, labels)
+        timing = self.timings.get(key)
+        if timing is None:
+            self.timings[key] = [seconds, 1]
+        else:
+            timing[0] += seconds
+            timing[1] += 1
+
+    def lap(self, name: str, since: float, **labels) -> float:
+        """Cộng thời gian từ mốc since tới hiện tại; trả về mốc hiện tại cho lần đo tiếp theo"""
+        now = time.perf_counter()
+        self.add_time(name, now - since, **labels)
+        return now
+
+    def timer(self, name: str, **labels) -> '_Timer':
+        """Context manager đo thời gian một khối lệnh: with metrics.timer('solve'): ..."""
+        return _Timer(self, name, labels)
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = SECONDS_BUCKETS, **labels):
+        """Ghi một giá trị vào histogram (tạo mới với buckets nếu chưa có)"""
+        key = self._key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+    def merge(self, other: 'Metrics'):
+        """Gộp số liệu của other (ví dụ từ tiến trình con) vào đây"""
+        for key, value in other.counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, (seconds, calls) in other.timings.items():
+            timing = self.timings.setdefault(key, [0.0, 0])
+            timing[0] += seconds
+            timing[1] += calls
+        for key, histogram in other.histograms.items():
+            if key in self.histograms:
+                self.histograms[key].merge(histogram)
+            else:
+                self.histograms[key] = Histogram(histogram.buckets)
+                self.histograms[key].merge(histogram)
+
+    def as_dict(self) -> dict:
+        """Số liệu dạng dict, khóa là tên kèm nhãn theo cú pháp Prometheus"""
+        return {
+            'counters': {name + _labels_text(labels): value
+                         for (name, labels), value in sorted(self.counters.items())},
+            'timings': {name + _labels_text(labels): {'seconds': seconds, 'calls': calls}
+                        for (name, labels), (seconds, calls) in sorted(self.timings.items())},
+            'histograms': {name + _labels_text(labels): histogram.as_dict()
+                           for (name, labels), histogram in sorted(self.histograms.items(),
+                                                                   key=lambda item: item[0])},
+        }
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """Xuất JSON; ghi ra file nếu có path"""
+        text = json.dumps(self.as_dict(), ensure_ascii=False, indent=2)
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+        return text
+
+    def to_prometheus(self) -> str:
+        """
+        Xuất theo định dạng văn bản của Prometheus (text exposition format)
+
+        Bộ đếm có hậu tố _total; thời gian thành <tên>_seconds_total và <tên>_calls_total;
+        histogram thành <tên>_bucket{le=...} (tích lũy), <tên>_sum và <tên>_count.
+        """
+        lines = []
+
+        def family(name: str, kind: str):
+            lines.append(f'# TYPE {name} {kind}')
+
+        def grouped(items):
+            names = {}
+            for (name, labels), value in sorted(items, key=lambda item: item[0]):
+                names.setdefault(name, []).append((labels, value))
+            return names.items()
+
+        for name, series in grouped(self.counters.items()):
+            metric = f'{self.prefix}_{name}_total'
+            family(metric, 'counter')
+            lines.extend(f'{metric}{_labels_text(labels)} {value}' for labels, value in series)
+        for name, series in grouped(self.timings.items()):
+            for suffix, index in (('seconds_total', 0), ('calls_total', 1)):
+                metric = f'{self.prefix}_{name}_{suffix}'
+                family(metric, 'counter')
+                lines.extend(f'{metric}{_labels_text(labels)} {timing[index]}' for labels, timing in series)
+        for name, series in grouped(self.histograms.items()):
+            metric = f'{self.prefix}_{name}'
+            family(metric, 'histogram')
+            for labels, histogram in series:
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{metric}_bucket{_labels_text(labels + (("le", le),))} {cumulative}')
+                lines.append(f'{metric}_sum{_labels_text(labels)} {histogram.sum}')
+                lines.append(f'{metric}_count{_labels_text(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+class _Timer:
+    def __init__(self, metrics: Metrics, name: str, labels: dict):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.lap(self.name, self.start, **self.labels)
+        return False
+
+
+class Profiler:
+    def __init__(self, cpu: bool = True, memory: bool = False, frames: int = 1):
+        """
+        Đo một khối lệnh bằng cProfile (CPU) và/hoặc tracemalloc (bộ nhớ):
+
+            with Profiler(cpu=True, memory=True) as profiler:
+                solver.solve()
+            print(profiler.report())
+
+        Chỉ đo luồng hiện tại; tiến trình con (n_workers > 1, mô hình đảo) không được đo.
+        tracemalloc làm chương trình chậm đi nhiều lần, chỉ nên bật khi cần.
+
+        Args:
+            cpu: Đo thời gian theo hàm bằng cProfile
+            memory: Đo cấp phát bộ nhớ theo dòng lệnh bằng tracemalloc
+            frames: Số khung ngăn xếp lưu cho mỗi lần cấp phát (tracemalloc)
+        """
+        # Nạp khi dùng tới để các bộ giải import module này không phải trả chi phí
+        import cProfile
+        
+        self.cpu = cpu
+        self.memory = memory
+        self.frames = frames
+        self.profile = cProfile.Profile() if cpu else None
+        self.snapshot = None
+        self.peak_bytes = None
+        self._tracing = False
+
+    def __enter__(self):
+        import tracemalloc
+        
+        if self.memory:
+            self._tracing = not tracemalloc.is_tracing()
+            if self._tracing:
+                tracemalloc.start(self.frames)
+            tracemalloc.reset_peak()
+        if self.profile is not None:
+            self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        import tracemalloc
+        
+        if self.profile is not None:
+            self.profile.disable()
+        if self.memory:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            if self._tracing:
+                tracemalloc.stop()
+        return False
+
+    def cpu_report(self, top: int = 20, sort: str = 'cumulative') -> str:
+        """Các hàm tốn thời gian nhất (bảng của pstats)"""
+        if self.profile is None:
+            return ''
+        import pstats
+        
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).strip_dirs().sort_stats(sort).print_stats(top)
+        return stream.getvalue()
+
+    def memory_report(self, top: int = 20) -> str:
+        """Các dòng lệnh cấp phát nhiều bộ nhớ nhất (còn giữ lúc kết thúc) và bộ nhớ đỉnh"""
+        if self.snapshot is None:
+            return ''
+        lines = [f'Bộ nhớ đỉnh: {self.peak_bytes / 2**20:.2f} MB']
+        for stat in self.snapshot.statistics('lineno')[:top]:
+            lines.append(str(stat))
+        return '\n'.join(lines) + '\n'
+
+    def report(self, top: int = 20) -> str:
+        return self.cpu_report(top) + self.memory_report(top)
+
+    def dump(self, path: str):
+        """Ghi kết quả cProfile ra file (.prof) để xem bằng pstats, snakeviz, ..."""
+        if self.profile is not None:
+            self.profile.dump_stats(path)
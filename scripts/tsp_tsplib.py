@@ -0,0 +1,257 @@
+"""
+Travelling Salesman Problem - TSPLIB Loader
+Đọc file bài toán TSPLIB (.tsp) và file tuyến đường (.tour), hỗ trợ EUC_2D, CEIL_2D,
+GEO, ATT và ma trận tường minh (EXPLICIT); file được đọc tuần tự theo dòng
+"""
+
+import gzip
+from typing import Iterator, List, Optional, TextIO
+
+import numpy as np
+
+EDGE_WEIGHT_TYPES = ('EUC_2D', 'CEIL_2D', 'GEO', 'ATT', 'EXPLICIT')
+EDGE_WEIGHT_FORMATS = ('FULL_MATRIX', 'UPPER_ROW', 'LOWER_ROW', 'UPPER_DIAG_ROW',
+                       'LOWER_DIAG_ROW', 'UPPER_COL', 'LOWER_COL', 'UPPER_DIAG_COL',
+                       'LOWER_DIAG_COL')
+
+# Hằng số của TSPLIB cho kiểu GEO (giữ nguyên để khớp lời giải tối ưu đã công bố)
+GEO_PI = 3.141592
+GEO_RADIUS = 6378.388
+
+
+def _open(path: str) -> TextIO:
+    """Mở file văn bản, tự giải nén nếu đuôi .gz"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def _numbers(lines: Iterator[str], stop: List[str]) -> Iterator[str]:
+    """
+    Sinh lần lượt các số trong phần dữ liệu. Dòng đầu tiên không phải số (từ khóa
+    tiếp theo hoặc EOF) được đặt vào stop để vòng đọc chính xử lý tiếp.
+    """
+    for line in lines:
+        tokens = line.split()
+        if not tokens:
+            continue
+        if not _is_number(tokens[0]):
+            stop.append(line)
+            return
+        yield from tokens
+
+
+def _is_number(token: str) -> bool:
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+def _nint(values: np.ndarray) -> np.ndarray:
+    """Làm tròn về số nguyên gần nhất theo quy ước TSPLIB: (int)(x + 0.5)"""
+    return np.floor(values + 0.5)
+
+
+def _geo_radians(values: np.ndarray) -> np.ndarray:
+    """Đổi tọa độ dạng DDD.MM (độ.phút) sang radian theo quy ước TSPLIB"""
+    degrees = np.trunc(values)
+    minutes = values - degrees
+    return GEO_PI * (degrees + 5.0 * minutes / 3.0) / 180.0
+
+
+class TSPLIBInstance:
+    def __init__(self, name: str, dimension: int, edge_weight_type: str,
+                 edge_weight_format: Optional[str] = None, comment: str = '',
+                 coordinates: Optional[np.ndarray] = None, weights: Optional[np.ndarray] = None):
+        """
+        Một bài toán TSPLIB
+
+        Args:
+            name: Tên bài toán (NAME)
+            dimension: Số thành phố (DIMENSION)
+            edge_weight_type: EUC_2D, CEIL_2D, GEO, ATT hoặc EXPLICIT
+            edge_weight_format: Dạng ma trận khi EXPLICIT (FULL_MATRIX, LOWER_DIAG_ROW, ...)
+            comment: Ghi chú (COMMENT)
+            coordinates: Mảng (n, 2) tọa độ từ NODE_COORD_SECTION
+            weights: Ma trận (n, n) từ EDGE_WEIGHT_SECTION
+        """
+        self.name = name
+        self.dimension = dimension
+        self.edge_weight_type = edge_weight_type
+        self.edge_weight_format = edge_weight_format
+        self.comment = comment
+        self.coordinates = coordinates
+        self.weights = weights
+
+    @property
+    def cities(self) -> List[str]:
+        """Tên thành phố theo số thứ tự trong file (bắt đầu từ 1)"""
+        return [str(i + 1) for i in range(self.dimension)]
+
+    def distance_matrix(self) -> np.ndarray:
+        """Ma trận khoảng cách (n, n) theo đúng hàm khoảng cách của TSPLIB (số nguyên)"""
+        if self.edge_weight_type == 'EXPLICIT':
+            return self.weights.astype(float)
+
+        x, y = self.coordinates[:, 0], self.coordinates[:, 1]
+        if self.edge_weight_type == 'GEO':
+            lat, lon = _geo_radians(x), _geo_radians(y)
+            q1 = np.cos(lon[:, None] - lon[None, :])
+            q2 = np.cos(lat[:, None] - lat[None, :])
+            q3 = np.cos(lat[:, None] + lat[None, :])
+            arc = np.arccos(np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0))
+            matrix = np.trunc(GEO_RADIUS * arc + 1.0)
+        else:
+            dx = x[:, None] - x[None, :]
+            dy = y[:, None] - y[None, :]
+            if self.edge_weight_type == 'ATT':
+                r = np.sqrt((dx * dx + dy * dy) / 10.0)
+                t = _nint(r)
+                matrix = np.where(t < r, t + 1, t)
+            elif self.edge_weight_type == 'CEIL_2D':
+                matrix = np.ceil(np.sqrt(dx * dx + dy * dy))
+            else:
+                matrix = _nint(np.sqrt(dx * dx + dy * dy))
+        np.fill_diagonal(matrix, 0)
+        return matrix
+
+    def tour_length(self, tour: List[int], matrix: Optional[np.ndarray] = None) -> float:
+        """Độ dài chu trình (chỉ số thành phố bắt đầu từ 0)"""
+        if matrix is None:
+            matrix = self.distance_matrix()
+        tour = np.asarray(tour)
+        return float(matrix[tour, np.roll(tour, -1)].sum())
+
+
+def _fill_weights(values: np.ndarray, n: int, fmt: str) -> np.ndarray:
+    """Dựng ma trận đối xứng (n, n) từ dãy trọng số theo EDGE_WEIGHT_FORMAT"""
+    if fmt == 'FULL_MATRIX':
+        return values[:n * n].reshape(n, n)
+
+    # Dạng *_COL của tam giác trên bằng dạng *_ROW của tam giác dưới (và ngược lại)
+    transposed = {'UPPER_COL': 'LOWER_ROW', 'LOWER_COL': 'UPPER_ROW',
+                  'UPPER_DIAG_COL': 'LOWER_DIAG_ROW', 'LOWER_DIAG_COL': 'UPPER_DIAG_ROW'}
+    fmt = transposed.get(fmt, fmt)
+    diagonal = 0 if 'DIAG' in fmt else (1 if fmt.startswith('UPPER') else -1)
+    if fmt.startswith('UPPER'):
+        rows, cols = np.triu_indices(n, k=diagonal)
+    else:
+        rows, cols = np.tril_indices(n, k=diagonal)
+
+    matrix = np.zeros((n, n))
+    matrix[rows, cols] = values[:len(rows)]
+    matrix[cols, rows] = values[:len(rows)]
+    return matrix
+
+
+def load_tsplib(path: str) -> TSPLIBInstance:
+    """
+    Đọc file bài toán TSPLIB (.tsp hoặc .tsp.gz)
+
+    File được đọc tuần tự từng dòng vào mảng cấp phát trước theo DIMENSION,
+    không nạp toàn bộ nội dung vào bộ nhớ.
+
+    Raises:
+        ValueError: Kiểu khoảng cách hoặc dạng ma trận không được hỗ trợ, thiếu dữ liệu
+    """
+    header = {}
+    coordinates = None
+    weights = None
+
+    with _open(path) as f:
+        lines = iter(f)
+        pending = []
+        while True:
+            line = pending.pop() if pending else next(lines, 'EOF')
+            line = line.strip()
+            if not line:
+                continue
+            if line == 'EOF':
+                break
+
+            if line.startswith('NODE_COORD_SECTION'):
+                n = int(header['DIMENSION'])
+                coordinates = np.empty((n, 2))
+                count = 0
+                while count < n:
+                    line = next(lines, None)
+                    if line is None or line.strip() == 'EOF':
+                        raise ValueError(f"NODE_COORD_SECTION thiếu dữ liệu (cần {n} thành phố, "
+                                         f"đọc được {count})")
+                    tokens = line.split()
+                    if not tokens:
+                        continue
+                    try:
+                        index = int(tokens[0]) - 1
+                        if not 0 <= index < n:
+                            raise ValueError
+                        coordinates[index] = float(tokens[1]), float(tokens[2])
+                    except (IndexError, ValueError):
+                        raise ValueError(f"Dòng tọa độ không hợp lệ trong NODE_COORD_SECTION: "
+                                         f"{line.strip()!r}") from None
+                    count += 1
+            elif line.startswith('EDGE_WEIGHT_SECTION'):
+                n = int(header['DIMENSION'])
+                fmt = header.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX')
+                if fmt not in EDGE_WEIGHT_FORMATS:
+                    raise ValueError(f"EDGE_WEIGHT_FORMAT không được hỗ trợ: {fmt!r}")
+                if fmt == 'FULL_MATRIX':
+                    size = n * n
+                elif 'DIAG' in fmt:
+                    size = n * (n + 1) // 2
+                else:
+                    size = n * (n - 1) // 2
+                values = np.fromiter((float(v) for v in _take(_numbers(lines, pending), size)),
+                                     dtype=float, count=size)
+                weights = _fill_weights(values, n, fmt)
+            elif line.startswith(('DISPLAY_DATA_SECTION', 'FIXED_EDGES_SECTION')):
+                # Phần phụ không dùng: bỏ qua tới từ khóa tiếp theo
+                for _ in _numbers(lines, pending):
+                    pass
+            elif ':' in line:
+                key, value = line.split(':', 1)
+                header[key.strip()] = value.strip()
+
+    edge_weight_type = header.get('EDGE_WEIGHT_TYPE', '')
+    if edge_weight_type not in EDGE_WEIGHT_TYPES:
+        raise ValueError(f"EDGE_WEIGHT_TYPE không được hỗ trợ: {edge_weight_type!r}")
+    if edge_weight_type == 'EXPLICIT' and weights is None:
+        raise ValueError(f"{path}: thiếu EDGE_WEIGHT_SECTION")
+    if edge_weight_type != 'EXPLICIT' and coordinates is None:
+        raise ValueError(f"{path}: thiếu NODE_COORD_SECTION")
+
+    return TSPLIBInstance(
+        name=header.get('NAME', '').replace('.tsp', ''),
+        dimension=int(header['DIMENSION']),
+        edge_weight_type=edge_weight_type,
+        edge_weight_format=header.get('EDGE_WEIGHT_FORMAT'),
+        comment=header.get('COMMENT', ''),
+        coordinates=coordinates,
+        weights=weights
+    )
+
+
+def _take(values: Iterator[str], count: int) -> Iterator[str]:
+    """Lấy đúng count phần tử, báo lỗi nếu thiếu"""
+    for _ in range(count):
+        try:
+            yield next(values)
+        except StopIteration:
+            raise ValueError(f"EDGE_WEIGHT_SECTION thiếu dữ liệu (cần {count} giá trị)") from None
+
+
+def load_tour(path: str) -> List[int]:
+    """Đọc file tuyến đường TSPLIB (.tour), trả về chỉ số thành phố bắt đầu từ 0"""
+    tour = []
+    with _open(path) as f:
+        lines = iter(f)
+        for line in lines:
+            if line.strip().startswith('TOUR_SECTION'):
+                for token in _numbers(lines, []):
+                    city = int(token)
+                    if city == -1:
+                        return tour
+                    tour.append(city - 1)
+    return tour